@@ -25,6 +25,14 @@ Usage::
     # Async
     result = await agent.arun("analyze this", context=data)
 
+    # Streaming — partial results as Gemini writes, then the final one
+    async for result in agent.astream("explain this", context=data):
+        ...
+
+    # Many prompts at once (concurrent, results in input order)
+    results = agent.map(["summarize", "classify"], context=doc)
+    results = agent.security.map(["audit"] * len(qs), contexts=qs)
+
     # Verbose output (full [AGENT] tree, spinners, metadata)
     init(verbose=True)
     # or per-call:
@@ -35,25 +43,26 @@ from __future__ import annotations
 
 __version__ = "1.0.0"
 
-import asyncio
-import threading
-from typing import Any, Optional
-
-from .core import DEFAULT_CONFIG, execute_agent, get_config, update_config
-from .types import (
-    AgentCallOptions,
-    AgentConfig,
-    AgentResult,
-    BudgetConfig,
-    FileAttachment,
-    LogLevel,
-    PersonaName,
-    ResponseFormat,
-    ThinkingConfig,
-    ToolCall,
-    ToolName,
-)
-from .utils.format import set_log_level
+import importlib
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterable, Optional, Sequence
+
+# Core, providers and the Pydantic types are imported on first use (see
+# __getattr__ below) so `import console_agent` stays cheap for CLIs.
+if TYPE_CHECKING:
+    from .core import DEFAULT_CONFIG, execute_agent, get_config, update_config
+    from .types import (
+        AgentCallOptions,
+        AgentConfig,
+        AgentResult,
+        BudgetConfig,
+        FileAttachment,
+        LogLevel,
+        PersonaName,
+        ResponseFormat,
+        ThinkingConfig,
+        ToolCall,
+        ToolName,
+    )
 
 
 # ─── Re-exports ──────────────────────────────────────────────────────────────
@@ -75,6 +84,53 @@ __all__ = [
     "DEFAULT_CONFIG",
 ]
 
+_LAZY_TYPES = frozenset(
+    {
+        "AgentConfig",
+        "AgentCallOptions",
+        "AgentResult",
+        "BudgetConfig",
+        "FileAttachment",
+        "LogLevel",
+        "PersonaName",
+        "ResponseFormat",
+        "ThinkingConfig",
+        "ToolCall",
+        "ToolName",
+    }
+)
+_LAZY_CORE = frozenset(
+    {"DEFAULT_CONFIG", "execute_agent", "execute_agent_stream", "get_config", "update_config"}
+)
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve re-exports on first access (PEP 562)."""
+    if name in _LAZY_TYPES:
+        from . import types as module
+    elif name in _LAZY_CORE:
+        from . import core as module
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+_modules: dict[str, Any] = {}
+
+
+def _module(name: str) -> Any:
+    """Submodule ``name`` (e.g. ``"core"``), imported on first use.
+
+    Cached here so agent() calls after the first skip the import machinery.
+    Attributes are still looked up on the module, so patching them works.
+    """
+    module = _modules.get(name)
+    if module is None:
+        module = _modules[name] = importlib.import_module(f".{name}", __name__)
+    return module
+
 
 # ─── Init ────────────────────────────────────────────────────────────────────
 
@@ -94,6 +150,9 @@ def init(**kwargs: Any) -> None:
             verbose=True,
         )
     """
+    from .core import get_config, update_config
+    from .utils.format import set_log_level
+
     update_config(**kwargs)
     full_config = get_config()
     set_log_level(full_config.log_level)
@@ -105,35 +164,11 @@ def init(**kwargs: Any) -> None:
 def _run_async(coro: Any) -> Any:
     """Run an async coroutine from sync context.
 
-    Handles the case where an event loop is already running
-    (e.g. in Jupyter notebooks) by running in a background thread.
+    Submits to a shared background loop, so it works whether or not an
+    event loop is already running (e.g. in Jupyter notebooks) and provider
+    clients are reused across calls.
     """
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = None
-
-    if loop is not None and loop.is_running():
-        # We're inside an already-running event loop (Jupyter, etc.)
-        # Run in a background thread with its own loop
-        result_container: list[Any] = [None]
-        exception_container: list[Optional[Exception]] = [None]
-
-        def _run() -> None:
-            try:
-                result_container[0] = asyncio.run(coro)
-            except Exception as exc:
-                exception_container[0] = exc
-
-        thread = threading.Thread(target=_run)
-        thread.start()
-        thread.join()
-
-        if exception_container[0] is not None:
-            raise exception_container[0]
-        return result_container[0]
-    else:
-        return asyncio.run(coro)
+    return _module("utils.runsync").run_sync(coro)
 
 
 # ─── Agent Callable ──────────────────────────────────────────────────────────
@@ -187,14 +222,15 @@ class _AgentCallable:
             verbose=verbose,
         )
 
-        config = get_config()
+        core = _module("core")
+        config = core.get_config()
 
         if config.mode == "fire-and-forget" and not (options and options.mode):
             # Fire-and-forget: run but still return result for compatibility
-            result = _run_async(execute_agent(prompt, context, options))
+            result = _run_async(core.execute_agent(prompt, context, options))
             return result
 
-        return _run_async(execute_agent(prompt, context, options))
+        return _run_async(core.execute_agent(prompt, context, options))
 
     async def arun(
         self,
@@ -225,27 +261,110 @@ class _AgentCallable:
             response_format=response_format,
             verbose=verbose,
         )
-        return await execute_agent(prompt, context, options)
+
+        return await _module("core").execute_agent(prompt, context, options)
+
+    async def astream(
+        self,
+        prompt: str,
+        context: Any = None,
+        *,
+        model: Optional[str] = None,
+        tools: Optional[list[Any]] = None,
+        persona: Optional[PersonaName] = None,
+        mode: Optional[str] = None,
+        thinking: Optional[dict[str, Any]] = None,
+        schema_model: Any = None,
+        response_format: Optional[dict[str, Any]] = None,
+        verbose: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[AgentResult]:
+        """Stream an agent call: partial results, then the final result.
+
+        Same parameters as __call__. Partials have ``metadata.partial`` set
+        and carry the text so far in ``data["partial"]``. When stopping
+        early, close the stream (``contextlib.aclosing``) to end the request
+        right away.
+        """
+        options = self._build_options(
+            model=model,
+            tools=tools,
+            persona=persona,
+            mode=mode,
+            thinking=thinking,
+            schema_model=schema_model,
+            response_format=response_format,
+            verbose=verbose,
+        )
+
+        stream = _module("core").execute_agent_stream(prompt, context, options)
+        try:
+            async for result in stream:
+                yield result
+        finally:
+            await stream.aclose()
+
+    # ─── Fan-out ──────────────────────────────────────────────────────────
+
+    async def amap(
+        self,
+        prompts: Iterable[str],
+        context: Any = None,
+        *,
+        contexts: Optional[Sequence[Any]] = None,
+        concurrency: int = 8,
+        **kwargs: Any,
+    ) -> list[AgentResult]:
+        """Run many prompts concurrently; results come back in input order.
+
+        Args:
+            prompts: The prompts to run.
+            context: Context shared by every prompt.
+            contexts: Per-prompt contexts (same length as ``prompts``);
+                overrides ``context``.
+            concurrency: Maximum number of calls in flight at once.
+            **kwargs: Same per-call options as ``__call__``.
+        """
+        import asyncio
+
+        prompts = list(prompts)
+        if contexts is not None and len(contexts) != len(prompts):
+            raise ValueError("contexts must have the same length as prompts")
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _one(index: int, prompt: str) -> AgentResult:
+            item_context = contexts[index] if contexts is not None else context
+            async with semaphore:
+                return await self.arun(prompt, item_context, **kwargs)
+
+        return list(await asyncio.gather(*(_one(i, p) for i, p in enumerate(prompts))))
+
+    def map(
+        self,
+        prompts: Iterable[str],
+        context: Any = None,
+        **kwargs: Any,
+    ) -> list[AgentResult]:
+        """Synchronous ``amap``: run many prompts concurrently, in input order."""
+        return _run_async(self.amap(prompts, context, **kwargs))
 
     # ─── Persona Shortcuts ────────────────────────────────────────────────
 
-    def security(
-        self, prompt: str, context: Any = None, **kwargs: Any
-    ) -> AgentResult:
+    @property
+    def security(self) -> _PersonaShortcut:
         """Run with security persona."""
-        return self(prompt, context, persona="security", **kwargs)
+        return _PersonaShortcut(self, "security")
 
-    def debug(
-        self, prompt: str, context: Any = None, **kwargs: Any
-    ) -> AgentResult:
+    @property
+    def debug(self) -> _PersonaShortcut:
         """Run with debugger persona."""
-        return self(prompt, context, persona="debugger", **kwargs)
+        return _PersonaShortcut(self, "debugger")
 
-    def architect(
-        self, prompt: str, context: Any = None, **kwargs: Any
-    ) -> AgentResult:
+    @property
+    def architect(self) -> _PersonaShortcut:
         """Run with architect persona."""
-        return self(prompt, context, persona="architect", **kwargs)
+        return _PersonaShortcut(self, "architect")
 
     # ─── Internal ─────────────────────────────────────────────────────────
 
@@ -268,10 +387,11 @@ class _AgentCallable:
         if not has_any:
             return None
 
-        thinking_config = ThinkingConfig(**thinking) if thinking else None
-        rf = ResponseFormat(**response_format) if response_format else None
+        types = _module("types")
+        thinking_config = types.ThinkingConfig(**thinking) if thinking else None
+        rf = types.ResponseFormat(**response_format) if response_format else None
 
-        return AgentCallOptions(
+        return types.AgentCallOptions(
             model=model,
             tools=tools,
             persona=persona,
@@ -283,6 +403,33 @@ class _AgentCallable:
         )
 
 
+class _PersonaShortcut:
+    """``agent.security(...)`` etc. — the agent API with the persona pinned."""
+
+    def __init__(self, agent: _AgentCallable, persona: PersonaName) -> None:
+        self._agent = agent
+        self._persona = persona
+
+    def __call__(self, prompt: str, context: Any = None, **kwargs: Any) -> AgentResult:
+        return self._agent(prompt, context, persona=self._persona, **kwargs)
+
+    async def arun(self, prompt: str, context: Any = None, **kwargs: Any) -> AgentResult:
+        return await self._agent.arun(prompt, context, persona=self._persona, **kwargs)
+
+    def astream(
+        self, prompt: str, context: Any = None, **kwargs: Any
+    ) -> AsyncIterator[AgentResult]:
+        return self._agent.astream(prompt, context, persona=self._persona, **kwargs)
+
+    def map(self, prompts: Iterable[str], context: Any = None, **kwargs: Any) -> list[AgentResult]:
+        return self._agent.map(prompts, context, persona=self._persona, **kwargs)
+
+    async def amap(
+        self, prompts: Iterable[str], context: Any = None, **kwargs: Any
+    ) -> list[AgentResult]:
+        return await self._agent.amap(prompts, context, persona=self._persona, **kwargs)
+
+
 # ─── Module-level singleton ──────────────────────────────────────────────────
 
 agent = _AgentCallable()
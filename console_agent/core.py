@@ -6,14 +6,13 @@ anonymization, provider calls, and console output.
 from __future__ import annotations
 
 import asyncio
-import json
+import functools
 import traceback
-from copy import deepcopy
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Awaitable, Final, Optional
 
 from .personas import detect_persona, get_persona
-from .providers.google import call_google
-from .providers.ollama import call_ollama
+from .providers.google import call_google, call_google_rows, call_google_stream, embed_prompt
+from .providers.ollama import call_ollama, call_ollama_rows
 from .types import (
     AgentCallOptions,
     AgentConfig,
@@ -21,9 +20,11 @@ from .types import (
     AgentResult,
     BudgetConfig,
     FileAttachment,
-    PersonaName,
+    PersonaDefinition,
 )
-from .utils.anonymize import anonymize_value
+from .utils import fastjson
+from .utils.anonymize import anonymize, anonymize_json, anonymize_value
+from .utils.batch import BatchCoalescer, BatchItem
 from .utils.budget import BudgetTracker
 from .utils.caller_file import (
     SourceFileInfo,
@@ -40,9 +41,16 @@ from .utils.format import (
     log_debug,
     set_log_level,
     start_spinner,
+    start_streaming_spinner,
     stop_spinner,
 )
 from .utils.rate_limit import RateLimiter
+from .utils.response_cache import (
+    ResponseCache,
+    SemanticIndex,
+    detach_result,
+    make_cache_key,
+)
 
 # ─── Default Config ──────────────────────────────────────────────────────────
 
@@ -50,43 +58,89 @@ DEFAULT_CONFIG = AgentConfig()
 
 # ─── Singleton State ─────────────────────────────────────────────────────────
 
-_config: AgentConfig = deepcopy(DEFAULT_CONFIG)
+_config: AgentConfig = DEFAULT_CONFIG  # frozen, safe to share
 _rate_limiter = RateLimiter(_config.budget.max_calls_per_day)
 _budget_tracker = BudgetTracker(_config.budget)
+_batcher: BatchCoalescer  # created below, once _dispatch_batch exists
+_response_cache = ResponseCache(
+    _config.cache.max_entries,
+    _config.cache.ttl_s,
+    _config.cache.path if _config.cache.enabled else None,
+)
+_semantic_index = SemanticIndex(
+    _config.cache.max_entries, _config.cache.semantic_threshold or 0.0
+)
 
 
 def update_config(new_config: dict[str, Any] | None = None, **kwargs: Any) -> None:
-    """Update the global configuration. Reinitializes rate limiter and budget tracker."""
-    global _config, _rate_limiter, _budget_tracker
+    """Update the global configuration.
+
+    The rate limiter, budget tracker, batcher and response cache are only
+    rebuilt when their own section changes, so e.g. ``init(verbose=True)``
+    keeps today's counters.
+    """
+    global _config, _rate_limiter, _budget_tracker, _batcher, _response_cache, _semantic_index
+
+    # Shallow field map — unchanged nested models are reused, not re-dumped
+    merged: dict[str, Any] = _config.__dict__.copy()
+    changed: set[str] = set()
+
+    for updates in (new_config, kwargs):
+        if not updates:
+            continue
+        # Merge nested sections instead of replacing them
+        for section in ("budget", "batch", "cache", "throttle"):
+            if section in updates and isinstance(updates[section], dict):
+                current = merged[section]
+                base = current if isinstance(current, dict) else current.__dict__
+                updates = {**updates, section: {**base, **updates[section]}}
+        merged.update(updates)
+        changed.update(updates)
+
+    if not changed:
+        return
+
+    _config = AgentConfig.model_validate(merged)
+    if "budget" in changed:
+        _rate_limiter = RateLimiter(_config.budget.max_calls_per_day)
+        _budget_tracker = BudgetTracker(_config.budget)
+    if "batch" in changed:
+        _batcher = BatchCoalescer(
+            _dispatch_batch, _config.batch.wait_ms, _config.batch.max_size
+        )
+    if "cache" in changed:
+        _response_cache = ResponseCache(
+            _config.cache.max_entries,
+            _config.cache.ttl_s,
+            _config.cache.path if _config.cache.enabled else None,
+        )
+        _semantic_index = SemanticIndex(
+            _config.cache.max_entries, _config.cache.semantic_threshold or 0.0
+        )
 
-    merged = _config.model_dump()
 
-    if new_config:
-        # Merge budget separately
-        if "budget" in new_config and isinstance(new_config["budget"], dict):
-            merged_budget = merged.get("budget", {})
-            merged_budget.update(new_config["budget"])
-            new_config = {**new_config, "budget": merged_budget}
-        merged.update(new_config)
+def get_config() -> AgentConfig:
+    """Get the current config snapshot (frozen — use update_config to change it)."""
+    return _config
 
-    if kwargs:
-        if "budget" in kwargs and isinstance(kwargs["budget"], dict):
-            merged_budget = merged.get("budget", {})
-            merged_budget.update(kwargs["budget"])
-            kwargs = {**kwargs, "budget": merged_budget}
-        merged.update(kwargs)
 
-    _config = AgentConfig(**merged)
-    _rate_limiter = RateLimiter(_config.budget.max_calls_per_day)
-    _budget_tracker = BudgetTracker(_config.budget)
+# ─── Core Execution ──────────────────────────────────────────────────────────
 
 
-def get_config() -> AgentConfig:
-    """Get the current config (for testing/inspection)."""
-    return deepcopy(_config)
+# Built with the validating constructors on purpose: with pydantic-core the
+# native validator is faster than model_construct()'s pure-Python path
+# (~4 µs vs ~8 µs here, far worse when defaults must be filled in).
 
+# Zero-usage metadata, one shared instance per model name — AgentMetadata is
+# frozen and the empty tool_calls is a tuple, so sharing is safe.
+_EMPTY_METADATA: dict[str, AgentMetadata] = {}
 
-# ─── Core Execution ──────────────────────────────────────────────────────────
+
+def _empty_metadata(model: str) -> AgentMetadata:
+    metadata = _EMPTY_METADATA.get(model)
+    if metadata is None:
+        metadata = _EMPTY_METADATA[model] = AgentMetadata(model=model, tool_calls=())
+    return metadata
 
 
 def _create_error_result(message: str) -> AgentResult:
@@ -96,13 +150,7 @@ def _create_error_result(message: str) -> AgentResult:
         data={},
         actions=[],
         confidence=0,
-        metadata=AgentMetadata(
-            model=_config.model,
-            tokens_used=0,
-            latency_ms=0,
-            tool_calls=[],
-            cached=False,
-        ),
+        metadata=_empty_metadata(_config.model),
     )
 
 
@@ -113,33 +161,224 @@ def _create_dry_run_result(persona_name: str) -> AgentResult:
         data={"dry_run": True},
         actions=[],
         confidence=1,
-        metadata=AgentMetadata(
-            model=_config.model,
-            tokens_used=0,
-            latency_ms=0,
-            tool_calls=[],
-            cached=False,
-        ),
+        metadata=_empty_metadata(_config.model),
     )
 
 
+_COST_PER_1M: Final[dict[str, float]] = {
+    "gemini-2.5-flash-lite": 0.01,
+    "gemini-3-flash-preview": 0.03,
+}
+
+
 def _estimate_cost(tokens: int, model: str) -> float:
     """Rough cost estimation based on model and token count."""
-    cost_per_1m = {
-        "gemini-2.5-flash-lite": 0.01,
-        "gemini-3-flash-preview": 0.03,
-    }
-    rate = cost_per_1m.get(model, 0.01)
-    return (tokens / 1_000_000) * rate
+    return tokens * _COST_PER_1M.get(model, 0.01) / 1_000_000
 
 
-async def execute_agent(
+# ─── Response Cache ──────────────────────────────────────────────────────────
+
+
+def _cache_key(
+    persona_name: str,
     prompt: str,
-    context: Any = None,
-    options: Optional[AgentCallOptions] = None,
+    context: str,
+    source_file: Optional[SourceFileInfo],
+    options: Optional[AgentCallOptions],
+) -> Optional[str]:
+    """Key for the response cache, or None when this call must not be cached.
+
+    Attached files are read at call time and may change on disk, so calls
+    with files always go to the provider.
+    """
+    if not _config.cache.enabled or (options and options.files):
+        return None
+    model_name = (options.model if options and options.model else None) or _config.model
+    shaping: Any = None
+    if options:
+        shaping = (
+            options.model_dump(
+                mode="json", include={"tools", "thinking", "response_format"}
+            ),
+            _schema_fingerprint(options.schema_model)
+            if isinstance(options.schema_model, type)
+            else None,
+        )
+    # The same Ollama tag can name different weights on different hosts
+    endpoint = _config.ollama_host if _config.provider == "ollama" else None
+    return make_cache_key(
+        _config.provider,
+        endpoint,
+        model_name,
+        persona_name,
+        prompt,
+        context,
+        format_source_for_context(source_file) if source_file else None,
+        shaping,
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _schema_fingerprint(schema_model: type) -> tuple[str, Optional[str]]:
+    """Name and JSON-schema digest of a ``schema_model``.
+
+    The cache can outlive the process, so editing a model's fields must
+    change the key even though its name stays the same.
+    """
+    name = f"{schema_model.__module__}.{schema_model.__qualname__}"
+    json_schema = getattr(schema_model, "model_json_schema", None)
+    return name, make_cache_key(json_schema()) if callable(json_schema) else None
+
+
+async def _semantic_lookup(
+    persona_name: str,
+    prompt: str,
+    context: str,
+    source_file: Optional[SourceFileInfo],
+    options: Optional[AgentCallOptions],
+) -> tuple[Optional[tuple[str, list[float]]], Optional[AgentResult]]:
+    """Embed ``prompt`` and look for a cached answer to a near-duplicate of it.
+
+    Returns the ``(scope, embedding)`` to index this call's answer under (None
+    when the semantic cache is off or embedding failed) and the cached result
+    of a similar enough prompt, if any. The scope is the cache key with the
+    prompt left blank, so nothing but the prompt may differ.
+
+    The embedding is a billable request, so callers run this only once the
+    call has been admitted; its usage is charged to the budget here.
+    """
+    if _config.cache.semantic_threshold is None or _config.provider != "google":
+        return None, None
+    embedding = await embed_prompt(prompt, _config)
+    if embedding is None:
+        return None, None
+    # The embeddings API reports no usage; ~4 characters per token
+    tokens = max(1, len(prompt) // 4)
+    _budget_tracker.record_usage(
+        tokens, _estimate_cost(tokens, _config.cache.semantic_model), calls=0
+    )
+    scope = _cache_key(persona_name, "", context, source_file, options)
+    if scope is None:
+        return None, None
+    similar = _semantic_index.nearest(scope, embedding)
+    return (scope, embedding), _response_cache.get(similar) if similar else None
+
+
+# Identical calls currently waiting on the provider, per event loop. Tasks
+# belong to the loop that created them, so the loop is part of the key.
+_inflight: dict[tuple[asyncio.AbstractEventLoop, str], "asyncio.Task[AgentResult]"] = {}
+# How many callers are waiting on each flight; the last to give up cancels it
+_flight_waiters: dict["asyncio.Task[AgentResult]", int] = {}
+
+
+def _start_flight(
+    flight: tuple[asyncio.AbstractEventLoop, str], call: Any
+) -> "asyncio.Task[AgentResult]":
+    """Run ``call`` as the shared task for ``flight`` until it finishes."""
+    task = asyncio.ensure_future(call)
+    _inflight[flight] = task
+
+    def _done(_: "asyncio.Task[AgentResult]") -> None:
+        if _inflight.get(flight) is task:
+            del _inflight[flight]
+
+    task.add_done_callback(_done)
+    return task
+
+
+async def _join_flight(
+    flight: tuple[asyncio.AbstractEventLoop, str],
+    task: "asyncio.Task[AgentResult]",
+    timeout: float,
 ) -> AgentResult:
-    """Execute an agent call. This is the core function behind agent()."""
+    """Wait for a shared call; only the last waiter to give up cancels it."""
+    _flight_waiters[task] = _flight_waiters.get(task, 0) + 1
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    finally:
+        waiting = _flight_waiters.pop(task) - 1
+        if waiting:
+            _flight_waiters[task] = waiting
+        elif not task.done():
+            task.cancel()
+            # Don't let a newcomer join a call that is being torn down
+            if _inflight.get(flight) is task:
+                del _inflight[flight]
+    if not done:
+        raise asyncio.TimeoutError
+    if task.cancelled():
+        raise RuntimeError("Identical in-flight call was cancelled")
+    return task.result()
+
+
+async def _settle(
+    call: Any, cache_key: Optional[str], semantic: Optional[tuple[str, list[float]]]
+) -> AgentResult:
+    """Await the provider, then account for the answer — once per request,
+    whichever of its callers are still waiting."""
+    result = await call
+    _account(result, cache_key, semantic)
+    return result
+
+
+def _account(
+    result: AgentResult,
+    cache_key: Optional[str],
+    semantic: Optional[tuple[str, list[float]]] = None,
+) -> None:
+    """Record a provider answer's usage and cache it."""
+    _budget_tracker.record_usage(
+        result.metadata.tokens_used,
+        _estimate_cost(result.metadata.tokens_used, result.metadata.model),
+    )
+    if cache_key is not None:
+        _response_cache.put(cache_key, result)
+        if semantic is not None and result.success:
+            _semantic_index.add(*semantic, cache_key)
+
+
+# ─── Batching ────────────────────────────────────────────────────────────────
+
+
+def _is_batchable(options: Optional[AgentCallOptions]) -> bool:
+    """Only plain calls can share a request — tools, files and custom schemas
+    change the request shape, and blocking calls opt out explicitly."""
+    if not _config.batch.enabled or _config.provider not in ("google", "ollama"):
+        return False
+    if options is None:
+        return True
+    return not (
+        options.mode == "blocking"
+        or options.tools
+        or options.files
+        or options.schema_model
+        or options.response_format
+    )
 
+
+async def _dispatch_batch(items: list[BatchItem]) -> list[AgentResult]:
+    """Send a group of coalesced calls as one row-marshaled provider request."""
+    persona, options = items[0].payload
+    call_rows = call_ollama_rows if _config.provider == "ollama" else call_google_rows
+    return await call_rows(
+        [item.prompt for item in items],
+        [item.context for item in items],
+        persona,
+        _config,
+        options,
+    )
+
+
+_batcher = BatchCoalescer(_dispatch_batch, _config.batch.wait_ms, _config.batch.max_size)
+
+
+# ─── Call Preparation ────────────────────────────────────────────────────────
+
+
+def _call_settings(
+    prompt: str, options: Optional[AgentCallOptions]
+) -> tuple[bool, PersonaDefinition]:
+    """Resolve the verbose flag and persona for a call."""
     # Resolve verbose flag: per-call option > global config
     verbose = (
         options.verbose
@@ -147,58 +386,54 @@ async def execute_agent(
         else _config.verbose
     )
 
-    # Determine persona
-    persona_name: PersonaName = (
-        options.persona if options and options.persona else _config.persona
-    )
+    # Determine persona — an explicit persona skips keyword detection
     persona = (
         get_persona(options.persona)
         if options and options.persona
-        else detect_persona(prompt, persona_name)
+        else detect_persona(prompt, _config.persona)
     )
 
     log_debug(f"Selected persona: {persona.name} ({persona.icon})")
+    return verbose, persona
 
-    # Dry run — log without calling API
-    if _config.dry_run:
-        format_dry_run(prompt, persona, context, verbose=verbose)
-        return _create_dry_run_result(persona.name)
-
-    # Check rate limits
-    if not _rate_limiter.try_consume():
-        format_rate_limit_warning(verbose=verbose)
-        return _create_error_result("Rate limited — too many calls. Try again later.")
-
-    # Check budget
-    budget_check = _budget_tracker.can_make_call()
-    if not budget_check.allowed:
-        format_budget_warning(budget_check.reason or "Budget exceeded", verbose=verbose)
-        return _create_error_result(budget_check.reason or "Budget exceeded")
 
+def _call_inputs(
+    prompt: str, context: Any, options: Optional[AgentCallOptions], verbose: bool
+) -> tuple[str, str, Optional[SourceFileInfo]]:
+    """Anonymized prompt and context, plus the detected caller source file."""
     # Anonymize context if enabled
     context_str = ""
     if context is not None:
-        processed = anonymize_value(context) if _config.anonymize else context
-
         # Handle Exception objects specially
         if isinstance(context, Exception):
+            # One joined string, innermost frames only unless verbose — the
+            # traceback is usually the bulk of the prompt's tokens
             err_obj = {
                 "type": type(context).__name__,
                 "message": str(context),
-                "traceback": traceback.format_exception(
-                    type(context), context, context.__traceback__
+                "traceback": "".join(
+                    traceback.format_exception(
+                        type(context),
+                        context,
+                        context.__traceback__,
+                        limit=None if verbose else -_config.max_traceback_frames,
+                    )
                 ),
             }
-            processed2 = anonymize_value(err_obj) if _config.anonymize else err_obj
             context_str = (
-                processed2
-                if isinstance(processed2, str)
-                else json.dumps(processed2, indent=2, default=str)
+                anonymize_json(err_obj) if _config.anonymize else fastjson.dumps(err_obj)
             )
-        elif isinstance(processed, str):
-            context_str = processed
+        elif isinstance(context, str):
+            context_str = anonymize(context) if _config.anonymize else context
         else:
-            context_str = json.dumps(processed, indent=2, default=str)
+            # Indentation only helps humans reading verbose output.
+            # anonymize_json screens the encoded text instead of walking the
+            # structure first, so clean context is traversed only once.
+            context_str = (
+                anonymize_json(context, indent=verbose)
+                if _config.anonymize
+                else fastjson.dumps(context, indent=verbose)
+            )
 
     # Anonymize prompt if enabled
     processed_prompt = (
@@ -234,17 +469,104 @@ async def execute_agent(
                     f"(line {source_file.line})"
                 )
 
+    return processed_prompt, context_str, source_file
+
+
+def _admit(verbose: bool) -> Optional[AgentResult]:
+    """Consume rate limit and check budget; the error result if refused."""
+    # Check rate limits
+    if not _rate_limiter.try_consume():
+        format_rate_limit_warning(verbose=verbose)
+        return _create_error_result("Rate limited — too many calls. Try again later.")
+
+    # Check budget
+    budget_check = _budget_tracker.can_make_call()
+    if not budget_check.allowed:
+        format_budget_warning(budget_check.reason or "Budget exceeded", verbose=verbose)
+        return _create_error_result(budget_check.reason or "Budget exceeded")
+    return None
+
+
+async def execute_agent(
+    prompt: str,
+    context: Any = None,
+    options: Optional[AgentCallOptions] = None,
+) -> AgentResult:
+    """Execute an agent call. This is the core function behind agent()."""
+
+    verbose, persona = _call_settings(prompt, options)
+
+    # Dry run — log without calling API
+    if _config.dry_run:
+        format_dry_run(prompt, persona, context, verbose=verbose)
+        return _create_dry_run_result(persona.name)
+
+    processed_prompt, context_str, source_file = _call_inputs(
+        prompt, context, options, verbose
+    )
+
     # Collect explicit file attachments
     files = options.files if options else None
 
+    # Identical call already answered or in flight — no new API call, so no
+    # rate limit or budget
+    cache_key = _cache_key(persona.name, processed_prompt, context_str, source_file, options)
+    flight: Optional[tuple[asyncio.AbstractEventLoop, str]] = None
+    shared: Optional["asyncio.Task[AgentResult]"] = None
+    semantic: Optional[tuple[str, list[float]]] = None
+    if cache_key is not None:
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            log_debug("Response cache hit")
+            format_result(cached, persona, verbose=verbose)
+            return cached
+        flight = (asyncio.get_running_loop(), cache_key)
+        shared = _inflight.get(flight)
+
+    if shared is None:
+        refused = _admit(verbose)
+        if refused is not None:
+            return refused
+        if cache_key is not None:
+            semantic, cached = await _semantic_lookup(
+                persona.name, processed_prompt, context_str, source_file, options
+            )
+            if cached is not None:
+                log_debug("Semantic cache hit")
+                format_result(cached, persona, verbose=verbose)
+                return cached
+            # An identical call may have taken off while the prompt was embedded
+            shared = _inflight.get(flight)
+
     # Start spinner
     spinner = start_spinner(persona, processed_prompt, verbose=verbose)
 
     try:
         # Execute with timeout (convert ms to seconds)
         timeout_sec = _config.timeout / 1000.0
+
+        if shared is not None:
+            log_debug("Joining identical in-flight call")
+            # A copy: the leader's data and actions stay its own
+            result = detach_result(await _join_flight(flight, shared, timeout_sec))
+            stop_spinner(spinner, result.success)
+            format_result(result, persona, verbose=verbose)
+            return result
+
         # Route to the appropriate provider
-        if _config.provider == "ollama":
+        if _is_batchable(options):
+            model_name = (options.model if options and options.model else None) or _config.model
+            row_context = context_str
+            if source_file:
+                row_context += "\n" + format_source_for_context(source_file)
+            # Everything else that shapes the request must match too: the
+            # group is sent with the first call's options
+            thinking = options.thinking if options else None
+            provider_call = _batcher.submit(
+                (persona.name, model_name, thinking), processed_prompt, row_context,
+                payload=(persona, options),
+            )
+        elif _config.provider == "ollama":
             provider_call = call_ollama(
                 processed_prompt, context_str, persona, _config, options,
                 source_file=source_file, files=files,
@@ -255,13 +577,13 @@ async def execute_agent(
                 source_file=source_file, files=files,
             )
 
-        result = await asyncio.wait_for(provider_call, timeout=timeout_sec)
-
-        # Record usage
-        _budget_tracker.record_usage(
-            result.metadata.tokens_used,
-            _estimate_cost(result.metadata.tokens_used, result.metadata.model),
-        )
+        provider_call = _settle(provider_call, cache_key, semantic)
+        if flight is not None:
+            # Waited on like any joiner, so the leader timing out doesn't
+            # cancel the call for callers with time left
+            result = await _join_flight(flight, _start_flight(flight, provider_call), timeout_sec)
+        else:
+            result = await asyncio.wait_for(provider_call, timeout=timeout_sec)
 
         # Stop spinner and format output
         stop_spinner(spinner, result.success)
@@ -279,3 +601,113 @@ async def execute_agent(
         stop_spinner(spinner, False)
         format_error(err, persona, verbose=verbose)
         return _create_error_result(str(err))
+
+
+# ─── Streaming ───────────────────────────────────────────────────────────────
+
+
+async def _single(call: Awaitable[AgentResult]) -> AsyncIterator[AgentResult]:
+    """A provider call that can't stream, as a one-result stream."""
+    yield await call
+
+
+async def execute_agent_stream(
+    prompt: str,
+    context: Any = None,
+    options: Optional[AgentCallOptions] = None,
+) -> AsyncIterator[AgentResult]:
+    """Streaming execute_agent: partial results, then the final one.
+
+    Same pipeline as execute_agent — anonymization, caller source, response
+    cache, rate limit and budget — but Gemini's answer is yielded as it is
+    written (partials have ``metadata.partial`` set) and verbose output
+    echoes the text as it arrives. Cache hits, refusals, errors and Ollama
+    calls yield a single final result. Streamed calls are never batched or
+    joined with identical in-flight calls.
+
+    The provider request holds a throttle slot until it finishes; stopping
+    early closes it as soon as this generator is closed (``aclose()``, or
+    ``contextlib.aclosing`` around the loop).
+    """
+    verbose, persona = _call_settings(prompt, options)
+
+    # Dry run — log without calling API
+    if _config.dry_run:
+        format_dry_run(prompt, persona, context, verbose=verbose)
+        yield _create_dry_run_result(persona.name)
+        return
+
+    processed_prompt, context_str, source_file = _call_inputs(
+        prompt, context, options, verbose
+    )
+    files = options.files if options else None
+
+    cache_key = _cache_key(persona.name, processed_prompt, context_str, source_file, options)
+    if cache_key is not None:
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            log_debug("Response cache hit")
+            format_result(cached, persona, verbose=verbose)
+            yield cached
+            return
+
+    refused = _admit(verbose)
+    if refused is not None:
+        yield refused
+        return
+
+    if _config.provider == "ollama":
+        stream = _single(
+            call_ollama(
+                processed_prompt, context_str, persona, _config, options,
+                source_file=source_file, files=files,
+            )
+        )
+    else:
+        stream = call_google_stream(
+            processed_prompt, context_str, persona, _config, options,
+            source_file=source_file, files=files,
+        )
+
+    writer = start_streaming_spinner(verbose=verbose)
+    shown = 0
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + _config.timeout / 1000.0
+    final: Optional[AgentResult] = None
+    error: Optional[Exception] = None
+    try:
+        # One deadline for the whole answer, applied per chunk so the
+        # consumer's own code between chunks is never cancelled
+        while final is None:
+            result = await asyncio.wait_for(anext(stream), deadline - loop.time())
+            if not result.metadata.partial:
+                final = result
+                break
+            if writer is not None:
+                text = result.data["partial"]
+                writer.push(text[shown:])
+                shown = len(text)
+            yield result
+    except StopAsyncIteration:
+        error = RuntimeError("Stream ended without a result")
+    except asyncio.TimeoutError:
+        error = TimeoutError(f"Agent timed out after {_config.timeout}ms")
+    except Exception as err:
+        error = err
+    finally:
+        # Releases the provider's throttle slot and connection right away
+        await stream.aclose()
+        if writer is not None:
+            if shown:
+                writer.push("\n")
+            await writer.aclose()
+
+    if error is not None:
+        format_error(error, persona, verbose=verbose)
+        yield _create_error_result(str(error))
+        return
+
+    assert final is not None
+    _account(final, cache_key)
+    format_result(final, persona, verbose=verbose)
+    yield final
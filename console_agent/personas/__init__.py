@@ -4,7 +4,13 @@ Persona registry — auto-detection and lookup.
 
 from __future__ import annotations
 
-from typing import Dict
+import functools
+from typing import Dict, Optional, Tuple
+
+try:  # Optional accelerator: pip install console-agent[fast]
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 from ..types import PersonaDefinition, PersonaName
 from .architect import architect_persona
@@ -20,20 +26,69 @@ personas: Dict[PersonaName, PersonaDefinition] = {
 }
 
 
+# Specific personas in priority order: security > debugger > architect
+_PRIORITY: Tuple[PersonaName, ...] = ("security", "debugger", "architect")
+
+# Fallback scan: keywords pre-lowered once, grouped by priority rank
+_KEYWORDS: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(kw.lower() for kw in personas[name].keywords) for name in _PRIORITY
+)
+
+
+def _build_automaton() -> Optional["ahocorasick.Automaton"]:
+    """Build one Aho-Corasick automaton mapping every keyword to its best rank."""
+    if ahocorasick is None or not any(_KEYWORDS):
+        return None
+    automaton = ahocorasick.Automaton()
+    for rank, keywords in enumerate(_KEYWORDS):
+        for kw in keywords:
+            if automaton.get(kw, rank) >= rank:
+                automaton.add_word(kw, rank)
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton()
+
+
+def _match_rank(lower: str) -> Optional[int]:
+    """Return the best (lowest) priority rank of any keyword in ``lower``."""
+    if _AUTOMATON is not None:
+        best: Optional[int] = None
+        for _, rank in _AUTOMATON.iter(lower):
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return best
+
+    for rank, keywords in enumerate(_KEYWORDS):
+        if any(kw in lower for kw in keywords):
+            return rank
+    return None
+
+
+# Prompts longer than this are scanned every time rather than pinned in the cache
+_MAX_CACHED_PROMPT = 2048
+
+
+# Keyed on the raw prompt, so cache hits never lower it at all — the lowered
+# copy only exists on a miss, and there is nothing to thread in from callers.
+@functools.lru_cache(maxsize=1024)
+def _detect_name(prompt: str, default_persona: PersonaName) -> PersonaName:
+    rank = _match_rank(prompt.lower())
+    return _PRIORITY[rank] if rank is not None else default_persona
+
+
 def detect_persona(prompt: str, default_persona: PersonaName) -> PersonaDefinition:
     """Auto-detect the best persona based on keywords in the prompt.
 
-    Returns the explicitly set persona if no keywords match.
+    Returns the explicitly set persona if no keywords match. Results for
+    repeated prompts (e.g. agent() in a loop) come from an LRU cache of names.
     """
-    lower = prompt.lower()
-
-    # Check specific personas in priority order: security > debugger > architect
-    for name in ("security", "debugger", "architect"):
-        persona = personas[name]  # type: ignore[index]
-        if any(kw in lower for kw in persona.keywords):
-            return persona
-
-    return personas[default_persona]
+    if len(prompt) > _MAX_CACHED_PROMPT:
+        return personas[_detect_name.__wrapped__(prompt, default_persona)]
+    return personas[_detect_name(prompt, default_persona)]
 
 
 def get_persona(name: PersonaName) -> PersonaDefinition:
@@ -0,0 +1,322 @@
+"""
+Helpers shared by the Gemini and Ollama providers — instructions,
+user-message assembly, tolerant parsing of model text, and result field
+coercion.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import operator
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..types import AgentMetadata, AgentOutputSchema, AgentResult
+from ..utils import fastjson
+from ..utils.caller_file import SourceFileInfo, format_source_for_context
+from ..utils.format import log_debug
+
+
+# ─── Instructions ────────────────────────────────────────────────────────────
+
+CUSTOM_SCHEMA_INSTRUCTION = (
+    "\n\nIMPORTANT: You must respond with structured data matching the requested "
+    "output schema. Do not include AgentResult wrapper fields — just return "
+    "the data matching the schema."
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _instructions(system_prompt: str, suffix: str) -> str:
+    """Persona prompt plus instruction suffix, built once per pair."""
+    return system_prompt + suffix
+
+
+# ─── User message ────────────────────────────────────────────────────────────
+
+
+def _build_user_message(
+    prompt: str,
+    context: str,
+    source_file: Optional[SourceFileInfo] = None,
+) -> str:
+    """Build the user message combining prompt, context, and auto-detected source.
+
+    Joined once, so a large context is copied a single time; a bare prompt
+    is returned as-is.
+    """
+    if not context and not source_file:
+        return prompt
+
+    parts: list[str] = [prompt]
+
+    if context:
+        parts += ("\n\n--- Context ---\n", context)
+
+    if source_file:
+        parts += ("\n\n", format_source_for_context(source_file))
+
+    return "".join(parts)
+
+
+# ─── Fallback response parsing ───────────────────────────────────────────────
+
+# Compiled once at import. Objects are located by a linear token scan rather
+# than a greedy {[\s\S]*} search, which backtracks over the whole text.
+_FENCE_RE = re.compile(r"```(?:json)?\s*\n?([\s\S]*?)\n?\s*```")
+# Characters that matter when scanning for a balanced JSON object
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+_DECODER = json.JSONDecoder()
+
+
+def _coerce_data(raw: Any) -> Dict[str, Any]:
+    """Ensure the data field is always a dict (LLM sometimes returns a list)."""
+    if isinstance(raw, dict):
+        return raw
+    if isinstance(raw, list):
+        return {"items": raw}
+    if raw is None:
+        return {}
+    return {"value": raw}
+
+
+# Dict-shaped actions: the first truthy one of these keys is the action text
+_ACTION_KEYS = ("recommendation", "action", "description", "name")
+
+
+def _coerce_actions(raw: Any) -> List[str]:
+    """Ensure actions is always a list of strings (LLM sometimes returns dicts)."""
+    if not isinstance(raw, list):
+        return [str(raw)] if raw else []
+    result: List[str] = []
+    append = result.append
+    for item in raw:
+        kind = type(item)  # parsed JSON: exact str/dict, so skip isinstance
+        if kind is str:
+            append(item)
+        elif kind is dict:
+            for key in _ACTION_KEYS:
+                value = item.get(key)
+                if value:
+                    append(value)
+                    break
+            else:
+                append(fastjson.dumps(item))
+        else:
+            append(str(item))
+    return result
+
+
+def _find_json_object(text: str) -> Optional[str]:
+    """Return the first balanced ``{...}`` span in ``text``, or None.
+
+    One left-to-right pass that ignores braces inside JSON strings; the
+    token regex skips everything else in C.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_string = False
+    escaped_at = -1
+    for match in _JSON_TOKEN_RE.finditer(text, start):
+        i = match.start()
+        if i == escaped_at:
+            continue
+        ch = text[i]
+        if in_string:
+            if ch == "\\":
+                escaped_at = i + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return None
+
+
+def _extract_json(text: str) -> Any:
+    """Return the JSON value in ``text`` (bare, fenced or embedded), or None."""
+    # Fast path: JSON mode answers are a bare object, so no regex is needed
+    stripped = text.strip()
+    if stripped.startswith("{"):
+        try:
+            return fastjson.loads(stripped)
+        except json.JSONDecodeError:
+            pass
+
+    # Try extracting JSON from markdown code fences
+    if "```" in text:
+        match = _FENCE_RE.search(text)
+        if match:
+            try:
+                return fastjson.loads(match.group(1))
+            except json.JSONDecodeError:
+                pass
+
+    # Try finding JSON object in text
+    candidate = _find_json_object(text)
+    if candidate:
+        try:
+            return fastjson.loads(candidate)
+        except json.JSONDecodeError:
+            pass
+        # The first {...} was prose (e.g. "{name}"): decode in place from each
+        # later brace. A failed attempt stops at the first invalid character.
+        start = text.find("{", text.find("{") + 1)
+        while start >= 0:
+            try:
+                return _DECODER.raw_decode(text, start)[0]
+            except json.JSONDecodeError:
+                start = text.find("{", start + 1)
+
+    return None
+
+
+def _parse_response(text: str) -> Optional[Dict[str, Any]]:
+    """Fallback parser for unstructured text responses."""
+    parsed = _extract_json(text)
+    if parsed is not None:
+        return parsed
+
+    # Return as raw fallback
+    return {
+        "success": True,
+        "summary": text[:200],
+        "data": {"raw": text},
+        "actions": [],
+        "confidence": 0.5,
+    }
+
+
+def _schema_data(content: Any) -> Dict[str, Any]:
+    """Data for a custom-schema answer: dicts as-is, models dumped, text parsed."""
+    if isinstance(content, dict):
+        return content
+    model_dump = getattr(content, "model_dump", None)
+    if model_dump is not None:
+        return model_dump()
+    # Text answer (may be markdown-wrapped); unparseable text is kept whole
+    text = str(content)
+    parsed = _extract_json(text)
+    return parsed if isinstance(parsed, dict) else {"result": text}
+
+
+def _extract_tokens(run_response: Any) -> int:
+    """Extract token usage from an Agno run response."""
+    try:
+        metrics = run_response.metrics
+        # Agno's Metrics always carries all three fields: read them directly
+        return metrics.total_tokens or (metrics.input_tokens or 0) + (metrics.output_tokens or 0)
+    except AttributeError:
+        pass
+    # No metrics at all, or a partial metrics object
+    metrics = getattr(run_response, "metrics", None)
+    if not metrics:
+        return 0
+    return getattr(metrics, "total_tokens", 0) or (
+        (getattr(metrics, "input_tokens", 0) or 0) + (getattr(metrics, "output_tokens", 0) or 0)
+    )
+
+
+# ─── Structured-output results ───────────────────────────────────────────────
+
+
+# The six AgentResult fields of a JSON answer, fetched in one call
+_RESULT_FIELDS = operator.itemgetter(
+    "success", "summary", "reasoning", "data", "actions", "confidence"
+)
+
+
+def _content_to_fields(
+    content: Any, use_custom_schema: bool
+) -> Tuple[bool, str, Optional[str], Any, List[str], float]:
+    """Normalize structured-output content to AgentResult fields.
+
+    Returns ``(success, summary, reasoning, data, actions, confidence)``
+    whichever shape Agno handed back — schema data, an AgentOutputSchema
+    instance, a dict or plain text — so the caller builds one result.
+    """
+    # Custom schema: the content *is* the data
+    if use_custom_schema and content:
+        custom_data = _schema_data(content)
+        log_debug("Custom schema output received, wrapping in AgentResult")
+        summary = f"Structured output returned ({len(custom_data)} fields)"
+        return True, summary, None, custom_data, [], 1.0
+
+    # Agno with response_model returns a Pydantic instance
+    if isinstance(content, AgentOutputSchema):
+        return (
+            content.success, content.summary, content.reasoning, content.data,
+            content.actions, content.confidence,
+        )
+
+    # Any other model: read its fields rather than parsing its repr()
+    if isinstance(content, BaseModel):
+        content = content.model_dump()
+
+    # It might come back as a dict — usually with every field present
+    if isinstance(content, dict):
+        try:
+            success, summary, reasoning, data, actions, confidence = _RESULT_FIELDS(content)
+        except KeyError:
+            pass
+        else:
+            return success, summary, reasoning, data, _coerce_actions(actions), confidence
+        return (
+            content.get("success", True),
+            content.get("summary", ""),
+            content.get("reasoning"),
+            content.get("data", {}),
+            _coerce_actions(content.get("actions", [])),
+            content.get("confidence", 0.5),
+        )
+
+    # Fallback: parse text response
+    text = str(content) if content else ""
+    parsed = _parse_response(text) or {}
+    return (
+        parsed.get("success", True),
+        parsed.get("summary", text[:200]),
+        parsed.get("reasoning"),
+        parsed.get("data", {"raw": text}),
+        _coerce_actions(parsed.get("actions", [])),
+        parsed.get("confidence", 0.5),
+    )
+
+
+def _structured_result(
+    content: Any,
+    use_custom_schema: bool,
+    model_name: str,
+    tokens_used: int,
+    latency_ms: int,
+) -> AgentResult:
+    """Build the AgentResult for a structured-output run, whatever its content."""
+    success, summary, reasoning, data, actions, confidence = _content_to_fields(
+        content, use_custom_schema
+    )
+    # Our own measurements — nothing to validate
+    metadata = AgentMetadata.model_construct(
+        model=model_name, tokens_used=tokens_used, latency_ms=latency_ms, cached=False
+    )
+    # Schema output and AgentOutputSchema instances were validated by Agno, so
+    # only model text parsed by hand goes through AgentResult validation
+    trusted = bool(use_custom_schema and content) or isinstance(content, AgentOutputSchema)
+    return (AgentResult.model_construct if trusted else AgentResult)(
+        success=success,
+        summary=summary,
+        reasoning=reasoning,
+        data=_coerce_data(data),
+        actions=actions,
+        confidence=confidence,
+        metadata=metadata,
+    )
@@ -11,25 +11,47 @@ Two execution paths (mirroring the TypeScript SDK):
 
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
+import importlib.util
 import os
 import re
 import time
-from typing import Any, Dict, List, Optional
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from ..tools import TOOLS_MIN_TIMEOUT, has_explicit_tools, resolve_tools
 from ..types import (
     AgentCallOptions,
     AgentConfig,
     AgentMetadata,
-    AgentOutputSchema,
     AgentResult,
     FileAttachment,
     PersonaDefinition,
+    ResponseFormat,
     ToolCall,
 )
-from ..utils.caller_file import SourceFileInfo, format_source_for_context
+from ..utils import fastjson
+from ..utils.batch import (
+    BATCH_RESPONSE_SCHEMA,
+    BATCH_SYSTEM_INSTRUCTION,
+    fail_rows,
+    marshal_rows,
+    unmarshal_rows,
+)
+from ..utils.caller_file import SourceFileInfo
 from ..utils.format import log_debug
+from ..utils.throttle import RequestThrottle
+from ._common import (
+    CUSTOM_SCHEMA_INSTRUCTION,
+    _build_user_message,
+    _coerce_actions,
+    _coerce_data,
+    _extract_tokens,
+    _instructions,
+    _parse_response,
+    _structured_result,
+)
 
 
 # ─── JSON prompt suffix for tool-mode (no structured output available) ───────
@@ -44,108 +66,52 @@ JSON_RESPONSE_INSTRUCTION = (
     '"actions": ["tools/steps used"], "confidence": 0.95}'
 )
 
+# ─── Instruction suffixes for the structured-output path ─────────────────────
 
-def _coerce_data(raw: Any) -> Dict[str, Any]:
-    """Ensure the data field is always a dict (LLM sometimes returns a list)."""
-    if isinstance(raw, dict):
-        return raw
-    if isinstance(raw, list):
-        return {"items": raw}
-    if raw is None:
-        return {}
-    return {"value": raw}
-
-
-def _coerce_actions(raw: Any) -> List[str]:
-    """Ensure actions is always a list of strings (LLM sometimes returns dicts)."""
-    if not isinstance(raw, list):
-        return [str(raw)] if raw else []
-    result: List[str] = []
-    for item in raw:
-        if isinstance(item, str):
-            result.append(item)
-        elif isinstance(item, dict):
-            # Extract a meaningful string from the dict
-            result.append(
-                item.get("recommendation")
-                or item.get("action")
-                or item.get("description")
-                or item.get("name")
-                or json.dumps(item, default=str)
-            )
-        else:
-            result.append(str(item))
-    return result
-
-
-def _parse_response(text: str) -> Optional[Dict[str, Any]]:
-    """Fallback parser for unstructured text responses."""
-    # Try direct JSON parse
-    try:
-        return json.loads(text)
-    except (json.JSONDecodeError, TypeError):
-        pass
+JSON_FORMAT_INSTRUCTION = (
+    "\n\nYou MUST respond with a valid JSON object in this exact format:\n"
+    '{"success": true/false, "summary": "one-line conclusion", '
+    '"reasoning": "your thought process or null", '
+    '"data": {"key": "value pairs with findings"}, '
+    '"actions": ["list of steps used"], '
+    '"confidence": 0.0-1.0}'
+)
 
-    # Try extracting JSON from markdown code fences
-    match = re.search(r"```(?:json)?\s*\n?([\s\S]*?)\n?\s*```", text)
-    if match:
-        try:
-            return json.loads(match.group(1))
-        except (json.JSONDecodeError, TypeError):
-            pass
 
-    # Try finding JSON object in text
-    obj_match = re.search(r"\{[\s\S]*\}", text)
-    if obj_match:
-        try:
-            return json.loads(obj_match.group(0))
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-    # Return as raw fallback
-    return {
-        "success": True,
-        "summary": text[:200],
-        "data": {"raw": text},
-        "actions": [],
-        "confidence": 0.5,
-    }
+# ─── Results ─────────────────────────────────────────────────────────────────
 
 
-def _extract_tokens(run_response: Any) -> int:
-    """Extract token usage from an Agno run response."""
-    tokens_used = 0
-    if hasattr(run_response, "metrics") and run_response.metrics:
-        metrics = run_response.metrics
-        tokens_used = getattr(metrics, "total_tokens", 0) or 0
-        if not tokens_used:
-            input_tokens = getattr(metrics, "input_tokens", 0) or 0
-            output_tokens = getattr(metrics, "output_tokens", 0) or 0
-            tokens_used = input_tokens + output_tokens
-    return tokens_used
+def _build_result(
+    parsed: Optional[Dict[str, Any]],
+    text: str,
+    model_name: str,
+    tokens_used: int,
+    latency_ms: int,
+    tool_calls: List[ToolCall],
+) -> AgentResult:
+    """Build an AgentResult from a parsed text response, defaulting to the raw text."""
+    parsed = parsed or {}
+    return AgentResult(
+        success=parsed.get("success", True),
+        summary=parsed.get("summary", text[:200]),
+        reasoning=parsed.get("reasoning"),
+        data=_coerce_data(parsed.get("data", {"raw": text})),
+        actions=_coerce_actions(parsed.get("actions", []))
+        or [tc.name for tc in tool_calls],
+        confidence=parsed.get("confidence", 0.5),
+        metadata=AgentMetadata(
+            model=model_name,
+            tokens_used=tokens_used,
+            latency_ms=latency_ms,
+            tool_calls=tool_calls,
+            cached=False,
+        ),
+    )
 
 
 # ─── Main Entry Point ────────────────────────────────────────────────────────
 
 
-def _build_user_message(
-    prompt: str,
-    context: str,
-    source_file: Optional[SourceFileInfo] = None,
-) -> str:
-    """Build the user message combining prompt, context, and auto-detected source."""
-    parts: list[str] = [prompt]
-
-    if context:
-        parts.append(f"\n--- Context ---\n{context}")
-
-    if source_file:
-        formatted = format_source_for_context(source_file)
-        parts.append(f"\n{formatted}")
-
-    return "\n".join(parts)
-
-
 def _build_agno_files(
     files: Optional[List[FileAttachment]],
 ) -> Optional[List[Any]]:
@@ -166,6 +132,188 @@ def _build_agno_files(
     return agno_files if agno_files else None
 
 
+# ─── Agno classes ────────────────────────────────────────────────────────────
+
+# Imported on first use so `import console_agent` stays light; cached here so
+# each call skips the import machinery.
+_agno_classes: Optional[Tuple[Any, Any]] = None
+
+
+def _agno() -> Tuple[Any, Any]:
+    """Return Agno's ``(Agent, Gemini)`` classes."""
+    global _agno_classes
+    if _agno_classes is None:
+        from agno.agent import Agent
+        from agno.models.google import Gemini
+
+        _agno_classes = (Agent, Gemini)
+    return _agno_classes
+
+
+async def _load_agno() -> Tuple[Any, Any]:
+    """``_agno()``, with the one-time import run off the event loop.
+
+    Importing Agno and the Gemini SDK takes a few hundred ms on the first
+    call; a worker thread keeps the loop (spinner, other requests) running.
+    """
+    if _agno_classes is not None:
+        return _agno_classes
+    return await asyncio.to_thread(_agno)
+
+
+# ─── Request throttle ────────────────────────────────────────────────────────
+
+_throttle: Optional[RequestThrottle] = None
+
+
+def _request_throttle(config: AgentConfig) -> RequestThrottle:
+    """Return the process-wide throttle, rebuilt if its settings changed."""
+    global _throttle
+    settings = config.throttle
+    throttle = _throttle
+    if (
+        throttle is None
+        or throttle.rpm != settings.rpm
+        or throttle.max_concurrency != settings.max_concurrency
+    ):
+        throttle = _throttle = RequestThrottle(settings.rpm, settings.max_concurrency)
+    return throttle
+
+
+# ─── Shared client ───────────────────────────────────────────────────────────
+
+# genai's async transport is tied to the event loop it first ran on, so one
+# client is kept for the current (loop, api_key) pair. Long-lived loops — the
+# shared run-sync loop, an app's own loop — reuse pooled TLS connections
+# across calls; a new loop simply replaces the slot. Tool-less Gemini models
+# built on that client are kept alongside it, one per (model id, service tier,
+# batch schema or not).
+#
+# With h2 installed (console-agent[fast]) genai's httpx transport speaks
+# HTTP/2: concurrent requests share one TLS connection as multiplexed streams
+# instead of each opening its own. Without it, HTTP/1.1 keep-alive as before.
+# Some google-genai releases switch to aiohttp whenever it is installed and
+# drop the httpx args, so HTTP/2 is only asked for when aiohttp is absent.
+_HTTP2 = (
+    importlib.util.find_spec("h2") is not None
+    and importlib.util.find_spec("aiohttp") is None
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _genai_takes_client_args() -> bool:
+    """Whether the installed google-genai's HttpOptions has async_client_args."""
+    from google.genai import types
+
+    return "async_client_args" in types.HttpOptions.model_fields
+
+
+def _client_params() -> Optional[Dict[str, Any]]:
+    """genai client params for the shared client (fresh — Agno adds headers in place)."""
+    if not _HTTP2 or not _genai_takes_client_args():
+        return None
+    return {"http_options": {"async_client_args": {"http2": True}}}
+
+
+# genai clients bind their connection pool to the loop that first used them,
+# so each loop gets its own, per API key, with the models built on it. Sync
+# agent() (the runsync loop) and await agent.arun() on the app's loop then
+# each keep theirs instead of rebuilding one on every switch.
+_client_slots: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop,
+    Dict[Optional[str], Tuple[Any, Dict[Tuple[str, Optional[str], bool], Any]]],
+] = weakref.WeakKeyDictionary()
+
+
+def _current_slot(
+    api_key: Optional[str],
+) -> Tuple[Any, Dict[Tuple[str, Optional[str], bool], Any]]:
+    loop = asyncio.get_running_loop()
+    slots = _client_slots.get(loop)
+    if slots is None:
+        slots = _client_slots[loop] = {}
+    slot = slots.get(api_key)
+    if slot is None:
+        # Let Agno build it so env handling (Vertex AI, default key) stays identical
+        client = _agno()[1](api_key=api_key, client_params=_client_params()).get_client()
+        slot = slots[api_key] = (client, {})
+    return slot
+
+
+def _shared_client(api_key: Optional[str]) -> Any:
+    """Return a genai client reusable by every Gemini model on this loop."""
+    return _current_slot(api_key)[0]
+
+
+def _shared_model(
+    model_name: str,
+    api_key: Optional[str],
+    service_tier: Optional[str] = None,
+    batch: bool = False,
+) -> Any:
+    """Return the tool-less Gemini model for ``model_name`` on this loop's client.
+
+    Gemini models keep no per-run state (tools and messages are passed per
+    request), so one instance serves every structured-output call with the
+    same service tier. Row-marshaled batches get their own instance, which
+    constrains the answer to BATCH_RESPONSE_SCHEMA. Agents are still built
+    per call — an Agno Agent pins a session and accumulates runs.
+    """
+    client, models = _current_slot(api_key)
+    key = (model_name, service_tier, batch)
+    model = models.get(key)
+    if model is None:
+        model = models[key] = _agno()[1](
+            id=model_name,
+            api_key=api_key,
+            client=client,
+            **_tier_kwargs(service_tier, _batch_model_kwargs() if batch else None),
+        )
+    return model
+
+
+@functools.lru_cache(maxsize=None)
+def _genai_supports(field: str) -> bool:
+    """Whether the installed google-genai's GenerateContentConfig has ``field``."""
+    from google.genai import types
+
+    return field in types.GenerateContentConfig.model_fields
+
+
+def _batch_model_kwargs() -> Dict[str, Any]:
+    """Gemini kwargs asking for a JSON answer matching BATCH_RESPONSE_SCHEMA.
+
+    The schema goes out as ``response_json_schema``: the OpenAPI subset behind
+    ``response_schema`` rejects the free-form ``data`` object. google-genai
+    releases without that field still get plain JSON output.
+    """
+    generation: Dict[str, Any] = {"response_mime_type": "application/json"}
+    if _genai_supports("response_json_schema"):
+        generation["response_json_schema"] = BATCH_RESPONSE_SCHEMA
+    return {"generative_model_kwargs": generation}
+
+
+def _tier_kwargs(
+    service_tier: Optional[str], model_kwargs: Optional[Mapping[str, Any]] = None
+) -> Dict[str, Any]:
+    """Gemini kwargs requesting ``service_tier``, merged into ``model_kwargs``.
+
+    Agno copies ``generative_model_kwargs`` into every GenerateContentConfig,
+    so the tier rides along with any tools already injected there. That
+    config rejects unknown fields, so on google-genai releases that predate
+    ``service_tier`` the tier is dropped rather than failing every call.
+    """
+    kwargs = dict(model_kwargs or {})
+    if service_tier is not None and not _genai_supports("service_tier"):
+        log_debug(f"google-genai has no service_tier; ignoring {service_tier!r}")
+    elif service_tier is not None:
+        kwargs["generative_model_kwargs"] = {
+            **kwargs.get("generative_model_kwargs", {}),
+            "service_tier": service_tier,
+        }
+    return kwargs
+
+
 async def call_google(
     prompt: str,
     context: str,
@@ -174,14 +322,17 @@ async def call_google(
     options: Optional[AgentCallOptions] = None,
     source_file: Optional[SourceFileInfo] = None,
     files: Optional[List[FileAttachment]] = None,
+    batch: bool = False,
 ) -> AgentResult:
     """Call the Google Gemini provider via Agno Agent.
 
     Routes to one of two paths:
     1. WITH tools → _call_with_tools (provider native tools, text response)
     2. WITHOUT tools → _call_with_structured_output (JSON mode)
+
+    ``batch`` marks a row-marshaled request from call_google_rows.
     """
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     model_name = (options.model if options and options.model else None) or config.model
 
     log_debug(f"Using model: {model_name}")
@@ -198,17 +349,237 @@ async def call_google(
     if use_tools:
         log_debug("Tools requested — using tools path (no structured output)")
         return await _call_with_tools(
-            prompt, context, persona, config, options, api_key, model_name, start_time,
+            prompt, context, persona, config, options, api_key, model_name, start_ns,
             source_file, files,
         )
 
     log_debug("No tools — using structured output path")
     return await _call_with_structured_output(
-        prompt, context, persona, config, options, api_key, model_name, start_time,
-        source_file, files,
+        prompt, context, persona, config, options, api_key, model_name, start_ns,
+        source_file, files, batch,
     )
 
 
+# ─── Row-marshaled batches ───────────────────────────────────────────────────
+
+
+async def call_google_rows(
+    prompts: Sequence[str],
+    contexts: Sequence[str],
+    persona: PersonaDefinition,
+    config: AgentConfig,
+    options: Optional[AgentCallOptions] = None,
+) -> List[AgentResult]:
+    """Answer several independent prompts with ONE Gemini request.
+
+    Prompts are row-marshaled as JSON lines and the model returns one result
+    per row (see utils.batch). A failed request fails every row.
+    """
+    if len(prompts) == 1:
+        return [await call_google(prompts[0], contexts[0], persona, config, options)]
+
+    batch_options = (options or AgentCallOptions()).model_copy(
+        update={"response_format": ResponseFormat(schema=BATCH_RESPONSE_SCHEMA)}
+    )
+    result = await call_google(
+        marshal_rows(list(prompts), list(contexts)), "", persona, config, batch_options,
+        batch=True,
+    )
+    if not result.success:
+        return fail_rows(result, len(prompts))
+    return unmarshal_rows(result.data, len(prompts), result.metadata)
+
+
+async def call_google_batch(
+    prompts: Sequence[str],
+    context: str,
+    persona: PersonaDefinition,
+    config: AgentConfig,
+    options: Optional[AgentCallOptions] = None,
+    batch_size: Optional[int] = None,
+) -> List[AgentResult]:
+    """Answer many prompts sharing one context, ``batch_size`` per request.
+
+    Defaults to ``config.batch.max_size`` prompts per request; the requests
+    themselves run concurrently. Tools rule out structured output, so with
+    tools every prompt gets its own call. Results keep the input order.
+    """
+    if not prompts:
+        return []
+    if has_explicit_tools(options) and not config.local_only:
+        return list(
+            await asyncio.gather(
+                *(call_google(p, context, persona, config, options) for p in prompts)
+            )
+        )
+
+    size = max(1, batch_size or config.batch.max_size)
+    chunks = [prompts[i : i + size] for i in range(0, len(prompts), size)]
+    answers = await asyncio.gather(
+        *(
+            call_google_rows(chunk, [context] * len(chunk), persona, config, options)
+            for chunk in chunks
+        )
+    )
+    return [result for chunk_results in answers for result in chunk_results]
+
+
+# ─── Streaming ───────────────────────────────────────────────────────────────
+
+# A completed top-level "summary" string in a partially streamed JSON answer
+_STREAM_SUMMARY_RE = re.compile(r'"summary"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+def _partial_result(text: str, summary: str, model_name: str, start_ns: int) -> AgentResult:
+    """An in-progress result carrying the raw text received so far."""
+    return AgentResult(
+        success=True,
+        summary=summary,
+        data={"partial": text},
+        confidence=0.0,
+        metadata=AgentMetadata(
+            model=model_name,
+            latency_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
+            partial=True,
+        ),
+    )
+
+
+async def call_google_stream(
+    prompt: str,
+    context: str,
+    persona: PersonaDefinition,
+    config: AgentConfig,
+    options: Optional[AgentCallOptions] = None,
+    source_file: Optional[SourceFileInfo] = None,
+    files: Optional[List[FileAttachment]] = None,
+) -> AsyncIterator[AgentResult]:
+    """Stream a Gemini answer as it is generated.
+
+    Yields one partial AgentResult per received chunk (``metadata.partial``)
+    — ``data["partial"]`` holds the raw text so far and ``summary`` is filled
+    in as soon as the model has finished writing it — then the final parsed
+    result, identical in shape to what call_google returns. Custom schemas stream too: the
+    response schema stays on the request, partials carry the raw JSON (with
+    no summary) and a ``schema_model`` is validated once the stream ends.
+    Calls with tools or file attachments are not streamed and yield only
+    the final result.
+
+    The request holds a throttle slot until the stream ends; a consumer that
+    stops early must ``aclose()`` the generator to release it (and the
+    connection) right away. core.execute_agent_stream always does.
+    """
+    use_tools = has_explicit_tools(options) and not config.local_only
+    if use_tools or files:
+        yield await call_google(prompt, context, persona, config, options, source_file, files)
+        return
+
+    schema_model = options.schema_model if options else None
+    use_custom_schema = bool(options and (options.schema_model or options.response_format))
+
+    start_ns = time.perf_counter_ns()
+    model_name = (options.model if options and options.model else None) or config.model
+    api_key = config.api_key or os.environ.get("GEMINI_API_KEY") or os.environ.get(
+        "GOOGLE_GENERATIVE_AI_API_KEY"
+    )
+    log_debug(f"Streaming with model: {model_name}")
+
+    Agent = (await _load_agno())[0]
+    agent_kwargs: Dict[str, Any] = {
+        "model": _shared_model(model_name, api_key, config.service_tier),
+        "instructions": _instructions(
+            persona.system_prompt,
+            CUSTOM_SCHEMA_INSTRUCTION if use_custom_schema else JSON_FORMAT_INSTRUCTION,
+        ),
+        "markdown": False,
+    }
+    if schema_model is not None:
+        # Gemini still gets the response schema, but Agno must not try to
+        # parse every chunk against it — the raw text is validated at the end
+        agent_kwargs["output_schema"] = schema_model
+        agent_kwargs["parse_response"] = False
+    else:
+        agent_kwargs["use_json_mode"] = True
+    agent = Agent(**agent_kwargs)
+
+    text = summary = ""
+    run_response: Any = None
+    async with _request_throttle(config).slot():
+        stream = agent.arun(
+            _build_user_message(prompt, context, source_file),
+            stream=True,
+            yield_run_output=True,
+        )
+        try:
+            async for event in stream:
+                kind = getattr(event, "event", None)
+                if kind is None:  # the closing RunOutput (yield_run_output)
+                    run_response = event
+                elif kind == "RunContent" and isinstance(event.content, str) and event.content:
+                    text += event.content
+                    if not summary and not use_custom_schema:
+                        match = _STREAM_SUMMARY_RE.search(text)
+                        summary = fastjson.loads(match.group(1)) if match else ""
+                    yield _partial_result(text, summary, model_name, start_ns)
+                elif kind == "RunError":
+                    raise RuntimeError(str(event.content or "Gemini stream failed"))
+        finally:
+            # Closed early (or failed): end Agno's run now, not when collected
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+    tokens_used = _extract_tokens(run_response)
+    log_debug(f"Stream finished: {latency_ms}ms, {tokens_used} tokens")
+
+    content = getattr(run_response, "content", None)
+    if isinstance(content, str) and content:
+        text = content
+    if not use_custom_schema:
+        yield _build_result(_parse_response(text), text, model_name, tokens_used, latency_ms, [])
+        return
+
+    if schema_model is not None and not isinstance(content, schema_model):
+        # One validation pass over the buffered answer; text that doesn't
+        # fit the model falls back to plain JSON parsing, as call_google does
+        try:
+            content = schema_model.model_validate_json(text)
+        except ValueError:
+            content = text
+    yield _structured_result(content or text, True, model_name, tokens_used, latency_ms)
+
+
+# ─── Prompt embeddings (semantic cache) ─────────────────────────────────────
+
+# Short vectors keep the semantic cache's linear scan cheap; Gemini embedding
+# models are trained so truncated vectors still compare well.
+EMBEDDING_DIMENSIONS = 256
+
+
+async def embed_prompt(prompt: str, config: AgentConfig) -> Optional[List[float]]:
+    """Embedding of ``prompt`` for the semantic cache, or None if it can't be had.
+
+    A failed embedding only costs the cache lookup, never the call itself.
+    """
+    api_key = config.api_key or os.environ.get("GEMINI_API_KEY") or os.environ.get(
+        "GOOGLE_GENERATIVE_AI_API_KEY"
+    )
+    try:
+        await _load_agno()
+        client = _shared_client(api_key)
+        async with _request_throttle(config).slot():
+            response = await client.aio.models.embed_content(
+                model=config.cache.semantic_model,
+                contents=prompt,
+                config={"output_dimensionality": EMBEDDING_DIMENSIONS},
+            )
+        return list(response.embeddings[0].values)
+    except Exception as err:
+        log_debug(f"Prompt embedding failed, skipping semantic cache: {err}")
+        return None
+
+
 # ─── Path 1: WITH TOOLS (native Gemini tools, text response) ────────────────
 
 
@@ -220,7 +591,7 @@ async def _call_with_tools(
     options: Optional[AgentCallOptions],
     api_key: Optional[str],
     model_name: str,
-    start_time: float,
+    start_ns: int,
     source_file: Optional[SourceFileInfo] = None,
     files: Optional[List[FileAttachment]] = None,
 ) -> AgentResult:
@@ -229,8 +600,7 @@ async def _call_with_tools(
     Provider tools are incompatible with structured JSON output at the Gemini
     API level, so we instruct the model via prompt and parse the text response.
     """
-    from agno.agent import Agent
-    from agno.models.google import Gemini
+    Agent, Gemini = await _load_agno()
 
     # Resolve tool names into Gemini model kwargs
     tool_kwargs = resolve_tools(options.tools) if options and options.tools else {}
@@ -251,10 +621,15 @@ async def _call_with_tools(
     agno_files = _build_agno_files(files)
 
     # Build instructions with JSON response instruction
-    instructions = persona.system_prompt + JSON_RESPONSE_INSTRUCTION
+    instructions = _instructions(persona.system_prompt, JSON_RESPONSE_INSTRUCTION)
 
     # Create Gemini model with tool flags
-    gemini_model = Gemini(id=model_name, api_key=api_key, **tool_kwargs)
+    gemini_model = Gemini(
+        id=model_name,
+        api_key=api_key,
+        client=_shared_client(api_key),
+        **_tier_kwargs(config.service_tier, tool_kwargs),
+    )
 
     # Create Agno Agent — no use_json_mode (incompatible with provider tools)
     agent = Agent(
@@ -267,9 +642,10 @@ async def _call_with_tools(
     arun_kwargs: Dict[str, Any] = {}
     if agno_files:
         arun_kwargs["files"] = agno_files
-    run_response = await agent.arun(user_message, **arun_kwargs)
+    async with _request_throttle(config).slot():
+        run_response = await agent.arun(user_message, **arun_kwargs)
 
-    latency_ms = int((time.time() - start_time) * 1000)
+    latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
     tokens_used = _extract_tokens(run_response)
 
     log_debug(f"Response received (tools path): {latency_ms}ms, {tokens_used} tokens")
@@ -277,43 +653,34 @@ async def _call_with_tools(
     # Collect tool calls from response metadata
     collected_tool_calls: List[ToolCall] = []
     # Agno may expose tool calls in response messages
-    if hasattr(run_response, "messages") and run_response.messages:
-        for msg in run_response.messages:
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                for tc in msg.tool_calls:
-                    tc_name = getattr(tc, "name", None) or getattr(
-                        tc, "function", {}).get("name", "unknown"
-                    )
-                    tc_args = getattr(tc, "arguments", {}) or getattr(
-                        tc, "function", {}).get("arguments", {}
-                    )
-                    collected_tool_calls.append(
-                        ToolCall(name=str(tc_name), args=tc_args if isinstance(tc_args, dict) else {})
-                    )
+    try:
+        messages = run_response.messages or ()
+    except AttributeError:
+        messages = ()
+    for msg in messages:
+        try:
+            msg_tool_calls = msg.tool_calls
+        except AttributeError:
+            continue
+        for tc in msg_tool_calls or ():
+            tc_name = getattr(tc, "name", None) or getattr(
+                tc, "function", {}).get("name", "unknown"
+            )
+            tc_args = getattr(tc, "arguments", {}) or getattr(
+                tc, "function", {}).get("arguments", {}
+            )
+            collected_tool_calls.append(
+                ToolCall(name=str(tc_name), args=tc_args if isinstance(tc_args, dict) else {})
+            )
 
     log_debug(f"Tool calls collected: {len(collected_tool_calls)}")
 
     # Parse text response (no structured output in tools mode)
     content = run_response.content
     text = str(content) if content else ""
-    parsed = _parse_response(text)
-
-    return AgentResult(
-        success=parsed.get("success", True) if parsed else True,
-        summary=parsed.get("summary", text[:200]) if parsed else text[:200],
-        reasoning=parsed.get("reasoning") if parsed else None,
-        data=_coerce_data(parsed.get("data", {"raw": text}) if parsed else {"raw": text}),
-        actions=_coerce_actions(
-            parsed.get("actions", []) if parsed else []
-        ) or [tc.name for tc in collected_tool_calls],
-        confidence=parsed.get("confidence", 0.5) if parsed else 0.5,
-        metadata=AgentMetadata(
-            model=model_name,
-            tokens_used=tokens_used,
-            latency_ms=latency_ms,
-            tool_calls=collected_tool_calls,
-            cached=False,
-        ),
+    return _build_result(
+        _parse_response(text), text, model_name, tokens_used, latency_ms,
+        collected_tool_calls,
     )
 
 
@@ -328,29 +695,27 @@ async def _call_with_structured_output(
     options: Optional[AgentCallOptions],
     api_key: Optional[str],
     model_name: str,
-    start_time: float,
+    start_ns: int,
     source_file: Optional[SourceFileInfo] = None,
     files: Optional[List[FileAttachment]] = None,
+    batch: bool = False,
 ) -> AgentResult:
     """Execute without tools — uses structured JSON output via Agno Agent."""
-    from agno.agent import Agent
-    from agno.models.google import Gemini
+    Agent = (await _load_agno())[0]
 
     # Determine if we're using a custom schema
     use_custom_schema = bool(
         options and (options.schema_model or options.response_format)
     )
 
-    # Build instructions
-    if use_custom_schema:
-        instructions = (
-            f"{persona.system_prompt}\n\n"
-            "IMPORTANT: You must respond with structured data matching the requested "
-            "output schema. Do not include AgentResult wrapper fields — just return "
-            "the data matching the schema."
-        )
+    # Build instructions — concatenated once per persona and suffix
+    if batch:
+        suffix = BATCH_SYSTEM_INSTRUCTION
+    elif use_custom_schema:
+        suffix = CUSTOM_SCHEMA_INSTRUCTION
     else:
-        instructions = persona.system_prompt
+        suffix = JSON_FORMAT_INSTRUCTION
+    instructions = _instructions(persona.system_prompt, suffix)
 
     # Build the user message (includes source file context)
     user_message = _build_user_message(prompt, context, source_file)
@@ -366,24 +731,16 @@ async def _call_with_structured_output(
     else:
         response_model = None
 
-    # Build JSON schema instructions for the default case
-    if not use_pydantic_schema and not use_custom_schema:
-        instructions += (
-            "\n\nYou MUST respond with a valid JSON object in this exact format:\n"
-            '{"success": true/false, "summary": "one-line conclusion", '
-            '"reasoning": "your thought process or null", '
-            '"data": {"key": "value pairs with findings"}, '
-            '"actions": ["list of steps used"], '
-            '"confidence": 0.0-1.0}'
-        )
-
     # Create Agno Agent with Gemini
     agent_kwargs: Dict[str, Any] = {
-        "model": Gemini(id=model_name, api_key=api_key),
+        "model": _shared_model(model_name, api_key, config.service_tier, batch),
         "instructions": instructions,
         "markdown": False,
     }
     if use_pydantic_schema:
+        # Agno derives the Gemini response schema from the class inside each
+        # request (prepare_response_schema); there is no public hook to hand
+        # it a precomputed one, so the class itself is passed through.
         agent_kwargs["output_schema"] = response_model
     else:
         agent_kwargs["use_json_mode"] = True
@@ -394,103 +751,14 @@ async def _call_with_structured_output(
     arun_kwargs: Dict[str, Any] = {}
     if agno_files:
         arun_kwargs["files"] = agno_files
-    run_response = await agent.arun(user_message, **arun_kwargs)
+    async with _request_throttle(config).slot():
+        run_response = await agent.arun(user_message, **arun_kwargs)
 
-    latency_ms = int((time.time() - start_time) * 1000)
+    latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
     tokens_used = _extract_tokens(run_response)
 
     log_debug(f"Response received: {latency_ms}ms, {tokens_used} tokens")
 
-    collected_tool_calls: List[ToolCall] = []
-
-    # Handle custom schema output
-    if use_custom_schema and run_response.content:
-        custom_data: Dict[str, Any] = {}
-        if isinstance(run_response.content, dict):
-            custom_data = run_response.content
-        elif hasattr(run_response.content, "model_dump"):
-            custom_data = run_response.content.model_dump()
-        else:
-            # Try to parse text as JSON (may be markdown-wrapped)
-            text_content = str(run_response.content)
-            parsed_custom = _parse_response(text_content)
-            if parsed_custom and not parsed_custom.get("raw"):
-                custom_data = parsed_custom
-            else:
-                custom_data = {"result": text_content}
-
-        log_debug("Custom schema output received, wrapping in AgentResult")
-        return AgentResult(
-            success=True,
-            summary=f"Structured output returned ({len(custom_data)} fields)",
-            data=_coerce_data(custom_data),
-            actions=[tc.name for tc in collected_tool_calls],
-            confidence=1.0,
-            metadata=AgentMetadata(
-                model=model_name,
-                tokens_used=tokens_used,
-                latency_ms=latency_ms,
-                tool_calls=collected_tool_calls,
-                cached=False,
-            ),
-        )
-
-    # Default schema: use AgentOutputSchema fields directly
-    content = run_response.content
-    if content is not None:
-        # Agno with response_model returns a Pydantic instance
-        if isinstance(content, AgentOutputSchema):
-            return AgentResult(
-                success=content.success,
-                summary=content.summary,
-                reasoning=content.reasoning,
-                data=_coerce_data(content.data),
-                actions=content.actions,
-                confidence=content.confidence,
-                metadata=AgentMetadata(
-                    model=model_name,
-                    tokens_used=tokens_used,
-                    latency_ms=latency_ms,
-                    tool_calls=collected_tool_calls,
-                    cached=False,
-                ),
-            )
-
-        # It might come back as a dict
-        if isinstance(content, dict):
-            output = content
-            return AgentResult(
-                success=output.get("success", True),
-                summary=output.get("summary", ""),
-                reasoning=output.get("reasoning"),
-                data=_coerce_data(output.get("data", {})),
-                actions=_coerce_actions(output.get("actions", [])),
-                confidence=output.get("confidence", 0.5),
-                metadata=AgentMetadata(
-                    model=model_name,
-                    tokens_used=tokens_used,
-                    latency_ms=latency_ms,
-                    tool_calls=collected_tool_calls,
-                    cached=False,
-                ),
-            )
-
-    # Fallback: parse text response
-    text = str(content) if content else ""
-    parsed = _parse_response(text)
-
-    return AgentResult(
-        success=parsed.get("success", True) if parsed else True,
-        summary=parsed.get("summary", text[:200]) if parsed else text[:200],
-        reasoning=parsed.get("reasoning") if parsed else None,
-        data=_coerce_data(parsed.get("data", {"raw": text}) if parsed else {"raw": text}),
-        actions=_coerce_actions(parsed.get("actions", []) if parsed else []),
-        confidence=parsed.get("confidence", 0.5) if parsed else 0.5,
-        metadata=AgentMetadata(
-            model=model_name,
-            tokens_used=tokens_used,
-            latency_ms=latency_ms,
-            tool_calls=collected_tool_calls,
-            cached=False,
-        ),
+    return _structured_result(
+        run_response.content, use_custom_schema, model_name, tokens_used, latency_ms
     )
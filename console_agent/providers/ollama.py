@@ -13,124 +13,36 @@ Two execution paths:
 
 from __future__ import annotations
 
-import json
+import asyncio
 import os
-import re
 import time
-from typing import Any, Dict, List, Optional
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ..types import (
     AgentCallOptions,
     AgentConfig,
-    AgentMetadata,
-    AgentOutputSchema,
     AgentResult,
     FileAttachment,
     PersonaDefinition,
-    ToolCall,
+    ResponseFormat,
 )
-from ..utils.caller_file import SourceFileInfo, format_source_for_context
+from ..utils.batch import (
+    BATCH_RESPONSE_SCHEMA,
+    BATCH_SYSTEM_INSTRUCTION,
+    fail_rows,
+    marshal_rows,
+    unmarshal_rows,
+)
+from ..utils.caller_file import SourceFileInfo
 from ..utils.format import log_debug
-
-
-# ─── Helpers (shared with google.py patterns) ────────────────────────────────
-
-
-def _coerce_data(raw: Any) -> Dict[str, Any]:
-    """Ensure the data field is always a dict."""
-    if isinstance(raw, dict):
-        return raw
-    if isinstance(raw, list):
-        return {"items": raw}
-    if raw is None:
-        return {}
-    return {"value": raw}
-
-
-def _coerce_actions(raw: Any) -> List[str]:
-    """Ensure actions is always a list of strings."""
-    if not isinstance(raw, list):
-        return [str(raw)] if raw else []
-    result: List[str] = []
-    for item in raw:
-        if isinstance(item, str):
-            result.append(item)
-        elif isinstance(item, dict):
-            result.append(
-                item.get("recommendation")
-                or item.get("action")
-                or item.get("description")
-                or item.get("name")
-                or json.dumps(item, default=str)
-            )
-        else:
-            result.append(str(item))
-    return result
-
-
-def _parse_response(text: str) -> Optional[Dict[str, Any]]:
-    """Fallback parser for unstructured text responses."""
-    # Try direct JSON parse
-    try:
-        return json.loads(text)
-    except (json.JSONDecodeError, TypeError):
-        pass
-
-    # Try extracting JSON from markdown code fences
-    match = re.search(r"```(?:json)?\s*\n?([\s\S]*?)\n?\s*```", text)
-    if match:
-        try:
-            return json.loads(match.group(1))
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-    # Try finding JSON object in text
-    obj_match = re.search(r"\{[\s\S]*\}", text)
-    if obj_match:
-        try:
-            return json.loads(obj_match.group(0))
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-    # Return as raw fallback
-    return {
-        "success": True,
-        "summary": text[:200],
-        "data": {"raw": text},
-        "actions": [],
-        "confidence": 0.5,
-    }
-
-
-def _extract_tokens(run_response: Any) -> int:
-    """Extract token usage from an Agno run response."""
-    tokens_used = 0
-    if hasattr(run_response, "metrics") and run_response.metrics:
-        metrics = run_response.metrics
-        tokens_used = getattr(metrics, "total_tokens", 0) or 0
-        if not tokens_used:
-            input_tokens = getattr(metrics, "input_tokens", 0) or 0
-            output_tokens = getattr(metrics, "output_tokens", 0) or 0
-            tokens_used = input_tokens + output_tokens
-    return tokens_used
-
-
-def _build_user_message(
-    prompt: str,
-    context: str,
-    source_file: Optional[SourceFileInfo] = None,
-) -> str:
-    """Build the user message combining prompt, context, and auto-detected source."""
-    parts: list[str] = [prompt]
-
-    if context:
-        parts.append(f"\n--- Context ---\n{context}")
-
-    if source_file:
-        formatted = format_source_for_context(source_file)
-        parts.append(f"\n{formatted}")
-
-    return "\n".join(parts)
+from ._common import (
+    CUSTOM_SCHEMA_INSTRUCTION,
+    _build_user_message,
+    _extract_tokens,
+    _instructions,
+    _structured_result,
+)
 
 
 # ─── Main Entry Point ────────────────────────────────────────────────────────
@@ -144,13 +56,15 @@ async def call_ollama(
     options: Optional[AgentCallOptions] = None,
     source_file: Optional[SourceFileInfo] = None,
     files: Optional[List[FileAttachment]] = None,
+    batch: bool = False,
 ) -> AgentResult:
     """Call the Ollama provider via Agno Agent.
 
     Routes to structured output path. Tools are not supported for Ollama
     in v1 — if tools are requested, they are silently ignored with a warning.
+    ``batch`` marks a row-marshaled request from call_ollama_rows.
     """
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     model_name = (options.model if options and options.model else None) or config.model
 
     # Default to llama3.2 if the user hasn't overridden the model and it's
@@ -184,9 +98,106 @@ async def call_ollama(
     log_debug(f"Ollama host: {host}")
 
     return await _call_with_structured_output(
-        prompt, context, persona, config, options, host, model_name, start_time,
-        source_file, files,
+        prompt, context, persona, config, options, host, model_name, start_ns,
+        source_file, files, batch,
+    )
+
+
+# ─── Row-marshaled batches ───────────────────────────────────────────────────
+
+
+async def call_ollama_rows(
+    prompts: Sequence[str],
+    contexts: Sequence[str],
+    persona: PersonaDefinition,
+    config: AgentConfig,
+    options: Optional[AgentCallOptions] = None,
+) -> List[AgentResult]:
+    """Answer several independent prompts with ONE Ollama request.
+
+    Ollama has no multi-prompt endpoint and concurrent requests each take a
+    slot of the server's ``OLLAMA_NUM_PARALLEL``, so the prompts are
+    row-marshaled into a single generation instead (see utils.batch). A
+    failed request fails every row.
+    """
+    if len(prompts) == 1:
+        return [await call_ollama(prompts[0], contexts[0], persona, config, options)]
+
+    batch_options = (options or AgentCallOptions()).model_copy(
+        update={"response_format": ResponseFormat(schema=BATCH_RESPONSE_SCHEMA)}
+    )
+    result = await call_ollama(
+        marshal_rows(list(prompts), list(contexts)), "", persona, config, batch_options,
+        batch=True,
     )
+    if not result.success:
+        return fail_rows(result, len(prompts))
+    return unmarshal_rows(result.data, len(prompts), result.metadata)
+
+
+# ─── Agno classes ────────────────────────────────────────────────────────────
+
+# Imported on first use so `import console_agent` stays light; cached here so
+# each call skips the import machinery.
+_agno_classes: Optional[Tuple[Any, Any]] = None
+
+
+def _agno() -> Tuple[Any, Any]:
+    """Return Agno's ``(Agent, Ollama)`` classes."""
+    global _agno_classes
+    if _agno_classes is None:
+        from agno.agent import Agent
+        from agno.models.ollama import Ollama as OllamaModel
+
+        _agno_classes = (Agent, OllamaModel)
+    return _agno_classes
+
+
+async def _load_agno() -> Tuple[Any, Any]:
+    """``_agno()``, with the one-time import run off the event loop.
+
+    Importing Agno and the Ollama SDK takes a few hundred ms on the first
+    call; a worker thread keeps the loop (spinner, other requests) running.
+    """
+    if _agno_classes is not None:
+        return _agno_classes
+    return await asyncio.to_thread(_agno)
+
+
+# ─── Shared models ───────────────────────────────────────────────────────────
+
+# An Ollama model keeps no per-run state, only its lazily built client, and
+# that async client (httpx underneath) is tied to the event loop it first ran
+# on. Models are therefore kept per loop, keyed by (host, model, timeout,
+# batch), so calls on a long-lived loop reuse pooled keep-alive connections to
+# the host. Agents are still built per call — an Agno Agent pins a session.
+_model_slot: Optional[
+    Tuple["weakref.ref[asyncio.AbstractEventLoop]", Dict[Tuple[str, str, float, bool], Any]]
+] = None
+
+
+def _shared_model(host: str, model_name: str, timeout: float, batch: bool = False) -> Any:
+    """Return the Ollama model for ``(host, model_name, timeout)`` on this loop.
+
+    Batch models send BATCH_RESPONSE_SCHEMA as Ollama's ``format``, so the
+    server constrains the answer to it.
+    """
+    global _model_slot
+    loop = asyncio.get_running_loop()
+    slot = _model_slot
+    if slot is None or slot[0]() is not loop:
+        slot = _model_slot = (weakref.ref(loop), {})
+    models = slot[1]
+    key = (host, model_name, timeout, batch)
+    model = models.get(key)
+    if model is None:
+        model = models[key] = _agno()[1](
+            id=model_name,
+            host=host,
+            timeout=timeout,
+            format=BATCH_RESPONSE_SCHEMA if batch else None,
+        )
+    return model
 
 
 # ─── Structured Output Path ─────────────────────────────────────────────────
@@ -200,27 +211,24 @@ async def _call_with_structured_output(
     options: Optional[AgentCallOptions],
     host: str,
     model_name: str,
-    start_time: float,
+    start_ns: int,
     source_file: Optional[SourceFileInfo] = None,
     files: Optional[List[FileAttachment]] = None,
+    batch: bool = False,
 ) -> AgentResult:
     """Execute with structured JSON output via Agno Agent + Ollama."""
-    from agno.agent import Agent
-    from agno.models.ollama import Ollama as OllamaModel
+    Agent = (await _load_agno())[0]
 
     # Determine if we're using a custom schema
     use_custom_schema = bool(
         options and (options.schema_model or options.response_format)
     )
 
-    # Build instructions
-    if use_custom_schema:
-        instructions = (
-            f"{persona.system_prompt}\n\n"
-            "IMPORTANT: You must respond with structured data matching the requested "
-            "output schema. Do not include AgentResult wrapper fields — just return "
-            "the data matching the schema."
-        )
+    # Build instructions — concatenated once per persona
+    if batch:
+        instructions = _instructions(persona.system_prompt, BATCH_SYSTEM_INSTRUCTION)
+    elif use_custom_schema:
+        instructions = _instructions(persona.system_prompt, CUSTOM_SCHEMA_INSTRUCTION)
     else:
         instructions = persona.system_prompt
 
@@ -256,11 +264,10 @@ async def _call_with_structured_output(
 
     # Create Ollama model — pass timeout so the Ollama client doesn't abort early
     ollama_timeout = config.timeout / 1000 if config.timeout else 120  # convert ms → s
-    ollama_model = OllamaModel(id=model_name, host=host, timeout=ollama_timeout)
 
     # Create Agno Agent
     agent_kwargs: Dict[str, Any] = {
-        "model": ollama_model,
+        "model": _shared_model(host, model_name, ollama_timeout, batch),
         "instructions": instructions,
         "markdown": False,
     }
@@ -274,98 +281,11 @@ async def _call_with_structured_output(
     # Execute the agent
     run_response = await agent.arun(user_message)
 
-    latency_ms = int((time.time() - start_time) * 1000)
+    latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
     tokens_used = _extract_tokens(run_response)
 
     log_debug(f"Response received: {latency_ms}ms, {tokens_used} tokens")
 
-    collected_tool_calls: List[ToolCall] = []
-
-    # Handle custom schema output
-    if use_custom_schema and run_response.content:
-        custom_data: Dict[str, Any] = {}
-        if isinstance(run_response.content, dict):
-            custom_data = run_response.content
-        elif hasattr(run_response.content, "model_dump"):
-            custom_data = run_response.content.model_dump()
-        else:
-            text_content = str(run_response.content)
-            parsed_custom = _parse_response(text_content)
-            if parsed_custom and not parsed_custom.get("raw"):
-                custom_data = parsed_custom
-            else:
-                custom_data = {"result": text_content}
-
-        log_debug("Custom schema output received, wrapping in AgentResult")
-        return AgentResult(
-            success=True,
-            summary=f"Structured output returned ({len(custom_data)} fields)",
-            data=_coerce_data(custom_data),
-            actions=[tc.name for tc in collected_tool_calls],
-            confidence=1.0,
-            metadata=AgentMetadata(
-                model=model_name,
-                tokens_used=tokens_used,
-                latency_ms=latency_ms,
-                tool_calls=collected_tool_calls,
-                cached=False,
-            ),
-        )
-
-    # Default schema: use AgentOutputSchema fields directly
-    content = run_response.content
-    if content is not None:
-        if isinstance(content, AgentOutputSchema):
-            return AgentResult(
-                success=content.success,
-                summary=content.summary,
-                reasoning=content.reasoning,
-                data=_coerce_data(content.data),
-                actions=content.actions,
-                confidence=content.confidence,
-                metadata=AgentMetadata(
-                    model=model_name,
-                    tokens_used=tokens_used,
-                    latency_ms=latency_ms,
-                    tool_calls=collected_tool_calls,
-                    cached=False,
-                ),
-            )
-
-        if isinstance(content, dict):
-            output = content
-            return AgentResult(
-                success=output.get("success", True),
-                summary=output.get("summary", ""),
-                reasoning=output.get("reasoning"),
-                data=_coerce_data(output.get("data", {})),
-                actions=_coerce_actions(output.get("actions", [])),
-                confidence=output.get("confidence", 0.5),
-                metadata=AgentMetadata(
-                    model=model_name,
-                    tokens_used=tokens_used,
-                    latency_ms=latency_ms,
-                    tool_calls=collected_tool_calls,
-                    cached=False,
-                ),
-            )
-
-    # Fallback: parse text response
-    text = str(content) if content else ""
-    parsed = _parse_response(text)
-
-    return AgentResult(
-        success=parsed.get("success", True) if parsed else True,
-        summary=parsed.get("summary", text[:200]) if parsed else text[:200],
-        reasoning=parsed.get("reasoning") if parsed else None,
-        data=_coerce_data(parsed.get("data", {"raw": text}) if parsed else {"raw": text}),
-        actions=_coerce_actions(parsed.get("actions", []) if parsed else []),
-        confidence=parsed.get("confidence", 0.5) if parsed else 0.5,
-        metadata=AgentMetadata(
-            model=model_name,
-            tokens_used=tokens_used,
-            latency_ms=latency_ms,
-            tool_calls=collected_tool_calls,
-            cached=False,
-        ),
+    return _structured_result(
+        run_response.content, use_custom_schema, model_name, tokens_used, latency_ms
     )
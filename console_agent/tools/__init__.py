@@ -7,13 +7,16 @@ explicitly specifies `tools=[...]` in their agent() call options.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Union
+import functools
+import types
+from typing import Any, Dict, List, Mapping, Optional, Union
 
 from ..types import ToolConfig, ToolName
-from .file_analysis import detect_mime_type, prepare_file_content
+from .file_analysis import detect_mime_type, prepare_file_content, prepare_file_path
 
 __all__ = [
     "prepare_file_content",
+    "prepare_file_path",
     "detect_mime_type",
     "resolve_tools",
     "has_explicit_tools",
@@ -27,7 +30,7 @@ TOOLS_MIN_TIMEOUT = 30_000
 
 def resolve_tools(
     tools: List[Union[ToolName, ToolConfig]],
-) -> Dict[str, Any]:
+) -> Mapping[str, Any]:
     """Resolve tool names/configs into Agno Gemini model kwargs.
 
     In Agno's Python SDK, native Gemini tools are exposed as flags on the
@@ -45,27 +48,31 @@ def resolve_tools(
         tools: Array of tool names or tool configs from user's options.
 
     Returns:
-        Dict of kwargs to pass to the Gemini() model constructor.
+        Read-only mapping of kwargs to pass to the Gemini() model
+        constructor, shared by every call with the same set of tools.
     """
-    # Collect which tools are requested
-    has_search = False
-    has_url_context = False
-    has_code_execution = False
-
+    # file_analysis is handled via multimodal content, not as a model tool
+    mask = 0
     for tool in tools:
-        name: ToolName = tool if isinstance(tool, str) else tool.type
+        mask |= _TOOL_BITS.get(tool if isinstance(tool, str) else tool.type, 0)
+    return _gemini_kwargs(mask)
+
+
+# Bit per model-level tool; resolve_tools folds a tool list into one mask
+_SEARCH, _URL_CONTEXT, _CODE_EXECUTION = 1, 2, 4
+_TOOL_BITS: Dict[str, int] = {
+    "google_search": _SEARCH,
+    "url_context": _URL_CONTEXT,
+    "code_execution": _CODE_EXECUTION,
+}
 
-        if name == "google_search":
-            has_search = True
-        elif name == "url_context":
-            has_url_context = True
-        elif name == "code_execution":
-            has_code_execution = True
-        # file_analysis is handled via multimodal content, not as a model tool
 
+@functools.lru_cache(maxsize=None)
+def _gemini_kwargs(mask: int) -> Mapping[str, Any]:
+    """Gemini kwargs for a tool mask — built once per combination, shared read-only."""
     gemini_kwargs: Dict[str, Any] = {}
 
-    if has_code_execution:
+    if mask & _CODE_EXECUTION:
         # When code_execution is involved, we must inject ALL tools via
         # generative_model_kwargs because Agno's builtin_tools (from search=True,
         # url_context=True flags) would overwrite code_execution in the config.
@@ -78,21 +85,21 @@ def resolve_tools(
         )
 
         tool_objects: list[Any] = []
-        if has_search:
+        if mask & _SEARCH:
             tool_objects.append(Tool(google_search=GoogleSearch()))
-        if has_url_context:
+        if mask & _URL_CONTEXT:
             tool_objects.append(Tool(url_context=UrlContext()))
         tool_objects.append(Tool(code_execution=ToolCodeExecution()))
 
         gemini_kwargs["generative_model_kwargs"] = {"tools": tool_objects}
     else:
         # Without code_execution, use Agno's native flags (cleaner)
-        if has_search:
+        if mask & _SEARCH:
             gemini_kwargs["search"] = True
-        if has_url_context:
+        if mask & _URL_CONTEXT:
             gemini_kwargs["url_context"] = True
 
-    return gemini_kwargs
+    return types.MappingProxyType(gemini_kwargs)
 
 
 def has_explicit_tools(
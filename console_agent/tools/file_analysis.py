@@ -6,7 +6,11 @@ Supports PDF, images, and video processing via Gemini's multimodal capabilities.
 from __future__ import annotations
 
 import base64
-from typing import Dict
+import os
+from typing import Dict, Optional
+
+# Read size for streamed encoding; a multiple of 3 so chunks encode without padding
+_ENCODE_CHUNK = 3 * 64 * 1024
 
 
 def prepare_file_content(file_data: bytes, mime_type: str) -> Dict[str, str]:
@@ -22,17 +26,39 @@ def prepare_file_content(file_data: bytes, mime_type: str) -> Dict[str, str]:
     }
 
 
+_MIME_TYPES: Dict[str, str] = {
+    "pdf": "application/pdf",
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "mp4": "video/mp4",
+    "webm": "video/webm",
+}
+
+
+def prepare_file_path(path: str, mime_type: Optional[str] = None) -> Dict[str, str]:
+    """Like prepare_file_content, but reads and encodes the file in chunks.
+
+    The raw bytes are never held in full, so peak memory is the encoded
+    output plus one chunk instead of file + encoded bytes + encoded text.
+    The MIME type is detected from the file name when not given.
+    """
+    encoded = bytearray()
+    with open(path, "rb") as f:
+        while chunk := f.read(_ENCODE_CHUNK):
+            encoded += base64.b64encode(chunk)
+    return {
+        "type": "file",
+        "data": encoded.decode("ascii"),
+        "mimeType": mime_type or detect_mime_type(os.path.basename(path)),
+    }
+
+
 def detect_mime_type(filename: str) -> str:
     """Detect MIME type from file extension."""
-    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
-    mime_map = {
-        "pdf": "application/pdf",
-        "png": "image/png",
-        "jpg": "image/jpeg",
-        "jpeg": "image/jpeg",
-        "gif": "image/gif",
-        "webp": "image/webp",
-        "mp4": "video/mp4",
-        "webm": "video/webm",
-    }
-    return mime_map.get(ext, "application/octet-stream")
+    _, dot, ext = filename.rpartition(".")
+    if not dot:
+        return "application/octet-stream"
+    return _MIME_TYPES.get(ext.lower(), "application/octet-stream")
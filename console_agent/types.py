@@ -6,7 +6,7 @@ All TypeScript interfaces are ported to Pydantic models.
 from __future__ import annotations
 
 from enum import Enum
-from typing import Any, Dict, List, Literal, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Sequence, Union
 
 from pydantic import BaseModel, Field
 
@@ -21,19 +21,40 @@ class ToolCall(BaseModel):
     args: Dict[str, Any] = Field(default_factory=dict)
     result: Any = None
 
+    model_config = {"frozen": True}  # Fields can't be reassigned; args stays a plain dict
+
 
 class AgentMetadata(BaseModel):
-    """Execution metadata attached to every AgentResult."""
+    """Execution metadata attached to every AgentResult.
+
+    Frozen, so one instance can be shared (e.g. by all zero-usage error
+    results); use ``model_copy(update=...)`` to derive a changed copy.
+    ``partial`` marks the in-progress results of a streamed call.
+    """
 
     model: str
     tokens_used: int = 0
     latency_ms: int = 0
-    tool_calls: List[ToolCall] = Field(default_factory=list)
+    tool_calls: Sequence[ToolCall] = Field(default_factory=list)
     cached: bool = False
+    partial: bool = False
+
+    model_config = {"frozen": True}
+
+
+# Default for results built without metadata — frozen, with a tuple for the
+# empty tool_calls, so every such result shares this one instance.
+_DEFAULT_METADATA = AgentMetadata(model="", tool_calls=())
 
 
 class AgentResult(BaseModel):
-    """Structured result returned by every agent call."""
+    """Structured result returned by every agent call.
+
+    Frozen like its metadata; use ``model_copy(update=...)`` to derive a
+    changed result. Only the fields are frozen — ``data`` and ``actions``
+    are plain dicts and lists, so results handed out more than once (cache
+    hits, joined in-flight calls) are independent copies.
+    """
 
     success: bool
     summary: str
@@ -41,7 +62,9 @@ class AgentResult(BaseModel):
     data: Dict[str, Any] = Field(default_factory=dict)
     actions: List[str] = Field(default_factory=list)
     confidence: float = Field(ge=0, le=1)
-    metadata: AgentMetadata = Field(default_factory=lambda: AgentMetadata(model=""))
+    metadata: AgentMetadata = _DEFAULT_METADATA
+
+    model_config = {"frozen": True}
 
 
 # ─── Structured output schema (what we ask the LLM to return) ────────────────
@@ -85,6 +108,8 @@ class PersonaDefinition(BaseModel):
     default_tools: List[ToolName] = Field(default_factory=list)
     keywords: List[str] = Field(default_factory=list)
 
+    model_config = {"frozen": True}  # Registry instances are shared by every call
+
 
 # ─── Tool Types ──────────────────────────────────────────────────────────────
 
@@ -109,6 +134,8 @@ class ThinkingConfig(BaseModel):
     budget: Optional[int] = None
     include_thoughts: bool = False
 
+    model_config = {"frozen": True}
+
 
 # ─── Safety Settings ─────────────────────────────────────────────────────────
 
@@ -142,6 +169,51 @@ class BudgetConfig(BaseModel):
     max_tokens_per_call: int = 8000
     cost_cap_daily: float = 1.0
 
+    model_config = {"frozen": True}
+
+
+# ─── Batch Config ────────────────────────────────────────────────────────────
+
+
+class BatchConfig(BaseModel):
+    """Coalesce concurrent agent() calls into one multi-prompt request."""
+
+    enabled: bool = False
+    wait_ms: int = 25  # Collection window after the first queued call
+    max_size: int = 16  # Flush early once this many calls are queued
+
+    model_config = {"frozen": True}
+
+
+# ─── Throttle Config ─────────────────────────────────────────────────────────
+
+
+class ThrottleConfig(BaseModel):
+    """Pace Gemini requests to stay under the API's per-minute quota."""
+
+    rpm: int = 500  # Request starts per minute (0 = unpaced)
+    max_concurrency: int = 48  # In-flight requests per event loop (0 = unlimited)
+
+    model_config = {"frozen": True}
+
+
+# ─── Cache Config ────────────────────────────────────────────────────────────
+
+
+class CacheConfig(BaseModel):
+    """Reuse the result of an identical earlier call instead of calling again."""
+
+    enabled: bool = False
+    max_entries: int = 256  # Least recently used results are evicted first
+    ttl_s: int = 3600  # Seconds a cached result stays valid
+    path: Optional[str] = None  # SQLite file to persist results across runs
+    # Also reuse answers to near-duplicate prompts whose embeddings reach this
+    # cosine similarity (Gemini only; None: exact matches only)
+    semantic_threshold: Optional[float] = Field(default=None, ge=0, le=1)
+    semantic_model: str = "gemini-embedding-001"
+
+    model_config = {"frozen": True}
+
 
 # ─── Response Format ─────────────────────────────────────────────────────────
 
@@ -152,6 +224,8 @@ class ResponseFormat(BaseModel):
     type: Literal["json_object"] = "json_object"
     schema_: Dict[str, Any] = Field(alias="schema")
 
+    model_config = {"frozen": True}
+
 
 # ─── Call Options ─────────────────────────────────────────────────────────────
 
@@ -182,14 +256,18 @@ class AgentCallOptions(BaseModel):
     include_caller_source: Optional[bool] = None  # Override for this call
     files: Optional[List[FileAttachment]] = None  # Explicit file attachments
 
-    model_config = {"arbitrary_types_allowed": True}
+    model_config = {"arbitrary_types_allowed": True, "frozen": True}
 
 
 # ─── Global Config ────────────────────────────────────────────────────────────
 
 
 class AgentConfig(BaseModel):
-    """Global configuration for console-agent."""
+    """Global configuration for console-agent.
+
+    Frozen: ``get_config()`` hands out the live instance, so changes must go
+    through ``update_config()``, which swaps in a new snapshot.
+    """
 
     provider: Literal["google", "ollama"] = "google"
     api_key: Optional[str] = None
@@ -197,6 +275,9 @@ class AgentConfig(BaseModel):
     ollama_host: str = "http://localhost:11434"
     persona: PersonaName = "general"
     budget: BudgetConfig = Field(default_factory=BudgetConfig)
+    batch: BatchConfig = Field(default_factory=BatchConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    throttle: ThrottleConfig = Field(default_factory=ThrottleConfig)
     mode: Literal["fire-and-forget", "blocking"] = "fire-and-forget"
     timeout: int = 10000  # milliseconds
     anonymize: bool = True
@@ -205,4 +286,9 @@ class AgentConfig(BaseModel):
     log_level: LogLevel = "info"
     verbose: bool = False
     include_caller_source: bool = True
+    max_traceback_frames: int = 20  # Frames of an Exception context sent when not verbose
     safety_settings: List[SafetySetting] = Field(default_factory=list)
+    # Gemini processing tier; "flex" is discounted but slower (None: API default)
+    service_tier: Optional[Literal["flex", "standard", "priority"]] = None
+
+    model_config = {"frozen": True}
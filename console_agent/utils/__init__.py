@@ -1,20 +1,30 @@
 """Utility modules for console-agent."""
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
 from .anonymize import anonymize, anonymize_value
 from .budget import BudgetTracker
-from .format import (
-    format_budget_warning,
-    format_dry_run,
-    format_error,
-    format_rate_limit_warning,
-    format_result,
-    log_debug,
-    set_log_level,
-    start_spinner,
-    stop_spinner,
-)
 from .rate_limit import RateLimiter
 
+# The console helpers pull in Rich, so they are imported on first use (see
+# __getattr__ below) — `from console_agent.utils import anonymize` stays light.
+if TYPE_CHECKING:
+    from .format import (
+        StreamingSpinner,
+        format_budget_warning,
+        format_dry_run,
+        format_error,
+        format_rate_limit_warning,
+        format_result,
+        log_debug,
+        set_log_level,
+        start_spinner,
+        start_streaming_spinner,
+        stop_spinner,
+    )
+
 __all__ = [
     "anonymize",
     "anonymize_value",
@@ -23,6 +33,8 @@ __all__ = [
     "set_log_level",
     "start_spinner",
     "stop_spinner",
+    "StreamingSpinner",
+    "start_streaming_spinner",
     "format_result",
     "format_error",
     "format_budget_warning",
@@ -30,3 +42,30 @@ __all__ = [
     "format_dry_run",
     "log_debug",
 ]
+
+_LAZY_FORMAT = frozenset(
+    {
+        "StreamingSpinner",
+        "format_budget_warning",
+        "format_dry_run",
+        "format_error",
+        "format_rate_limit_warning",
+        "format_result",
+        "log_debug",
+        "set_log_level",
+        "start_spinner",
+        "start_streaming_spinner",
+        "stop_spinner",
+    }
+)
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the console helpers on first access (PEP 562)."""
+    if name not in _LAZY_FORMAT:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from . import format as module
+
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
@@ -5,15 +5,57 @@ before sending to the AI provider.
 
 from __future__ import annotations
 
+import functools
+import itertools
 import re
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:  # Optional accelerator: pip install console-agent[fast]
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+from . import fastjson
 
 # ─── Patterns for sensitive content ──────────────────────────────────────────
 
+class _DelimitedPattern:
+    """Shortest ``begin ... end`` span, found without a lazy ``[\\s\\S]*?``.
+
+    The equivalent regex rescans the rest of the text for every ``begin``
+    that has no ``end`` after it; here one failed ``end`` search ends the
+    scan, so the worst case is linear. Offers the ``search()``/``sub()``
+    subset of ``re.Pattern`` used below.
+    """
+
+    def __init__(self, begin: str, end: str) -> None:
+        self._begin = re.compile(begin)
+        self._end = re.compile(end)
+
+    def search(self, text: str) -> Optional[Tuple[int, int]]:
+        begin = self._begin.search(text)
+        end = begin and self._end.search(text, begin.end())
+        return (begin.start(), end.end()) if end else None
+
+    def sub(self, replacement: str, text: str) -> str:
+        parts: List[str] = []
+        pos = 0
+        while (begin := self._begin.search(text, pos)) is not None:
+            end = self._end.search(text, begin.end())
+            if end is None:  # no later begin can find an end either
+                break
+            parts += (text[pos : begin.start()], replacement)
+            pos = end.end()
+        if not parts:
+            return text
+        parts.append(text[pos:])
+        return "".join(parts)
+
+
 _PATTERNS = {
     # Private keys (must run first — multiline)
-    "private_key": re.compile(
-        r"-----BEGIN (?:RSA )?PRIVATE KEY-----[\s\S]*?-----END (?:RSA )?PRIVATE KEY-----"
+    "private_key": _DelimitedPattern(
+        r"-----BEGIN (?:RSA )?PRIVATE KEY-----", r"-----END (?:RSA )?PRIVATE KEY-----"
     ),
     # Connection strings
     "connection_string": re.compile(
@@ -25,13 +67,13 @@ _PATTERNS = {
     "bearer": re.compile(r"Bearer\s+[A-Za-z0-9_\-/.+]{20,}", re.IGNORECASE),
     # API keys and tokens (long alphanumeric strings near sensitive keywords)
     "api_key": re.compile(
-        r"(?:api[_\-]?key|token|secret|password|credential|auth)['\"\:\s=]+['\"]?"
-        r"([A-Za-z0-9_\-/.]{20,})['\"]?",
+        r"(api[_\-]?key|token|secret|password|credential|auth)['\"\:\s=]+['\"]?"
+        r"[A-Za-z0-9_\-/.]{20,}['\"]?",
         re.IGNORECASE,
     ),
     # .env style secrets
     "env_secret": re.compile(
-        r"^(?:DATABASE_URL|DB_PASSWORD|SECRET_KEY|PRIVATE_KEY|AWS_SECRET|STRIPE_KEY|SENDGRID_KEY)[=:].+$",
+        r"^(DATABASE_URL|DB_PASSWORD|SECRET_KEY|PRIVATE_KEY|AWS_SECRET|STRIPE_KEY|SENDGRID_KEY)[=:].+$",
         re.MULTILINE,
     ),
     # Email addresses
@@ -42,50 +84,195 @@ _PATTERNS = {
     "ipv6": re.compile(r"(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}"),
 }
 
+# Lower-cased literals, at least one of which every match of the pattern
+# contains. Plain substring checks are far cheaper than the regexes (most of
+# which have no literal prefix to anchor on), so clean input skips them.
+_HINTS: Dict[str, Tuple[str, ...]] = {
+    "private_key": ("-----begin",),
+    "connection_string": ("://",),
+    "aws_key": ("akia", "asia"),
+    "bearer": ("bearer",),
+    "api_key": ("api", "token", "secret", "password", "credential", "auth"),
+    "env_secret": (
+        "database_url", "db_password", "secret_key", "private_key",
+        "aws_secret", "stripe_key", "sendgrid_key",
+    ),
+    "email": ("@",),
+    "ipv4": tuple(f"{d}." for d in "0123456789"),
+    "ipv6": tuple(f"{d}:" for d in "0123456789abcdef"),
+}
+
+
+_PATTERN_LIST: Tuple[Union[re.Pattern, _DelimitedPattern], ...] = tuple(_PATTERNS.values())
+_ALL_PATTERNS = (1 << len(_PATTERN_LIST)) - 1
+
+
+# The automaton can afford a far more selective ipv4 hint than the substring
+# fallback: every dotted quad contains ".N." (N of 1-3 digits), which decimal
+# numbers like "1.5" never do.
+_IPV4_SEGMENTS: Tuple[str, ...] = tuple(
+    "." + "".join(digits) + "."
+    for width in (1, 2, 3)
+    for digits in itertools.product("0123456789", repeat=width)
+)
+
+
+def _build_automaton() -> Optional["ahocorasick.Automaton"]:
+    """Build one Aho-Corasick automaton mapping every hint to a pattern bitmask."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for bit, name in enumerate(_PATTERNS):
+        for hint in _IPV4_SEGMENTS if name == "ipv4" else _HINTS[name]:
+            automaton.add_word(hint, automaton.get(hint, 0) | (1 << bit))
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton()
+
+
+def _candidates(text: str) -> int:
+    """Bitmask of the patterns (in _PATTERNS order) that could match ``text``."""
+    if not text.isascii():
+        # re.IGNORECASE folds letters like "ſ" → "s" that str.lower() keeps,
+        # and \d matches non-ASCII digits — no literal shortcut here.
+        return _ALL_PATTERNS
+
+    lowered = text.lower()
+    mask = 0
+    if _AUTOMATON is not None:
+        # One pass over the text instead of one substring scan per hint
+        for _, bits in _AUTOMATON.iter(lowered):
+            mask |= bits
+            if mask == _ALL_PATTERNS:
+                break
+        return mask
+
+    for bit, name in enumerate(_PATTERNS):
+        if any(hint in lowered for hint in _HINTS[name]):
+            mask |= 1 << bit
+    return mask
+
+
+def _is_sensitive(text: str) -> bool:
+    """Cheap check for whether any pattern could match ``text``."""
+    mask = _candidates(text)
+    return any(
+        mask >> bit & 1 and pattern.search(text)
+        for bit, pattern in enumerate(_PATTERN_LIST)
+    )
+
+
+def _collect_strings(value: Any, out: List[str]) -> List[str]:
+    if isinstance(value, str):
+        out.append(value)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_strings(item, out)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_strings(item, out)
+    return out
 
-def anonymize(content: str) -> str:
-    """Anonymize sensitive content in a string.
 
-    Replaces detected secrets/PII with safe placeholders.
+def contains_sensitive(value: Any) -> bool:
+    """Whether anonymize_value() would change anything in ``value``.
+
+    All string leaves are checked in one newline-joined pass, so line-anchored
+    patterns (.env secrets) still see their own line start.
     """
-    result = content
+    if isinstance(value, str):
+        return _is_sensitive(value)
+    return _is_sensitive("\n".join(_collect_strings(value, [])))
+
+
+# Replacement for each pattern, in _PATTERNS order — which is also the order
+# they are applied in (private keys first, before anything can split them)
+_REPLACEMENTS: Dict[str, str] = {
+    "private_key": "[REDACTED_PRIVATE_KEY]",
+    "connection_string": "[REDACTED_CONNECTION_STRING]",
+    "aws_key": "[REDACTED_AWS_KEY]",
+    "bearer": "Bearer [REDACTED_TOKEN]",
+    # Keep the keyword (group 1), drop the value — expanded by re, no callback
+    "api_key": r"\1: [REDACTED]",
+    "env_secret": r"\1=[REDACTED]",
+    "email": "[EMAIL]",
+    "ipv4": "[IP]",
+    "ipv6": "[IP]",
+}
+_REDACTIONS = tuple(zip(_PATTERN_LIST, (_REPLACEMENTS[name] for name in _PATTERNS)))
+
+
+# Strings longer than this are redacted every time rather than pinned in the cache
+_MAX_CACHED_CONTENT = 65536
+
 
-    result = _PATTERNS["private_key"].sub("[REDACTED_PRIVATE_KEY]", result)
-    result = _PATTERNS["connection_string"].sub("[REDACTED_CONNECTION_STRING]", result)
-    result = _PATTERNS["aws_key"].sub("[REDACTED_AWS_KEY]", result)
-    result = _PATTERNS["bearer"].sub("Bearer [REDACTED_TOKEN]", result)
-
-    def _redact_api_key(match: re.Match) -> str:
-        full = match.group(0)
-        # Find the separator position
-        for i, ch in enumerate(full):
-            if ch in ("'", '"', ":", " ", "="):
-                return full[:i] + ": [REDACTED]"
-        return "[REDACTED]"
-
-    result = _PATTERNS["api_key"].sub(_redact_api_key, result)
-
-    def _redact_env(match: re.Match) -> str:
-        full = match.group(0)
-        for i, ch in enumerate(full):
-            if ch in ("=", ":"):
-                return full[:i] + "=[REDACTED]"
-        return "[REDACTED]"
-
-    result = _PATTERNS["env_secret"].sub(_redact_env, result)
-    result = _PATTERNS["email"].sub("[EMAIL]", result)
-    result = _PATTERNS["ipv4"].sub("[IP]", result)
-    result = _PATTERNS["ipv6"].sub("[IP]", result)
+# Callers replay the same context (error snippets, source files) call after
+# call, so results for repeated strings come straight from here.
+@functools.lru_cache(maxsize=512)
+def _redact(content: str) -> str:
+    mask = _candidates(content)
+    if not mask:
+        return content
 
+    result = content
+    for bit, (pattern, replacement) in enumerate(_REDACTIONS):
+        if mask >> bit & 1:
+            result = pattern.sub(replacement, result)
     return result
 
 
+def anonymize(content: str) -> str:
+    """Anonymize sensitive content in a string.
+
+    Replaces detected secrets/PII with safe placeholders. Only the patterns
+    whose hints occur in ``content`` run at all: no placeholder contains a
+    hint that could start a new match, so skipping the rest changes nothing.
+    Repeated strings up to 64 KB are answered from an LRU cache.
+    """
+    if len(content) > _MAX_CACHED_CONTENT:
+        return _redact.__wrapped__(content)
+    return _redact(content)
+
+
 def anonymize_value(value: Any) -> Any:
-    """Anonymize any value — handles strings, dicts, lists, and primitives."""
+    """Anonymize any value — handles strings, dicts, lists, and primitives.
+
+    Primitives and containers with nothing to redact are returned as-is, and
+    only the containers on the path to a redacted string are copied.
+    """
+    if isinstance(value, str):
+        return anonymize(value)
+    if not isinstance(value, (list, dict)) or not contains_sensitive(value):
+        return value
+    return _anonymize_deep(value)
+
+
+def anonymize_json(value: Any, indent: bool = False) -> str:
+    """Serialize ``value`` to JSON with sensitive strings redacted.
+
+    The value is encoded once and the encoded text screened for hints —
+    hint characters are never escaped by JSON, so a hint in any string leaf
+    shows up verbatim. Only when the screen fires is the structure walked,
+    and it is re-encoded only if something was actually redacted.
+    """
+    text = fastjson.dumps(value, indent=indent)
+    if not _candidates(text):
+        return text
+    redacted = anonymize_value(value)
+    return text if redacted is value else fastjson.dumps(redacted, indent=indent)
+
+
+def _anonymize_deep(value: Any) -> Any:
+    """Redact ``value``, returning it unchanged (same object) if nothing was."""
     if isinstance(value, str):
         return anonymize(value)
     if isinstance(value, list):
-        return [anonymize_value(item) for item in value]
+        items = [_anonymize_deep(item) for item in value]
+        return value if all(new is old for new, old in zip(items, value)) else items
     if isinstance(value, dict):
-        return {k: anonymize_value(v) for k, v in value.items()}
+        redacted = {k: _anonymize_deep(v) for k, v in value.items()}
+        unchanged = all(new is old for new, old in zip(redacted.values(), value.values()))
+        return value if unchanged else redacted
     return value
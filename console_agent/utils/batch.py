@@ -0,0 +1,256 @@
+"""
+Batch coalescer — merges concurrent agent() calls into one provider request.
+
+Calls that share a persona and model are queued for a short window
+(``batch.wait_ms``) or until ``batch.max_size`` calls are waiting. The
+queued prompts are row-marshaled as JSON lines into a single request and the
+model answers with one result per row, which is demultiplexed back to each
+waiting caller.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from ..types import AgentMetadata, AgentResult
+from . import fastjson
+from .format import log_debug
+from .response_cache import detach_result
+
+# ─── Row marshaling ──────────────────────────────────────────────────────────
+
+BATCH_INSTRUCTION = (
+    "You will receive several INDEPENDENT tasks, one JSON object per line, "
+    'each with an "id", a "prompt" and an optional "context".\n'
+    "Handle every task on its own — never mix information between tasks.\n"
+    "Respond with ONLY a JSON object (no markdown, no code fences) in this format:\n"
+    '{"results": [{"id": 0, "success": true, "summary": "one-line conclusion", '
+    '"reasoning": "your thought process", "data": {"key": "value"}, '
+    '"actions": ["steps used"], "confidence": 0.95}]}\n'
+    "Return exactly one entry per task id."
+)
+
+# System-prompt suffix for batched requests; the row format itself is spelled
+# out in the user message (BATCH_INSTRUCTION)
+BATCH_SYSTEM_INSTRUCTION = (
+    "\n\nIMPORTANT: The user message holds several independent tasks. Respond "
+    "with ONLY the JSON object it describes — one entry per task id, each with "
+    "its own success, summary and confidence."
+)
+
+BATCH_RESPONSE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "success": {"type": "boolean"},
+                    "summary": {"type": "string"},
+                    "reasoning": {"type": "string"},
+                    "data": {"type": "object"},
+                    "actions": {"type": "array", "items": {"type": "string"}},
+                    "confidence": {"type": "number"},
+                },
+                "required": ["id", "success", "summary", "confidence"],
+            },
+        },
+    },
+    "required": ["results"],
+}
+
+
+def marshal_rows(prompts: List[str], contexts: List[str]) -> str:
+    """Encode prompts as JSON lines, one row per task, prefixed with instructions."""
+    rows = [
+        fastjson.dumps({"id": i, "prompt": p, "context": c})
+        for i, (p, c) in enumerate(zip(prompts, contexts))
+    ]
+    return BATCH_INSTRUCTION + "\n\n" + "\n".join(rows)
+
+
+def unmarshal_rows(
+    data: Dict[str, Any],
+    count: int,
+    metadata: AgentMetadata,
+) -> List[AgentResult]:
+    """Split a batched response back into one AgentResult per row.
+
+    Tokens are split evenly across rows. Rows the model skipped become
+    error results rather than failing the whole batch.
+    """
+    rows = data.get("results", data.get("items", []))
+    by_id: Dict[int, Dict[str, Any]] = {}
+    if isinstance(rows, list):
+        for row in rows:
+            if isinstance(row, dict) and isinstance(row.get("id"), int):
+                by_id.setdefault(row["id"], row)
+
+    share = metadata.model_copy(
+        update={"tokens_used": metadata.tokens_used // max(count, 1)}
+    )
+    return [_row_to_result(by_id.get(i), share) for i in range(count)]
+
+
+def _row_to_result(row: Optional[Dict[str, Any]], metadata: AgentMetadata) -> AgentResult:
+    if row is None:
+        return AgentResult(
+            success=False,
+            summary="Batched response did not include a result for this prompt",
+            confidence=0,
+            metadata=metadata,
+        )
+
+    data = row.get("data")
+    if not isinstance(data, dict):
+        data = {} if data is None else {"value": data}
+    actions = row.get("actions")
+    if not isinstance(actions, list):
+        actions = [] if not actions else [actions]
+    try:
+        confidence = min(max(float(row.get("confidence", 0.5)), 0.0), 1.0)
+    except (TypeError, ValueError):
+        confidence = 0.5
+
+    return AgentResult(
+        success=bool(row.get("success", True)),
+        summary=str(row.get("summary", "")),
+        reasoning=row.get("reasoning") if isinstance(row.get("reasoning"), str) else None,
+        data=data,
+        actions=[a if isinstance(a, str) else fastjson.dumps(a) for a in actions],
+        confidence=confidence,
+        metadata=metadata,
+    )
+
+
+def fail_rows(result: AgentResult, count: int) -> List[AgentResult]:
+    """Fan a failed batched response out to every row.
+
+    Each row gets its own copy with an even share of the tokens, so the
+    failure is charged to the budget once rather than once per row.
+    """
+    share = result.metadata.model_copy(
+        update={"tokens_used": result.metadata.tokens_used // max(count, 1)}
+    )
+    return [detach_result(result, metadata=share) for _ in range(count)]
+
+
+# ─── Coalescer ───────────────────────────────────────────────────────────────
+
+
+@dataclass
+class BatchItem:
+    """A queued agent call waiting for its batch to be dispatched."""
+
+    key: Hashable
+    prompt: str
+    context: str
+    payload: Any
+    future: asyncio.Future[AgentResult]
+
+
+@dataclass
+class BatchStats:
+    """Merge-rate counters, used to check that batching actually pays off."""
+
+    calls: int = 0
+    batches: int = 0
+
+    @property
+    def merge_rate(self) -> float:
+        """Average number of calls served per dispatched request."""
+        return self.calls / self.batches if self.batches else 0.0
+
+
+@dataclass
+class _LoopState:
+    queue: asyncio.Queue[BatchItem]
+    full: asyncio.Event
+    worker: Optional[asyncio.Task[None]] = None
+
+
+BatchDispatch = Callable[[List[BatchItem]], Awaitable[List[AgentResult]]]
+
+
+class BatchCoalescer:
+    """Buffers concurrent calls and dispatches them in groups.
+
+    One queue exists per running event loop. Its worker task lives only while
+    calls are pending, so idle loops (e.g. finished ``asyncio.run`` calls)
+    leave nothing behind.
+    """
+
+    def __init__(self, dispatch: BatchDispatch, wait_ms: int = 25, max_size: int = 16) -> None:
+        self._dispatch = dispatch
+        self._wait = wait_ms / 1000.0
+        self._max_size = max(1, max_size)
+        self._loops: Dict[asyncio.AbstractEventLoop, _LoopState] = {}
+        self._inflight: Set[asyncio.Task[None]] = set()
+        self.stats = BatchStats()
+
+    async def submit(self, key: Hashable, prompt: str, context: str, payload: Any = None) -> AgentResult:
+        """Queue a call and wait for its slice of the batched response."""
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = _LoopState(queue=asyncio.Queue(), full=asyncio.Event())
+            self._loops[loop] = state
+            state.worker = loop.create_task(self._drain(loop, state))
+
+        future: asyncio.Future[AgentResult] = loop.create_future()
+        state.queue.put_nowait(BatchItem(key, prompt, context, payload, future))
+        if state.queue.qsize() >= self._max_size:
+            state.full.set()
+        return await future
+
+    async def _drain(self, loop: asyncio.AbstractEventLoop, state: _LoopState) -> None:
+        try:
+            while not state.queue.empty():
+                try:
+                    await asyncio.wait_for(state.full.wait(), timeout=self._wait)
+                except asyncio.TimeoutError:
+                    pass
+                state.full.clear()
+
+                batch: List[BatchItem] = []
+                while len(batch) < self._max_size and not state.queue.empty():
+                    batch.append(state.queue.get_nowait())
+                if state.queue.qsize() >= self._max_size:
+                    state.full.set()
+
+                groups: Dict[Hashable, List[BatchItem]] = {}
+                for item in batch:
+                    if not item.future.done():  # caller gave up (timeout/cancel)
+                        groups.setdefault(item.key, []).append(item)
+                for items in groups.values():
+                    task = loop.create_task(self._run(items))
+                    self._inflight.add(task)
+                    task.add_done_callback(self._inflight.discard)
+        finally:
+            self._loops.pop(loop, None)
+
+    async def _run(self, items: List[BatchItem]) -> None:
+        self.stats.calls += len(items)
+        self.stats.batches += 1
+        log_debug(
+            f"Batch dispatch: {len(items)} call(s) "
+            f"(merge rate {self.stats.merge_rate:.2f})"
+        )
+        try:
+            results = await self._dispatch(items)
+        except Exception as exc:
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+
+        for item, result in zip(items, results):
+            if not item.future.done():
+                item.future.set_result(result)
+        for item in items[len(results):]:
+            if not item.future.done():
+                item.future.set_exception(RuntimeError("Batched call returned no result"))
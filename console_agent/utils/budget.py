@@ -1,24 +1,32 @@
 """
 Budget tracker — monitors daily token usage and cost.
 Enforces hard caps to prevent cost explosion.
+
+Checks are lock-free reads; only recording usage and the midnight reset
+take the lock, so concurrent callers never serialize on can_make_call().
 """
 
 from __future__ import annotations
 
-import datetime
-from dataclasses import dataclass, field
+import threading
+import time
+from dataclasses import dataclass
 from typing import Optional
 
 from ..types import BudgetConfig
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BudgetCheckResult:
     allowed: bool
     reason: Optional[str] = None
 
 
-@dataclass
+# Frozen, so every successful check returns this one instance
+_ALLOWED = BudgetCheckResult(allowed=True)
+
+
+@dataclass(slots=True)
 class BudgetStats:
     calls_today: int
     calls_remaining: int
@@ -32,10 +40,12 @@ class BudgetTracker:
 
     def __init__(self, config: BudgetConfig) -> None:
         self._config = config
+        self._lock = threading.Lock()
         self._calls_today = 0
         self._tokens_today = 0
         self._cost_today = 0.0
         self._day_start = self._get_start_of_day()
+        self._next_day_start = self._day_start + 86400
 
     def can_make_call(self) -> BudgetCheckResult:
         """Check if a call is within budget. Resets counters at midnight UTC."""
@@ -53,14 +63,16 @@ class BudgetTracker:
                 reason=f"Daily cost cap reached (${self._config.cost_cap_daily:.2f})",
             )
 
-        return BudgetCheckResult(allowed=True)
+        return _ALLOWED
 
-    def record_usage(self, tokens_used: int, cost_usd: float) -> None:
-        """Record a completed call's usage."""
+    def record_usage(self, tokens_used: int, cost_usd: float, calls: int = 1) -> None:
+        """Record a completed call's usage (``calls=0`` for side requests such
+        as prompt embeddings, which cost tokens but aren't agent calls)."""
         self._maybe_reset_day()
-        self._calls_today += 1
-        self._tokens_today += tokens_used
-        self._cost_today += cost_usd
+        with self._lock:
+            self._calls_today += calls
+            self._tokens_today += tokens_used
+            self._cost_today += cost_usd
 
     def get_stats(self) -> BudgetStats:
         """Get current usage stats."""
@@ -75,25 +87,31 @@ class BudgetTracker:
 
     def reset(self) -> None:
         """Reset all counters (for testing)."""
-        self._calls_today = 0
-        self._tokens_today = 0
-        self._cost_today = 0.0
-        self._day_start = self._get_start_of_day()
+        with self._lock:
+            self._calls_today = 0
+            self._tokens_today = 0
+            self._cost_today = 0.0
+            self._day_start = self._get_start_of_day()
+            self._next_day_start = self._day_start + 86400
 
     @property
     def max_tokens_per_call(self) -> int:
         return self._config.max_tokens_per_call
 
     def _maybe_reset_day(self) -> None:
-        current_day_start = self._get_start_of_day()
-        if current_day_start > self._day_start:
-            self._calls_today = 0
-            self._tokens_today = 0
-            self._cost_today = 0.0
-            self._day_start = current_day_start
+        # Plain float compare on the hot path; the lock only at the boundary
+        if time.time() < self._next_day_start:
+            return
+        with self._lock:
+            current_day_start = self._get_start_of_day()
+            if current_day_start > self._day_start:
+                self._calls_today = 0
+                self._tokens_today = 0
+                self._cost_today = 0.0
+                self._day_start = current_day_start
+                self._next_day_start = current_day_start + 86400
 
     @staticmethod
     def _get_start_of_day() -> float:
-        now = datetime.datetime.now(datetime.timezone.utc)
-        start = datetime.datetime(now.year, now.month, now.day, tzinfo=datetime.timezone.utc)
-        return start.timestamp()
+        # Unix time has no leap seconds: every UTC midnight is a multiple of a day
+        return float(int(time.time()) // 86400 * 86400)
@@ -8,21 +8,32 @@ Python equivalent of src/utils/caller-file.ts in the TypeScript SDK.
 
 from __future__ import annotations
 
-import inspect
+import functools
 import os
-import traceback
+import sys
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Optional
+from types import FrameType
+from typing import Optional, Tuple
 
 # ─── Types ────────────────────────────────────────────────────────────────────
 
+# Frame that made a blocking agent() call. Its coroutine runs on the shared
+# run-sync loop thread (utils/runsync), whose own stack never reaches the
+# caller, so the walk starts here instead when it is set.
+CALL_SITE: ContextVar[Optional[FrameType]] = ContextVar("CALL_SITE", default=None)
+
 MAX_FILE_SIZE = 100_000  # 100KB — truncate larger files
 
+# Lines of source shown on each side of the relevant line
+CONTEXT_LINES = 30
+
 # Source file extensions to read
 SOURCE_EXTENSIONS = {".py", ".pyx", ".pyi"}
 
-# Patterns that indicate internal frames (skip these)
-INTERNAL_PATTERNS = [
+# Patterns that indicate internal frames (skip these). A tuple, so the
+# per-filename verdicts cached below can never go stale.
+INTERNAL_PATTERNS = (
     "console_agent/",
     "console_agent\\",
     "/agno/",
@@ -55,12 +66,12 @@ INTERNAL_PATTERNS = [
     "\\IPython\\",
     "/ipykernel/",
     "\\ipykernel\\",
-]
+)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SourceFileInfo:
-    """Information about a detected source file."""
+    """Information about a detected source file (hashable, so formatting is memoized)."""
 
     file_path: str
     file_name: str
@@ -73,6 +84,9 @@ class SourceFileInfo:
 # ─── Stack Inspection ─────────────────────────────────────────────────────────
 
 
+# A process only ever sees a few hundred distinct filenames, and every stack
+# walk asks about the same ones again
+@functools.lru_cache(maxsize=1024)
 def _is_internal_frame(filename: str) -> bool:
     """Check if a stack frame is from internal/library code."""
     if not filename:
@@ -83,6 +97,7 @@ def _is_internal_frame(filename: str) -> bool:
     return False
 
 
+@functools.lru_cache(maxsize=1024)
 def _is_source_file(filename: str) -> bool:
     """Check if a filename is a readable source file."""
     if not filename:
@@ -92,9 +107,21 @@ def _is_source_file(filename: str) -> bool:
 
 
 def _read_source_file(file_path: str) -> Optional[str]:
-    """Read source file content with size limits."""
+    """Read source file content with size limits.
+
+    Contents are cached per (path, mtime, size), so agent() called in a loop
+    costs one stat per call and re-reads only after the file changes.
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return _read_source_cached(file_path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=128)
+def _read_source_cached(file_path: str, mtime_ns: int, size: int) -> Optional[str]:
     try:
-        size = os.path.getsize(file_path)
         if size > MAX_FILE_SIZE:
             with open(file_path, "r", encoding="utf-8", errors="replace") as f:
                 content = f.read(MAX_FILE_SIZE)
@@ -105,6 +132,28 @@ def _read_source_file(file_path: str) -> Optional[str]:
         return None
 
 
+@functools.lru_cache(maxsize=256)
+def _path_names(filename: str) -> Tuple[str, str]:
+    """(absolute path, base name) of an absolute ``filename`` — pure, so cached."""
+    return os.path.abspath(filename), os.path.basename(filename)
+
+
+def _source_info(filename: str, line: int, name: str, content: str) -> SourceFileInfo:
+    """SourceFileInfo for a frame, reusing the path names of earlier calls."""
+    if os.path.isabs(filename):
+        file_path, file_name = _path_names(filename)
+    else:  # relative to the current directory, which may change
+        file_path, file_name = os.path.abspath(filename), os.path.basename(filename)
+    return SourceFileInfo(
+        file_path=file_path,
+        file_name=file_name,
+        line=line,
+        column=0,  # Python doesn't provide column info easily
+        content=content,
+        function_name=name if name != "<module>" else None,
+    )
+
+
 # ─── Public API ───────────────────────────────────────────────────────────────
 
 
@@ -120,36 +169,30 @@ def get_caller_file(skip_frames: int = 0) -> Optional[SourceFileInfo]:
     Returns:
         SourceFileInfo if a valid external source file is found, else None.
     """
-    stack = inspect.stack()
-
-    # Skip frames: current function + internal console_agent frames
+    # Walk raw frames: inspect.stack() would also read source context
+    # (linecache, file I/O) for every frame on the stack
     skipped = 0
-    for frame_info in stack:
-        filename = frame_info.filename
-
-        if _is_internal_frame(filename):
-            continue
+    frame = CALL_SITE.get() or sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
 
-        if not _is_source_file(filename):
+        if _is_internal_frame(filename) or not _is_source_file(filename):
+            frame = frame.f_back
             continue
 
         if skipped < skip_frames:
             skipped += 1
+            frame = frame.f_back
             continue
 
         # Found an external source file
         content = _read_source_file(filename)
         if content is None:
+            frame = frame.f_back
             continue
 
-        return SourceFileInfo(
-            file_path=os.path.abspath(filename),
-            file_name=os.path.basename(filename),
-            line=frame_info.lineno,
-            column=0,  # Python doesn't provide column info easily
-            content=content,
-            function_name=frame_info.function if frame_info.function != "<module>" else None,
-        )
+        return _source_info(filename, frame.f_lineno, code.co_name, content)
 
     return None
 
@@ -170,42 +213,34 @@ def get_error_source_file(error: BaseException) -> Optional[SourceFileInfo]:
     if tb is None:
         return None
 
-    # Walk the traceback to the innermost frame
-    frames = traceback.extract_tb(tb)
-    if not frames:
-        return None
-
-    # Look from the bottom (innermost) for the first non-internal frame
-    for frame in reversed(frames):
-        filename = frame.filename
-
-        if _is_internal_frame(filename):
-            continue
-
-        if not _is_source_file(filename):
-            continue
-
+    # Walk the traceback links directly: extract_tb would also load the
+    # source line of every frame through linecache
+    frames = []
+    while tb is not None:
+        code = tb.tb_frame.f_code
+        filename = code.co_filename
+        if not _is_internal_frame(filename) and _is_source_file(filename):
+            frames.append((filename, tb.tb_lineno, code.co_name))
+        tb = tb.tb_next
+
+    # Look from the bottom (innermost) for the first readable external frame
+    for filename, lineno, name in reversed(frames):
         content = _read_source_file(filename)
         if content is None:
             continue
 
-        return SourceFileInfo(
-            file_path=os.path.abspath(filename),
-            file_name=os.path.basename(filename),
-            line=frame.lineno,
-            column=0,
-            content=content,
-            function_name=frame.name if frame.name != "<module>" else None,
-        )
+        return _source_info(filename, lineno, name, content)
 
     return None
 
 
+@functools.lru_cache(maxsize=128)
 def format_source_for_context(source: SourceFileInfo) -> str:
     """Format source file content with line numbers and an arrow marker.
 
-    The output highlights the relevant line with ``→`` and shows
-    surrounding lines with their line numbers.
+    The output highlights the relevant line with ``→`` and shows up to
+    ``CONTEXT_LINES`` lines on either side of it with their line numbers
+    (the top of the file when the line is unknown or out of range).
 
     Args:
         source: The source file info to format.
@@ -213,14 +248,19 @@ def format_source_for_context(source: SourceFileInfo) -> str:
     Returns:
         Formatted string ready to include in the AI prompt.
     """
-    lines = source.content.split("\n")
-    total = len(lines)
-
-    # Build line-numbered output with arrow marker
-    numbered: list[str] = []
-    for i, line_text in enumerate(lines, start=1):
-        marker = " → " if i == source.line else "   "
-        numbered.append(f"{marker}{i:>4} | {line_text}")
+    line_count = source.content.count("\n") + 1
+    target = source.line if 0 < source.line <= line_count else 0
+    first = max(1, target - CONTEXT_LINES)
+    last = (target or 1) + CONTEXT_LINES
+    # Split only as far as the window reaches, not the whole file
+    window = source.content.split("\n", last)[first - 1 : last]
+
+    # Build line-numbered output, then mark the one relevant line
+    numbered = [
+        f"   {i:>4} | {line_text}" for i, line_text in enumerate(window, start=first)
+    ]
+    if target:
+        numbered[target - first] = " → " + numbered[target - first][3:]
 
     header = f"--- Source File: {source.file_name} (line {source.line})"
     if source.function_name:
@@ -0,0 +1,53 @@
+"""
+JSON encoding and decoding — orjson when installed, stdlib otherwise.
+
+orjson (``pip install "console-agent[fast]"``) is several times faster than
+the stdlib in both directions. Anything orjson refuses (e.g. integers wider
+than 64 bits, NaN literals) falls back to the stdlib. Dataclasses and
+datetimes, which orjson would otherwise encode natively, go through
+``default`` on both paths, and enums encode as their value on both, so the
+output — context sent to the model, cache keys — doesn't depend on which is
+installed. Both emit non-ASCII text as-is; only whitespace may differ.
+"""
+
+from __future__ import annotations
+
+import json
+from enum import Enum
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when the extra is missing
+    orjson = None  # type: ignore[assignment]
+
+
+def dumps(value: Any, indent: bool = False, default: Callable[[Any], Any] = str) -> str:
+    """Serialize ``value`` to a JSON string (2-space indent when ``indent``)."""
+    if orjson is not None:
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | (orjson.OPT_INDENT_2 if indent else 0)
+        )
+        try:
+            return orjson.dumps(value, default=default, option=option).decode()
+        except (orjson.JSONEncodeError, TypeError):
+            pass
+    return json.dumps(
+        value,
+        indent=2 if indent else None,
+        default=lambda o: o.value if isinstance(o, Enum) else default(o),
+        ensure_ascii=False,
+    )
+
+
+def loads(text: str) -> Any:
+    """Parse a JSON document, raising ``json.JSONDecodeError`` when invalid."""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
@@ -8,8 +8,10 @@ When verbose=True, output includes [AGENT] prefix, tree structure, and full meta
 
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any, Optional
+import traceback
+from typing import Any, Callable, Optional
 
 from rich.console import Console
 from rich.live import Live
@@ -19,18 +21,28 @@ from rich.text import Text
 from ..types import AgentResult, LogLevel, PersonaDefinition
 
 _console = Console()
-_current_log_level: LogLevel = "info"
+
+# Rich markup shared by the verbose [AGENT] output
+_PREFIX = "[dim]\\[AGENT][/dim]"
+_ICON_OK = "[green]✓[/green]"
+_ICON_FAIL = "[red]✗[/red]"
 
 _LOG_LEVELS: list[LogLevel] = ["silent", "errors", "info", "debug"]
+_LEVEL_RANK: dict[LogLevel, int] = {level: rank for rank, level in enumerate(_LOG_LEVELS)}
+_DEBUG_RANK = _LEVEL_RANK["debug"]
+
+_current_log_level: LogLevel = "info"
+_current_rank = _LEVEL_RANK[_current_log_level]
 
 
 def set_log_level(level: LogLevel) -> None:
-    global _current_log_level
+    global _current_log_level, _current_rank
+    _current_rank = _LEVEL_RANK[level]
     _current_log_level = level
 
 
 def _should_log(level: LogLevel) -> bool:
-    return _LOG_LEVELS.index(_current_log_level) >= _LOG_LEVELS.index(level)
+    return _current_rank >= _LEVEL_RANK[level]
 
 
 # ─── Spinner Management ──────────────────────────────────────────────────────
@@ -47,9 +59,8 @@ class SpinnerHandle:
     def stop(self, success: bool) -> None:
         self._live.stop()
         if self._verbose:
-            prefix = "[dim]\\[AGENT][/dim]"
-            icon = "[green]✓[/green]" if success else "[red]✗[/red]"
-            _console.print(f"{prefix} {icon} {self._text}")
+            icon = _ICON_OK if success else _ICON_FAIL
+            _console.print(f"{_PREFIX} {icon} {self._text}")
 
 
 def start_spinner(persona: PersonaDefinition, prompt: str, verbose: bool = False) -> Optional[SpinnerHandle]:
@@ -73,6 +84,89 @@ def stop_spinner(spinner: Optional[SpinnerHandle], success: bool) -> None:
         spinner.stop(success)
 
 
+# ─── Streaming Output ────────────────────────────────────────────────────────
+
+
+class StreamingSpinner:
+    """Writes streamed response chunks with coalesced terminal writes.
+
+    ``push()`` only enqueues. A single consumer task drains every chunk that
+    arrives within ``window_ms`` (or up to ``max_chunks``) and writes them in
+    one flush, instead of one write + flush per token.
+    """
+
+    def __init__(
+        self,
+        write: Optional[Callable[[str], None]] = None,
+        window_ms: int = 10,
+        max_chunks: int = 64,
+    ) -> None:
+        self._write = write or _write_raw
+        self._window = window_ms / 1000.0
+        self._max_chunks = max(1, max_chunks)
+        self._queue: Optional[asyncio.Queue[Optional[str]]] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self.flushes = 0
+
+    def push(self, chunk: str) -> None:
+        """Queue a chunk for display (must be called from the event loop)."""
+        if not chunk:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._consume(self._queue))
+        self._queue.put_nowait(chunk)
+
+    async def aclose(self) -> None:
+        """Flush whatever is pending and stop the consumer."""
+        if self._queue is None or self._task is None:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+
+    async def _consume(self, queue: asyncio.Queue[Optional[str]]) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                return
+            parts = [chunk]
+            deadline = loop.time() + self._window
+            closing = False
+            while len(parts) < self._max_chunks:
+                try:
+                    nxt = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        nxt = await asyncio.wait_for(queue.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if nxt is None:
+                    closing = True
+                    break
+                parts.append(nxt)
+            self._write("".join(parts))
+            self.flushes += 1
+            if closing:
+                return
+
+
+def _write_raw(text: str) -> None:
+    # Raw model text — bypass Rich markup parsing
+    _console.file.write(text)
+    _console.file.flush()
+
+
+def start_streaming_spinner(verbose: bool = False) -> Optional[StreamingSpinner]:
+    """Create a streaming writer, or None when output is suppressed."""
+    if not _should_log("info") or not verbose:
+        return None
+    return StreamingSpinner()
+
+
 # ─── Result Formatting ──────────────────────────────────────────────────────
 
 
@@ -82,15 +176,14 @@ def format_result(result: AgentResult, persona: PersonaDefinition, verbose: bool
 
     if not verbose:
         # Quiet mode: just summary + meaningful data
-        _console.print(result.summary)
+        lines = [result.summary]
         for key, value in result.data.items():
             display_value = value if isinstance(value, str) else json.dumps(value)
-            _console.print(f"  {key}: {display_value}")
+            lines.append(f"  {key}: {display_value}")
+        _console.print("\n".join(lines))
         return
 
-    # Verbose mode: full [AGENT] tree
-    prefix = "[dim]\\[AGENT][/dim]"
-
+    # Verbose mode: full [AGENT] tree, built up and printed in one call
     if result.confidence >= 0.8:
         conf_style = "green"
     elif result.confidence >= 0.5:
@@ -98,27 +191,28 @@ def format_result(result: AgentResult, persona: PersonaDefinition, verbose: bool
     else:
         conf_style = "red"
 
-    status_icon = "[green]✓[/green]" if result.success else "[red]✗[/red]"
+    status_icon = _ICON_OK if result.success else _ICON_FAIL
 
-    _console.print()
-    _console.print(f"{prefix} {persona.icon} [bold]{persona.label}[/bold] Complete")
-    _console.print(f"{prefix} ├─ {status_icon} {result.summary}")
+    lines = [
+        "",
+        f"{_PREFIX} {persona.icon} [bold]{persona.label}[/bold] Complete",
+        f"{_PREFIX} ├─ {status_icon} {result.summary}",
+    ]
 
     # Show actions / tools used
     for action in result.actions:
-        _console.print(f"{prefix} ├─ [dim]Tool:[/dim] [cyan]{action}[/cyan]")
+        lines.append(f"{_PREFIX} ├─ [dim]Tool:[/dim] [cyan]{action}[/cyan]")
 
     # Show key data points
     for key, value in result.data.items():
         display_value = value if isinstance(value, str) else json.dumps(value)
-        _console.print(f"{prefix} ├─ [dim]{key}:[/dim] {display_value}")
+        lines.append(f"{_PREFIX} ├─ [dim]{key}:[/dim] {display_value}")
 
     # Show reasoning if available
     if result.reasoning:
-        lines = result.reasoning.split("\n")[:3]
-        _console.print(f"{prefix} ├─ [dim]Reasoning:[/dim]")
-        for line in lines:
-            _console.print(f"{prefix} │  [dim]{line.strip()}[/dim]")
+        lines.append(f"{_PREFIX} ├─ [dim]Reasoning:[/dim]")
+        for line in result.reasoning.split("\n")[:3]:
+            lines.append(f"{_PREFIX} │  [dim]{line.strip()}[/dim]")
 
     # Footer with metadata
     confidence = f"[{conf_style}]confidence: {result.confidence:.2f}[/{conf_style}]"
@@ -126,8 +220,9 @@ def format_result(result: AgentResult, persona: PersonaDefinition, verbose: bool
     tokens = f"[dim]{result.metadata.tokens_used} tokens[/dim]"
     cached = " [green](cached)[/green]" if result.metadata.cached else ""
 
-    _console.print(f"{prefix} └─ {confidence} | {latency} | {tokens}{cached}")
-    _console.print()
+    lines.append(f"{_PREFIX} └─ {confidence} | {latency} | {tokens}{cached}")
+    lines.append("")
+    _console.print("\n".join(lines))
 
 
 # ─── Error Formatting ────────────────────────────────────────────────────────
@@ -143,13 +238,11 @@ def format_error(error: Exception, persona: PersonaDefinition, verbose: bool = F
         return
 
     # Verbose mode: full [AGENT] prefix
-    prefix = "[dim]\\[AGENT][/dim]"
     _console.print()
-    _console.print(f"{prefix} {persona.icon} [red]Error:[/red] {error}")
+    _console.print(f"{_PREFIX} {persona.icon} [red]Error:[/red] {error}")
     if _should_log("debug"):
-        import traceback
-        tb = traceback.format_exception(type(error), error, error.__traceback__)
-        _console.print(f"{prefix} [dim]{''.join(tb)}[/dim]")
+        tb = "".join(traceback.format_exception(error))
+        _console.print(f"{_PREFIX} [dim]{tb}[/dim]")
     _console.print()
 
 
@@ -162,8 +255,7 @@ def format_budget_warning(reason: str, verbose: bool = False) -> None:
     if not verbose:
         _console.print(f"Budget limit: {reason}")
         return
-    prefix = "[dim]\\[AGENT][/dim]"
-    _console.print(f"{prefix} [yellow]⚠ Budget limit:[/yellow] {reason}")
+    _console.print(f"{_PREFIX} [yellow]⚠ Budget limit:[/yellow] {reason}")
 
 
 # ─── Rate Limit Warning ─────────────────────────────────────────────────────
@@ -175,8 +267,7 @@ def format_rate_limit_warning(verbose: bool = False) -> None:
     if not verbose:
         _console.print("Rate limited: Too many calls. Try again later.")
         return
-    prefix = "[dim]\\[AGENT][/dim]"
-    _console.print(f"{prefix} [yellow]⚠ Rate limited:[/yellow] Too many calls. Try again later.")
+    _console.print(f"{_PREFIX} [yellow]⚠ Rate limited:[/yellow] Too many calls. Try again later.")
 
 
 # ─── Dry Run ─────────────────────────────────────────────────────────────────
@@ -196,28 +287,30 @@ def format_dry_run(
         _console.print(f"[DRY RUN] {persona.label}: {prompt}")
         return
 
-    # Verbose mode: full tree
-    prefix = "[dim]\\[AGENT][/dim]"
-    _console.print()
-    _console.print(f"{prefix} [magenta]DRY RUN[/magenta] {persona.icon} {persona.label}")
-    _console.print(f"{prefix} ├─ [dim]Persona:[/dim] {persona.name}")
-    _console.print(f"{prefix} ├─ [dim]Prompt:[/dim] {prompt}")
+    # Verbose mode: full tree, printed in one call
+    lines = [
+        "",
+        f"{_PREFIX} [magenta]DRY RUN[/magenta] {persona.icon} {persona.label}",
+        f"{_PREFIX} ├─ [dim]Persona:[/dim] {persona.name}",
+        f"{_PREFIX} ├─ [dim]Prompt:[/dim] {prompt}",
+    ]
 
     if context is not None:
         ctx_str = context if isinstance(context, str) else json.dumps(context, indent=2, default=str)
-        lines = ctx_str.split("\n")[:5]
-        _console.print(f"{prefix} ├─ [dim]Context:[/dim]")
-        for line in lines:
-            _console.print(f"{prefix} │  [dim]{line}[/dim]")
+        lines.append(f"{_PREFIX} ├─ [dim]Context:[/dim]")
+        for line in ctx_str.split("\n")[:5]:
+            lines.append(f"{_PREFIX} │  [dim]{line}[/dim]")
 
-    _console.print(f"{prefix} └─ [dim](No API call made)[/dim]")
-    _console.print()
+    lines.append(f"{_PREFIX} └─ [dim](No API call made)[/dim]")
+    lines.append("")
+    _console.print("\n".join(lines))
 
 
 # ─── Debug logging ───────────────────────────────────────────────────────────
 
 
 def log_debug(message: str) -> None:
-    if not _should_log("debug"):
+    # Inlined level check: providers call this several times per request
+    if _current_rank < _DEBUG_RANK:
         return
     _console.print(f"[dim]\\[AGENT DEBUG][/dim] [dim]{message}[/dim]")
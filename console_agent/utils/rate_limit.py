@@ -1,44 +1,79 @@
 """
 Token bucket rate limiter.
 Controls the rate of API calls to prevent abuse and stay within budget.
+
+The hot path is lock-free: every call takes a ticket from an
+``itertools.count`` (atomic under the GIL) and is allowed while its ticket is
+below ``_ceiling``. Denied tickets are simply dropped — the next refill
+rebases the ceiling on the current ticket — so only refills (once per whole
+accrued token) take the lock. Under heavy contention a refill may admit the
+few calls already in flight alongside it; otherwise limits are exact.
 """
 
 from __future__ import annotations
 
+import itertools
+import math
+import threading
 import time
 
+_NS_PER_DAY = 24 * 60 * 60 * 1_000_000_000
+
 
 class RateLimiter:
     """Token bucket rate limiter for API calls."""
 
     def __init__(self, max_calls_per_day: int) -> None:
         self._max_tokens = max_calls_per_day
-        self._tokens = float(max_calls_per_day)
-        # Refill rate: spread calls evenly across 24 hours (tokens per second)
-        self._refill_rate = max_calls_per_day / (24 * 60 * 60)
-        self._last_refill = time.monotonic()
+        # Refill: spread calls evenly across 24 hours, kept in integer nanoseconds
+        self._ns_per_token = _NS_PER_DAY // max_calls_per_day if max_calls_per_day > 0 else 0
+        self._lock = threading.Lock()
+        self.reset()
 
     def try_consume(self) -> bool:
         """Attempt to consume one token. Returns True if allowed."""
-        self._refill()
-        if self._tokens >= 1:
-            self._tokens -= 1
-            return True
-        return False
+        ticket = next(self._tickets)
+        now = time.monotonic_ns()
+        if now >= self._next_refill:
+            self._refill(now, ticket)
+        return ticket < self._ceiling
 
     def remaining(self) -> int:
         """Get remaining tokens (calls available)."""
-        self._refill()
-        return int(self._tokens)
+        ticket = next(self._tickets)
+        now = time.monotonic_ns()
+        if now >= self._next_refill:
+            self._refill(now, ticket)
+        available = self._ceiling - ticket
+        if available > 0:
+            # Only peeking — give back the slot this ticket occupied
+            with self._lock:
+                self._ceiling += 1
+        return max(0, available)
 
     def reset(self) -> None:
         """Reset the limiter (e.g., for testing)."""
-        self._tokens = float(self._max_tokens)
-        self._last_refill = time.monotonic()
-
-    def _refill(self) -> None:
-        now = time.monotonic()
-        elapsed = now - self._last_refill
-        new_tokens = elapsed * self._refill_rate
-        self._tokens = min(self._max_tokens, self._tokens + new_tokens)
-        self._last_refill = now
+        with self._lock:
+            self._tickets = itertools.count()
+            self._ceiling = self._max_tokens
+            self._last_refill = time.monotonic_ns()
+            self._next_refill = self._refill_after(self._last_refill)
+
+    def _refill(self, now: int, ticket: int) -> None:
+        with self._lock:
+            if now < self._next_refill:  # another thread got here first
+                return
+            whole = (now - self._last_refill) // self._ns_per_token
+            available = max(0, self._ceiling - ticket)
+            if available + whole >= self._max_tokens:
+                # Bucket is full — accrual beyond capacity is lost
+                self._ceiling = ticket + self._max_tokens
+                self._last_refill = now
+            else:
+                self._ceiling = ticket + available + whole
+                # Keep the partial token accruing toward the next one
+                self._last_refill += whole * self._ns_per_token
+            self._next_refill = self._refill_after(self._last_refill)
+
+    def _refill_after(self, last_refill: int) -> float:
+        return last_refill + self._ns_per_token if self._ns_per_token else math.inf
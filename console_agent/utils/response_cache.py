@@ -0,0 +1,266 @@
+"""
+Response cache — reuses results of identical agent() calls.
+
+Keys are a SHA-256 digest of everything that shapes the request (provider,
+model, persona, anonymized prompt and context, caller source, output-affecting
+options), so a hit is exactly the request that was already answered. Keys also carry
+the cache format and package version, so an upgrade — new persona prompts,
+new result fields — never reuses answers stored by an older release. Only
+successful results are stored, bounded by ``cache.max_entries`` (LRU) and
+``cache.ttl_s``. Results are frozen, but their ``data`` and ``actions`` are
+plain dicts and lists, so the cache keeps its own copy of each result and
+every hit gets a fresh one — a caller editing its result can't change what
+later hits (or the original caller) see.
+
+With ``cache.path`` set, results are also written to an SQLite file there,
+so repeated runs (dev iteration, CI) reuse answers across processes. The
+in-memory LRU stays in front of it; disk entries expire by wall-clock time,
+and a disk hit keeps the expiry it was stored with.
+
+With ``cache.semantic_threshold`` set, a SemanticIndex also maps prompt
+embeddings to exact keys, so a near-duplicate prompt — everything else about
+the call identical — can reuse an answer (see SemanticIndex).
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import importlib.metadata
+import math
+import operator
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Sequence, Tuple
+
+from ..types import AgentResult
+from . import fastjson
+
+
+# Bump when the key layout or the stored AgentResult changes shape
+CACHE_FORMAT = 1
+
+
+def _package_version() -> str:
+    try:
+        return importlib.metadata.version("console-agent")
+    except importlib.metadata.PackageNotFoundError:  # running from a source tree
+        from .. import __version__
+
+        return __version__
+
+
+_KEY_VERSION = (CACHE_FORMAT, _package_version())
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Digest of the JSON-encoded ``parts`` (non-JSON values via ``str``),
+    scoped to this cache format and package version."""
+    return hashlib.sha256(fastjson.dumps((_KEY_VERSION, parts)).encode()).hexdigest()
+
+
+def detach_result(result: AgentResult, **update: Any) -> AgentResult:
+    """Copy of ``result`` (with ``update`` applied) owning its data and actions."""
+    return result.model_copy(
+        update={"data": copy.deepcopy(result.data), "actions": list(result.actions), **update}
+    )
+
+
+class ResponseCache:
+    """Bounded LRU of successful AgentResults with a time-to-live."""
+
+    def __init__(self, max_entries: int, ttl_s: float, path: Optional[str] = None) -> None:
+        self._max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._entries: "OrderedDict[str, Tuple[float, AgentResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._store = _open_store(path) if path and max_entries > 0 else None
+        # Rows in the store, tracked so pruning only runs when a put overflows
+        self._stored = 0
+        if self._store is not None:
+            row = self._execute("SELECT COUNT(*) FROM responses")
+            self._stored = row[0] if row else 0
+
+    def get(self, key: str) -> Optional[AgentResult]:
+        """Return the cached result for ``key``, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return self._load(key)
+            if time.monotonic() >= entry[0]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return detach_result(entry[1])
+
+    def put(self, key: str, result: AgentResult) -> None:
+        """Store ``result`` (successful results only) as its cached form."""
+        if not result.success or self._max_entries <= 0:
+            return
+        cached = detach_result(
+            result,
+            metadata=result.metadata.model_copy(
+                update={"cached": True, "tokens_used": 0, "latency_ms": 0}
+            ),
+        )
+        with self._lock:
+            self._remember(key, cached)
+            self._save(key, cached)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._store is not None:
+                self._execute("DELETE FROM responses")
+                self._stored = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # The helpers below are called with the lock held
+
+    def _remember(self, key: str, cached: AgentResult, ttl_s: Optional[float] = None) -> None:
+        ttl_s = self._ttl_s if ttl_s is None else ttl_s
+        self._entries[key] = (time.monotonic() + ttl_s, cached)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[AgentResult]:
+        if self._store is None:
+            return None
+        now = time.time()
+        row = self._execute(
+            "SELECT expires_at, payload FROM responses WHERE key = ? AND expires_at > ?",
+            (key, now),
+        )
+        if row is None:
+            return None
+        try:
+            cached = AgentResult.model_validate_json(row[1])
+        except ValueError:  # written by an incompatible version
+            return None
+        # Only for what is left of the entry's lifetime, not a fresh ttl_s
+        self._remember(key, cached, ttl_s=row[0] - now)
+        return detach_result(cached)
+
+    def _save(self, key: str, cached: AgentResult) -> None:
+        if self._store is None:
+            return
+        try:
+            payload = cached.model_dump_json()
+        except ValueError:  # e.g. a tool result that is not JSON-serializable
+            return
+        try:
+            with self._store:  # one transaction, committed on success
+                replaced = self._store.execute(
+                    "DELETE FROM responses WHERE key = ?", (key,)
+                ).rowcount
+                self._store.execute(
+                    "INSERT INTO responses VALUES (?, ?, ?)",
+                    (key, time.time() + self._ttl_s, payload),
+                )
+                stored = self._stored + 1 - replaced
+                # Same bound as in memory; every entry lives ttl_s, so the
+                # earliest expiries (expired rows first) are the oldest
+                if stored > self._max_entries:
+                    self._store.execute(
+                        "DELETE FROM responses WHERE key IN"
+                        " (SELECT key FROM responses ORDER BY expires_at LIMIT ?)",
+                        (stored - self._max_entries,),
+                    )
+                    stored = self._max_entries
+        except sqlite3.Error:
+            return
+        self._stored = stored
+
+    def _execute(self, sql: str, params: Tuple[Any, ...] = ()) -> Optional[Tuple[Any, ...]]:
+        """Run one statement and return its first row; disk errors count as misses."""
+        try:
+            with self._store:  # commits on success
+                return self._store.execute(sql, params).fetchone()
+        except sqlite3.Error:
+            return None
+
+
+def _open_store(path: str) -> Optional[sqlite3.Connection]:
+    """Open (creating if needed) the on-disk cache, or None if it can't be."""
+    path = os.path.expanduser(path)
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        store = sqlite3.connect(path, check_same_thread=False)
+        # WAL commits skip the per-write fsync of the default rollback journal
+        store.execute("PRAGMA journal_mode=WAL")
+        store.execute("PRAGMA synchronous=NORMAL")
+        store.execute(
+            "CREATE TABLE IF NOT EXISTS responses"
+            " (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+        )
+        store.execute(
+            "CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)"
+        )
+        store.commit()
+        return store
+    except (OSError, sqlite3.Error):
+        return None
+
+
+class SemanticIndex:
+    """Nearest-prompt lookup over embeddings of cached calls.
+
+    Entries are grouped by ``scope`` — the cache key of the call with its
+    prompt left out — so only the prompt may differ between a query and the
+    result it reuses; persona, model, context and options match exactly. The
+    index only points at ResponseCache keys: an evicted or expired answer is
+    simply a miss. Bounded by ``max_entries`` (oldest dropped first), which
+    keeps the linear scan to a few hundred dot products of short vectors.
+    """
+
+    def __init__(self, max_entries: int, threshold: float) -> None:
+        self._max_entries = max_entries
+        self._threshold = threshold
+        self._entries: "OrderedDict[str, Tuple[str, Tuple[float, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, scope: str, embedding: Sequence[float], key: str) -> None:
+        """Remember that the prompt embedded as ``embedding`` was answered under ``key``."""
+        vector = _unit(embedding)
+        if vector is None or self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (scope, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def nearest(self, scope: str, embedding: Sequence[float]) -> Optional[str]:
+        """Key of the most similar prompt in ``scope`` at or above the threshold."""
+        vector = _unit(embedding)
+        if vector is None:
+            return None
+        best_key, best = None, self._threshold
+        with self._lock:
+            entries = list(self._entries.items())
+        for key, (entry_scope, entry_vector) in entries:
+            if entry_scope != scope or len(entry_vector) != len(vector):
+                continue
+            similarity = sum(map(operator.mul, vector, entry_vector))
+            if similarity >= best:
+                best_key, best = key, similarity
+        return best_key
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _unit(embedding: Sequence[float]) -> Optional[Tuple[float, ...]]:
+    """``embedding`` scaled to length 1 (cosine becomes a dot product), or None if empty."""
+    norm = math.sqrt(sum(v * v for v in embedding))
+    return tuple(v / norm for v in embedding) if norm else None
@@ -0,0 +1,105 @@
+"""
+Sync → async bridge used by the blocking ``agent()`` entry point.
+
+Coroutines are submitted to one long-lived daemon thread that owns a
+persistent event loop — whether or not the caller has a loop of its own
+(Jupyter, FastAPI handlers) — instead of paying for a new loop on every call.
+Because that loop outlives individual calls, provider clients bound to it
+keep their pooled connections between calls: a script calling ``agent()``
+in a loop builds one Gemini client, not one per call.
+
+The caller's frame travels with the coroutine (caller_file.CALL_SITE), so
+caller-source detection still sees the user's code.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+from types import FrameType
+from typing import Any, Coroutine, Optional, TypeVar
+
+from .caller_file import CALL_SITE
+
+T = TypeVar("T")
+
+
+class _LoopThread:
+    """A daemon thread running ``loop.run_forever()``, started on first use."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        loop = self._loop
+        if loop is not None and self._thread is not None and self._thread.is_alive():
+            return loop
+        with self._lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                self._start()
+            assert self._loop is not None
+            return self._loop
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=_run, name="console-agent-runsync", daemon=True)
+        thread.start()
+        ready.wait()
+        self._loop, self._thread = loop, thread
+
+    def owns_current_thread(self) -> bool:
+        return self._thread is threading.current_thread()
+
+
+_loop_thread = _LoopThread()
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion from synchronous code."""
+    if _loop_thread.owns_current_thread():
+        # Sync agent() called from a coroutine on the shared loop itself —
+        # blocking here would deadlock it, so fall back to a one-off loop.
+        return _run_in_fresh_thread(coro, sys._getframe(1))
+
+    # The task copies this context when it is created, frame included
+    token = CALL_SITE.set(sys._getframe(1))
+    try:
+        future = asyncio.run_coroutine_threadsafe(coro, _loop_thread.loop)
+    finally:
+        CALL_SITE.reset(token)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()  # e.g. Ctrl-C: don't leave the call running behind us
+        raise
+
+
+def _run_in_fresh_thread(coro: Coroutine[Any, Any, T], call_site: FrameType) -> T:
+    result_container: list[Any] = [None]
+    exception_container: list[Optional[BaseException]] = [None]
+
+    def _run() -> None:
+        CALL_SITE.set(call_site)  # a new thread starts with an empty context
+        try:
+            result_container[0] = asyncio.run(coro)
+        except BaseException as exc:
+            exception_container[0] = exc
+
+    thread = threading.Thread(target=_run)
+    thread.start()
+    thread.join()
+
+    if exception_container[0] is not None:
+        raise exception_container[0]
+    return result_container[0]
@@ -0,0 +1,72 @@
+"""
+Request throttle — paces provider requests instead of rejecting them.
+
+Unlike the daily RateLimiter (which refuses calls once the budget is spent),
+the throttle makes requests *wait*: at most ``max_concurrency`` requests are
+in flight per event loop, and request starts are paced to ``rpm`` per minute
+by a token bucket holding a few seconds' worth of burst. Bursts of calls are
+spread out instead of tripping the provider's per-minute quota (HTTP 429).
+
+The bucket hands out reservations under a thread lock and the caller sleeps
+off its own wait, so one throttle serves every event loop and thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import threading
+import time
+import weakref
+from typing import AsyncIterator
+
+
+class RequestThrottle:
+    """Concurrency cap plus requests-per-minute pacing (0 disables either)."""
+
+    def __init__(self, rpm: int, max_concurrency: int) -> None:
+        self.rpm = rpm
+        self.max_concurrency = max_concurrency
+        self._rate = rpm / 60.0  # tokens per second
+        self._capacity = max(1.0, rpm / 10)  # ~6 seconds of burst
+        self._tokens = self._capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        # asyncio.Semaphore binds to one loop, so each loop gets its own
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a concurrency slot, paced, for the duration of one request."""
+        if self.max_concurrency <= 0:
+            await self._pace()
+            yield
+            return
+        async with self._semaphore():
+            await self._pace()
+            yield
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _pace(self) -> None:
+        if self._rate <= 0:
+            return
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _reserve(self) -> float:
+        """Take one token (possibly on credit) and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+            self._last = now
+            self._tokens -= 1
+            return -self._tokens / self._rate if self._tokens < 0 else 0.0
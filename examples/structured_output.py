@@ -20,6 +20,8 @@ init(
     model="gemini-2.5-flash-lite",
     mode="blocking",
     log_level="info",
+    service_tier="flex",  # Demo script: no latency target, so take the discount
+    timeout=60000,  # Flex requests may wait for capacity
 )
 
 # ═══════════════════════════════════════════════════════════════
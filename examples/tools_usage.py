@@ -8,71 +8,73 @@ console-agent supports three native Gemini tools:
 
 Tools are opt-in: specify them via the `tools` parameter.
 
+The calls below are independent, so they run concurrently with
+agent.arun() + asyncio.gather — the whole script takes about as long as
+the slowest call instead of the sum of all of them.
+
 Requires: GEMINI_API_KEY environment variable set.
 """
 
-from console_agent import agent, init
-
-# Initialize with a capable model
-init(model="gemini-2.5-flash", verbose=True)
-
-
-# ─── Google Search ────────────────────────────────────────────────────────────
-# Use Google Search grounding for real-time information
-
-result = agent(
-    "What are the latest developments in AI agents in 2025?",
-    tools=["google_search"],
-)
-print(f"Search result: {result.summary}\n")
-
-
-# ─── URL Context ──────────────────────────────────────────────────────────────
-# Analyze content from a specific URL
-
-result = agent(
-    "Analyze the content of https://docs.agno.com/introduction",
-    tools=["url_context"],
-)
-print(f"URL analysis: {result.summary}\n")
-
+import asyncio
 
-# ─── Search + URL Context (combined) ─────────────────────────────────────────
-# Search the web AND analyze URL content for comprehensive results
-
-result = agent(
-    "Analyze https://docs.agno.com/introduction and give me latest updates on AI agents",
-    tools=["google_search", "url_context"],
-)
-print(f"Combined result: {result.summary}\n")
-
-
-# ─── Code Execution ──────────────────────────────────────────────────────────
-# Execute Python code server-side for calculations and data processing
-
-result = agent(
-    "Calculate the first 20 Fibonacci numbers and return them as a list",
-    tools=["code_execution"],
-)
-print(f"Code execution result: {result.summary}\n")
-
-
-# ─── All Three Tools ─────────────────────────────────────────────────────────
-# Combine search, URL context, and code execution
-
-result = agent(
-    "Search for the current Python version, analyze the Python.org downloads page, "
-    "and write a script to verify the version number format is valid",
-    tools=["google_search", "url_context", "code_execution"],
-)
-print(f"Full tool result: {result.summary}\n")
-
-
-# ─── Tools with Persona ──────────────────────────────────────────────────────
-# Tools work with persona shortcuts too (via **kwargs)
+from console_agent import agent, init
 
-result = agent.security(
-    "Search for the latest OWASP Top 10 and analyze the security implications",
-    tools=["google_search"],
-)
-print(f"Security analysis: {result.summary}\n")
+# Initialize with a capable model; at most 5 requests in flight at once
+init(model="gemini-2.5-flash", verbose=True, throttle={"max_concurrency": 5})
+
+
+async def main():
+    results = await asyncio.gather(
+        # ─── Google Search ────────────────────────────────────────────────────
+        # Use Google Search grounding for real-time information
+        agent.arun(
+            "What are the latest developments in AI agents in 2025?",
+            tools=["google_search"],
+        ),
+        # ─── URL Context ──────────────────────────────────────────────────────
+        # Analyze content from a specific URL
+        agent.arun(
+            "Analyze the content of https://docs.agno.com/introduction",
+            tools=["url_context"],
+        ),
+        # ─── Search + URL Context (combined) ──────────────────────────────────
+        # Search the web AND analyze URL content for comprehensive results
+        agent.arun(
+            "Analyze https://docs.agno.com/introduction and give me latest updates on AI agents",
+            tools=["google_search", "url_context"],
+        ),
+        # ─── Code Execution ───────────────────────────────────────────────────
+        # Execute Python code server-side for calculations and data processing
+        agent.arun(
+            "Calculate the first 20 Fibonacci numbers and return them as a list",
+            tools=["code_execution"],
+        ),
+        # ─── All Three Tools ──────────────────────────────────────────────────
+        # Combine search, URL context, and code execution
+        agent.arun(
+            "Search for the current Python version, analyze the Python.org downloads page, "
+            "and write a script to verify the version number format is valid",
+            tools=["google_search", "url_context", "code_execution"],
+        ),
+        # ─── Tools with Persona ───────────────────────────────────────────────
+        # Tools work with persona shortcuts too (via **kwargs)
+        agent.security.arun(
+            "Search for the latest OWASP Top 10 and analyze the security implications",
+            tools=["google_search"],
+        ),
+    )
+
+    labels = [
+        "Search result",
+        "URL analysis",
+        "Combined result",
+        "Code execution result",
+        "Full tool result",
+        "Security analysis",
+    ]
+    for label, result in zip(labels, results):
+        print(f"{label}: {result.summary}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
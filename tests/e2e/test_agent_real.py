@@ -6,8 +6,10 @@ Requires GEMINI_API_KEY in environment.
 Run with: pytest tests/e2e/ -v
 """
 
+import asyncio
 import json
 import os
+import time
 
 import pytest
 from pydantic import BaseModel, Field
@@ -326,6 +328,25 @@ class TestAsyncAgent:
             json.dumps(result.model_dump(), indent=2, default=str),
         )
 
+    @pytest.mark.asyncio
+    async def test_async_independent_calls_overlap(self):
+        """independent agent.arun() calls all complete when gathered"""
+        prompts = [
+            "What is 5 + 5? Answer concisely.",
+            "What is the capital of France? Answer concisely.",
+            "Name one prime number. Answer concisely.",
+        ]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(agent.arun(p) for p in prompts))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert len(results) == len(prompts)
+        for result in results:
+            assert_valid_result(result)
+            assert result.success is True
+        # Timing depends on live network jitter, so it is reported, not asserted
+        print(f"{len(prompts)} concurrent calls in {elapsed_ms:.0f}ms")
+
 
 class TestNativeTools:
     """E2E: Native Gemini tools (google_search, url_context, code_execution).
@@ -1,5 +1,8 @@
 """Tests for agent configuration."""
 
+import pytest
+from pydantic import ValidationError
+
 from console_agent.core import DEFAULT_CONFIG, get_config, update_config
 from console_agent.types import AgentConfig
 
@@ -79,8 +82,45 @@ class TestUpdateConfig:
         # Other budget fields should retain defaults
         assert config.budget.max_tokens_per_call == 8000
 
-    def test_get_config_returns_copy(self):
+    def test_get_config_returns_snapshot(self):
         c1 = get_config()
         c2 = get_config()
-        assert c1 is not c2
-        assert c1.model == c2.model
+        assert c1 is c2
+
+    def test_config_is_immutable(self):
+        config = get_config()
+        with pytest.raises(ValidationError):
+            config.model = "other-model"  # type: ignore[misc]
+        with pytest.raises(ValidationError):
+            config.budget.max_calls_per_day = 1  # type: ignore[misc]
+
+    def test_update_replaces_snapshot(self):
+        before = get_config()
+        update_config(verbose=True)
+        after = get_config()
+        assert after is not before
+        assert before.verbose is False
+        assert after.verbose is True
+        update_config(verbose=False)
+
+    def test_update_validates_values(self):
+        with pytest.raises(ValidationError):
+            update_config(mode="sometimes")
+
+    def test_unrelated_update_keeps_rate_limiter(self):
+        from console_agent import core
+
+        limiter, tracker = core._rate_limiter, core._budget_tracker
+        update_config(verbose=True)
+        assert core._rate_limiter is limiter
+        assert core._budget_tracker is tracker
+        update_config(budget={"max_calls_per_day": 50})
+        assert core._rate_limiter is not limiter
+        update_config(verbose=False, budget={"max_calls_per_day": 100})
+
+    def test_budget_in_dict_and_kwargs_both_merge(self):
+        update_config({"budget": {"max_calls_per_day": 7}}, budget={"cost_cap_daily": 2.0})
+        budget = get_config().budget
+        assert budget.max_calls_per_day == 7
+        assert budget.cost_cap_daily == 2.0
+        update_config(budget={"max_calls_per_day": 100, "cost_cap_daily": 1.0})
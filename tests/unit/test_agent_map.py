@@ -0,0 +1,72 @@
+"""Tests for agent.map() / agent.amap() fan-out."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from console_agent import agent
+from console_agent.core import update_config
+from console_agent.types import AgentMetadata, AgentResult
+
+
+class _FakeProvider:
+    """Stand-in for call_google that records concurrency and arguments."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+        self.calls: list[tuple[str, str, str]] = []
+
+    async def __call__(self, prompt, context, persona, config, options, **kw):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.calls.append((prompt, context, persona.name))
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return AgentResult(
+            success=True,
+            summary=prompt,
+            confidence=1.0,
+            metadata=AgentMetadata(model=config.model),
+        )
+
+
+class TestAgentMap:
+    def setup_method(self):
+        update_config(log_level="silent", include_caller_source=False, anonymize=False)
+
+    def teardown_method(self):
+        update_config(log_level="info", include_caller_source=True, anonymize=True)
+
+    @pytest.mark.asyncio
+    async def test_amap_preserves_order_and_bounds_concurrency(self):
+        fake = _FakeProvider()
+        with patch("console_agent.core.call_google", fake):
+            results = await agent.amap([f"task {i}" for i in range(10)], concurrency=3)
+
+        assert [r.summary for r in results] == [f"task {i}" for i in range(10)]
+        assert fake.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_per_prompt_contexts(self):
+        fake = _FakeProvider()
+        with patch("console_agent.core.call_google", fake):
+            await agent.amap(["a", "b"], contexts=["ctx-a", "ctx-b"])
+
+        assert sorted((p, c) for p, c, _ in fake.calls) == [("a", "ctx-a"), ("b", "ctx-b")]
+
+    @pytest.mark.asyncio
+    async def test_contexts_length_mismatch(self):
+        with pytest.raises(ValueError):
+            await agent.amap(["a", "b"], contexts=["only one"])
+
+    def test_sync_map_with_persona_shortcut(self):
+        fake = _FakeProvider()
+        with patch("console_agent.core.call_google", fake):
+            results = agent.security.map(["check a", "check b"])
+
+        assert [r.summary for r in results] == ["check a", "check b"]
+        assert {name for _, _, name in fake.calls} == {"security"}
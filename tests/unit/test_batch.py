@@ -0,0 +1,282 @@
+"""Tests for the batch coalescer and row marshaling."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from console_agent.core import get_config, update_config
+from console_agent.types import AgentMetadata, AgentResult
+from console_agent.utils.batch import BatchCoalescer, marshal_rows, unmarshal_rows
+
+
+def _echo_dispatch(calls: list):
+    async def dispatch(items):
+        calls.append([item.prompt for item in items])
+        return [
+            AgentResult(success=True, summary=item.prompt, confidence=1.0)
+            for item in items
+        ]
+
+    return dispatch
+
+
+class TestBatchCoalescer:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_dispatch(self):
+        calls: list = []
+        batcher = BatchCoalescer(_echo_dispatch(calls), wait_ms=20, max_size=16)
+
+        results = await asyncio.gather(
+            *[batcher.submit("k", f"p{i}", "") for i in range(5)]
+        )
+
+        assert [r.summary for r in results] == ["p0", "p1", "p2", "p3", "p4"]
+        assert len(calls) == 1
+        assert batcher.stats.merge_rate == 5.0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_are_dispatched_separately(self):
+        calls: list = []
+        batcher = BatchCoalescer(_echo_dispatch(calls), wait_ms=20, max_size=16)
+
+        await asyncio.gather(
+            batcher.submit("security", "a", ""),
+            batcher.submit("debugger", "b", ""),
+            batcher.submit("security", "c", ""),
+        )
+
+        assert sorted(calls) == [["a", "c"], ["b"]]
+
+    @pytest.mark.asyncio
+    async def test_max_size_splits_batches(self):
+        calls: list = []
+        batcher = BatchCoalescer(_echo_dispatch(calls), wait_ms=1000, max_size=2)
+
+        await asyncio.wait_for(
+            asyncio.gather(*[batcher.submit("k", str(i), "") for i in range(4)]),
+            timeout=0.5,
+        )
+
+        assert calls == [["0", "1"], ["2", "3"]]
+
+    @pytest.mark.asyncio
+    async def test_dispatch_error_propagates_to_callers(self):
+        async def failing(items):
+            raise RuntimeError("boom")
+
+        batcher = BatchCoalescer(failing, wait_ms=5)
+        with pytest.raises(RuntimeError, match="boom"):
+            await batcher.submit("k", "p", "")
+
+
+class TestRowMarshaling:
+    def test_marshal_emits_one_json_row_per_prompt(self):
+        text = marshal_rows(["a", "b"], ["ctx", ""])
+        rows = [json.loads(line) for line in text.splitlines()[-2:]]
+        assert rows == [
+            {"id": 0, "prompt": "a", "context": "ctx"},
+            {"id": 1, "prompt": "b", "context": ""},
+        ]
+
+    def test_marshal_keeps_non_ascii_and_one_line_per_row(self):
+        text = marshal_rows(["café?", "b"], ["line1\nline2", ""])
+        rows = text.splitlines()[-2:]
+        assert "café?" in rows[0]
+        assert json.loads(rows[0])["context"] == "line1\nline2"
+
+    def test_unmarshal_demultiplexes_by_id(self):
+        data = {
+            "results": [
+                {"id": 1, "success": True, "summary": "second", "confidence": 0.9},
+                {"id": 0, "success": False, "summary": "first", "confidence": 0.2},
+            ]
+        }
+        meta = AgentMetadata(model="m", tokens_used=100, latency_ms=5)
+        results = unmarshal_rows(data, 3, meta)
+
+        assert [r.summary for r in results[:2]] == ["first", "second"]
+        assert results[0].success is False
+        assert results[2].success is False  # row missing from response
+        assert all(r.metadata.tokens_used == 33 for r in results)
+
+
+class TestBatchConfig:
+    def teardown_method(self):
+        update_config(batch={"enabled": False, "wait_ms": 25, "max_size": 16})
+
+    def test_defaults_disabled(self):
+        assert get_config().batch.enabled is False
+
+    def test_partial_update_keeps_other_fields(self):
+        update_config(batch={"enabled": True})
+        config = get_config()
+        assert config.batch.enabled is True
+        assert config.batch.wait_ms == 25
+
+
+class TestBatchedExecution:
+    def setup_method(self):
+        update_config(batch={"enabled": True, "wait_ms": 20}, log_level="silent")
+
+    def teardown_method(self):
+        update_config(batch={"enabled": False, "wait_ms": 25}, log_level="info")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_aruns_issue_one_provider_call(self):
+        from unittest.mock import AsyncMock, patch
+
+        from console_agent import agent
+
+        async def fake_call_google(prompt, context, persona, config, options, **kw):
+            rows = [json.loads(line) for line in prompt.splitlines()[-3:]]
+            return AgentResult(
+                success=True,
+                summary="batch",
+                data={
+                    "results": [
+                        {"id": r["id"], "success": True, "summary": r["prompt"], "confidence": 1}
+                        for r in rows
+                    ]
+                },
+                confidence=1.0,
+                metadata=AgentMetadata(model="gemini-2.5-flash-lite", tokens_used=30),
+            )
+
+        mock = AsyncMock(side_effect=fake_call_google)
+        # Batches go through providers.google.call_google_rows
+        with patch("console_agent.providers.google.call_google", mock):
+            results = await asyncio.gather(
+                *[agent.arun(f"task {i}") for i in range(3)]
+            )
+
+        assert mock.await_count == 1
+        assert [r.summary for r in results] == ["task 0", "task 1", "task 2"]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_charged_once(self):
+        from unittest.mock import AsyncMock, patch
+
+        from console_agent import agent, core
+
+        failed = AgentResult(
+            success=False,
+            summary="Error: boom",
+            data={"error": "boom"},
+            confidence=0,
+            metadata=AgentMetadata(model="gemini-2.5-flash-lite", tokens_used=30),
+        )
+        before = core._budget_tracker.get_stats().tokens_today
+        with patch("console_agent.providers.google.call_google", AsyncMock(return_value=failed)):
+            results = await asyncio.gather(*[agent.arun(f"fail {i}") for i in range(3)])
+
+        assert core._budget_tracker.get_stats().tokens_today - before == 30
+        assert all(not r.success for r in results)
+        results[0].data["error"] = "changed"
+        assert results[1].data == {"error": "boom"}
+
+    @pytest.mark.asyncio
+    async def test_ollama_calls_are_batched_too(self):
+        from unittest.mock import AsyncMock, patch
+
+        from console_agent import agent
+
+        async def fake_call_ollama(prompt, context, persona, config, options=None, **kw):
+            rows = [json.loads(line) for line in prompt.splitlines()[-2:]]
+            return AgentResult(
+                success=True,
+                summary="batch",
+                data={
+                    "results": [
+                        {"id": r["id"], "success": True, "summary": r["prompt"], "confidence": 1}
+                        for r in rows
+                    ]
+                },
+                confidence=1.0,
+                metadata=AgentMetadata(model="llama3.2", tokens_used=20),
+            )
+
+        mock = AsyncMock(side_effect=fake_call_ollama)
+        update_config(provider="ollama")
+        try:
+            with patch("console_agent.providers.ollama.call_ollama", mock):
+                results = await asyncio.gather(*[agent.arun(f"local {i}") for i in range(2)])
+        finally:
+            update_config(provider="google")
+
+        assert mock.await_count == 1
+        assert mock.await_args.args[4].response_format is not None
+        assert [r.summary for r in results] == ["local 0", "local 1"]
+        assert all(r.metadata.tokens_used == 10 for r in results)
+
+    @pytest.mark.asyncio
+    async def test_different_thinking_configs_are_not_merged(self):
+        from unittest.mock import AsyncMock, patch
+
+        from console_agent import agent
+
+        async def fake_call_google(prompt, context, persona, config, options, **kw):
+            return AgentResult(
+                success=True,
+                summary=options.thinking.level,
+                confidence=1.0,
+                metadata=AgentMetadata(model="gemini-2.5-flash-lite"),
+            )
+
+        mock = AsyncMock(side_effect=fake_call_google)
+        with patch("console_agent.providers.google.call_google", mock):
+            results = await asyncio.gather(
+                agent.arun("task", thinking={"level": "low"}),
+                agent.arun("task 2", thinking={"level": "high"}),
+            )
+
+        assert mock.await_count == 2
+        assert [r.summary for r in results] == ["low", "high"]
+
+
+class TestCallGoogleBatch:
+    @pytest.mark.asyncio
+    async def test_prompts_are_chunked_into_row_requests(self):
+        from unittest.mock import patch
+
+        from console_agent.personas import get_persona
+        from console_agent.providers.google import call_google_batch
+
+        requests: list = []
+
+        async def fake_call_google(prompt, context, persona, config, options=None, **kw):
+            rows = [json.loads(line) for line in prompt.splitlines() if line.startswith("{\"id\"")]
+            requests.append(rows)
+            return AgentResult(
+                success=True,
+                summary="batch",
+                data={
+                    "results": [
+                        {"id": r["id"], "success": True, "summary": r["prompt"] + r["context"], "confidence": 1}
+                        for r in rows
+                    ]
+                },
+                confidence=1.0,
+                metadata=AgentMetadata(model="m", tokens_used=len(rows) * 10),
+            )
+
+        with patch("console_agent.providers.google.call_google", fake_call_google):
+            results = await call_google_batch(
+                [f"p{i}" for i in range(5)], "!", get_persona("general"), get_config(),
+                batch_size=2,
+            )
+
+        # Two row requests, and the last prompt is sent on its own (no rows)
+        assert [len(rows) for rows in requests] == [2, 2, 0]
+        assert [r.summary for r in results[:4]] == ["p0!", "p1!", "p2!", "p3!"]
+        assert all(r.metadata.tokens_used == 10 for r in results[:4])
+        assert results[4].summary == "batch"
+
+    @pytest.mark.asyncio
+    async def test_empty(self):
+        from console_agent.personas import get_persona
+        from console_agent.providers.google import call_google_batch
+
+        assert await call_google_batch([], "", get_persona("general"), get_config()) == []
@@ -1,5 +1,9 @@
 """Tests for the budget tracker."""
 
+import dataclasses
+
+import pytest
+
 from console_agent.types import BudgetConfig
 from console_agent.utils.budget import BudgetTracker
 
@@ -12,6 +16,13 @@ class TestBudgetTracker:
         assert result.allowed is True
         assert result.reason is None
 
+    def test_allowed_result_is_shared_and_frozen(self):
+        tracker = BudgetTracker(BudgetConfig())
+        result = tracker.can_make_call()
+        assert tracker.can_make_call() is result
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.allowed = False  # type: ignore[misc]
+
     def test_blocks_when_calls_exhausted(self):
         config = BudgetConfig(max_calls_per_day=2, max_tokens_per_call=8000, cost_cap_daily=1.0)
         tracker = BudgetTracker(config)
@@ -39,6 +50,14 @@ class TestBudgetTracker:
         assert stats.tokens_today == 500
         assert stats.cost_today == 0.02
 
+    def test_side_requests_cost_tokens_but_no_call(self):
+        tracker = BudgetTracker(BudgetConfig(max_calls_per_day=1))
+        tracker.record_usage(50, 0.01, calls=0)
+        stats = tracker.get_stats()
+        assert stats.calls_today == 0
+        assert stats.tokens_today == 50
+        assert tracker.can_make_call().allowed is True
+
     def test_reset(self):
         config = BudgetConfig(max_calls_per_day=2, max_tokens_per_call=8000, cost_cap_daily=1.0)
         tracker = BudgetTracker(config)
@@ -52,3 +71,25 @@ class TestBudgetTracker:
         config = BudgetConfig(max_calls_per_day=10, max_tokens_per_call=4096, cost_cap_daily=1.0)
         tracker = BudgetTracker(config)
         assert tracker.max_tokens_per_call == 4096
+
+    def test_day_starts_at_utc_midnight(self):
+        import datetime
+
+        start = datetime.datetime.fromtimestamp(
+            BudgetTracker._get_start_of_day(), datetime.timezone.utc
+        )
+        assert (start.hour, start.minute, start.second) == (0, 0, 0)
+        assert start.date() == datetime.datetime.now(datetime.timezone.utc).date()
+
+    def test_counters_reset_at_day_boundary(self, monkeypatch):
+        import console_agent.utils.budget as budget
+
+        tracker = BudgetTracker(BudgetConfig(max_calls_per_day=1))
+        tracker.record_usage(10, 0.0)
+        assert tracker.can_make_call().allowed is False
+
+        next_day = tracker._day_start + 86400
+        monkeypatch.setattr(budget.time, "time", lambda: next_day + 1)
+        monkeypatch.setattr(BudgetTracker, "_get_start_of_day", staticmethod(lambda: next_day))
+        assert tracker.can_make_call().allowed is True
+        assert tracker.get_stats().tokens_today == 0
@@ -1,11 +1,13 @@
 """Unit tests for console_agent.utils.caller_file."""
 
 import os
+import sys
 import tempfile
 
 import pytest
 
 from console_agent.utils.caller_file import (
+    CONTEXT_LINES,
     SourceFileInfo,
     format_source_for_context,
     get_caller_file,
@@ -41,6 +43,12 @@ class TestIsInternalFrame:
     def test_frozen_is_internal(self):
         assert _is_internal_frame("<frozen importlib._bootstrap>") is True
 
+    def test_verdicts_are_cached_per_filename(self):
+        _is_internal_frame.cache_clear()
+        _is_internal_frame("/home/user/project/billing.py")
+        _is_internal_frame("/home/user/project/billing.py")
+        assert _is_internal_frame.cache_info().hits == 1
+
     # ─── Python REPL / interactive interpreter ────────────────────────────
 
     def test_stdin_is_internal(self):
@@ -123,6 +131,22 @@ class TestReadSourceFile:
         assert "truncated" in content
         assert len(content) < 200_000
 
+    def test_cached_until_the_file_changes(self, tmp_path, monkeypatch):
+        path = tmp_path / "app.py"
+        path.write_text("v1\n")
+        assert _read_source_file(str(path)) == "v1\n"
+
+        opened = []
+        real_open = open
+        monkeypatch.setattr(
+            "builtins.open", lambda *a, **kw: opened.append(a[0]) or real_open(*a, **kw)
+        )
+        assert _read_source_file(str(path)) == "v1\n"
+        assert opened == []  # served from the cache
+
+        path.write_text("v2 longer\n")
+        assert _read_source_file(str(path)) == "v2 longer\n"
+
 
 # ─── format_source_for_context ────────────────────────────────────────────────
 
@@ -169,6 +193,49 @@ class TestFormatSourceForContext:
         result = format_source_for_context(source)
         assert "in " not in result.split("\n")[0]  # header line
 
+    def test_large_file_shows_window_around_line(self):
+        content = "\n".join(f"row{i}" for i in range(1, 3001))
+        source = SourceFileInfo(
+            file_path="/project/big.py", file_name="big.py", line=1500, column=0, content=content
+        )
+        body = format_source_for_context(source).split("\n")[1:]
+        assert len(body) == 2 * CONTEXT_LINES + 1
+        assert body[0].endswith(f"| row{1500 - CONTEXT_LINES}")
+        assert body[-1].endswith(f"| row{1500 + CONTEXT_LINES}")
+        assert body[CONTEXT_LINES] == " → 1500 | row1500"
+
+    def test_window_clamped_at_file_start(self):
+        content = "\n".join(f"row{i}" for i in range(1, 201))
+        source = SourceFileInfo(
+            file_path="/project/big.py", file_name="big.py", line=5, column=0, content=content
+        )
+        body = format_source_for_context(source).split("\n")[1:]
+        assert body[0] == "      1 | row1"
+        assert len(body) == 5 + CONTEXT_LINES
+        assert body[4].startswith(" → ")
+
+    def test_out_of_range_line_shows_file_start(self):
+        content = "\n".join(f"row{i}" for i in range(1, 201))
+        source = SourceFileInfo(
+            file_path="/project/big.py", file_name="big.py", line=999, column=0, content=content
+        )
+        body = format_source_for_context(source).split("\n")[1:]
+        assert body[0] == "      1 | row1"
+        assert not any(" → " in line for line in body)
+
+    def test_memoized_per_source(self):
+        source = SourceFileInfo(
+            file_path="/project/app.py", file_name="app.py", line=1, column=0, content="x\n"
+        )
+        same = SourceFileInfo(
+            file_path="/project/app.py", file_name="app.py", line=1, column=0, content="x\n"
+        )
+        assert format_source_for_context(source) is format_source_for_context(same)
+        moved = SourceFileInfo(
+            file_path="/project/app.py", file_name="app.py", line=2, column=0, content="x\n"
+        )
+        assert " → " not in format_source_for_context(moved).split("\n")[1]
+
 
 # ─── get_error_source_file ────────────────────────────────────────────────────
 
@@ -193,6 +260,18 @@ class TestGetErrorSourceFile:
         assert "def test_error_from_this_file" in result.content
         assert result.line > 0
 
+    def test_innermost_frame_wins(self):
+        def fail():
+            raise ValueError("inner")
+
+        try:
+            fail()
+        except ValueError as e:
+            result = get_error_source_file(e)
+
+        assert result.function_name == "fail"
+        assert result.content.splitlines()[result.line - 1].strip() == 'raise ValueError("inner")'
+
 
 # ─── get_caller_file ─────────────────────────────────────────────────────────
 
@@ -205,3 +284,23 @@ class TestGetCallerFile:
         assert result is not None
         assert result.file_name == "test_caller_file.py"
         assert "def test_detects_this_test_file" in result.content
+
+    def test_reports_calling_line_and_function(self):
+        line = sys._getframe().f_lineno + 1
+        result = get_caller_file()
+        assert result.line == line
+        assert result.function_name == "test_reports_calling_line_and_function"
+
+    def test_skip_frames(self):
+        def helper():
+            return get_caller_file(skip_frames=1)
+
+        result = helper()
+        assert result.function_name == "test_skip_frames"
+
+    def test_repeated_calls_track_line_and_function(self):
+        first = get_caller_file()
+        second = get_caller_file()
+        assert second.file_path == first.file_path == os.path.abspath(__file__)
+        assert second.line == first.line + 1
+        assert second.function_name == "test_repeated_calls_track_line_and_function"
@@ -0,0 +1,226 @@
+"""Tests for execute_agent request preparation."""
+
+from __future__ import annotations
+
+import json
+import warnings
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from console_agent.core import execute_agent, update_config
+from console_agent.types import AgentCallOptions, AgentMetadata, AgentResult
+
+
+def _ok_result() -> AgentResult:
+    return AgentResult(
+        success=True,
+        summary="ok",
+        confidence=1.0,
+        metadata=AgentMetadata(model="gemini-2.5-flash-lite"),
+    )
+
+
+def _deep_error(depth: int) -> Exception:
+    # Alternate two functions so Python doesn't collapse repeated frames
+    def ping(n: int) -> None:
+        if n == 0:
+            raise ValueError("deep failure")
+        pong(n - 1)
+
+    def pong(n: int) -> None:
+        ping(n)
+
+    try:
+        ping(depth)
+    except ValueError as err:
+        return err
+    raise AssertionError("unreachable")
+
+
+class TestExceptionContext:
+    def setup_method(self):
+        update_config(log_level="silent", include_caller_source=False, max_traceback_frames=5)
+
+    def teardown_method(self):
+        update_config(log_level="info", include_caller_source=True, max_traceback_frames=20)
+
+    async def _sent_context(self, err: Exception, verbose: bool) -> dict:
+        mock = AsyncMock(return_value=_ok_result())
+        with patch("console_agent.core.call_google", mock):
+            await execute_agent("why?", err, AgentCallOptions(verbose=verbose))
+        return json.loads(mock.await_args.args[1])
+
+    @pytest.mark.asyncio
+    async def test_traceback_is_one_string_truncated_to_innermost_frames(self):
+        sent = await self._sent_context(_deep_error(30), verbose=False)
+
+        assert isinstance(sent["traceback"], str)
+        assert sent["traceback"].count('File "') == 5
+        assert sent["traceback"].rstrip().endswith("ValueError: deep failure")
+
+    @pytest.mark.asyncio
+    async def test_verbose_keeps_full_traceback(self):
+        sent = await self._sent_context(_deep_error(30), verbose=True)
+
+        assert sent["traceback"].count("in ping") == 31
+
+
+class TestErrorResults:
+    def test_error_results_share_frozen_empty_metadata(self):
+        from pydantic import ValidationError
+
+        from console_agent.core import _create_dry_run_result, _create_error_result
+
+        first = _create_error_result("rate limited")
+        second = _create_dry_run_result("general")
+
+        assert first.metadata is second.metadata
+        assert first.metadata.tool_calls == ()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")  # no serializer warning for the tuple
+            assert json.loads(first.model_dump_json())["metadata"]["tool_calls"] == []
+        with pytest.raises(ValidationError):
+            first.metadata.tokens_used = 5  # type: ignore[misc]
+
+    def test_default_metadata_is_shared(self):
+        from console_agent.types import AgentResult
+
+        first = AgentResult(success=True, summary="a", confidence=1.0)
+        second = AgentResult(success=False, summary="b", confidence=0.0)
+
+        assert first.metadata is second.metadata
+        assert first.metadata.model == ""
+        assert json.loads(first.model_dump_json())["metadata"]["tool_calls"] == []
+
+    def test_tool_calls_are_frozen_too(self):
+        from pydantic import ValidationError
+
+        from console_agent.types import ToolCall
+
+        call = ToolCall(name="google_search")
+        with pytest.raises(ValidationError):
+            call.name = "other"  # type: ignore[misc]
+
+
+def _partial(text: str) -> AgentResult:
+    return AgentResult(
+        success=True,
+        summary="",
+        data={"partial": text},
+        confidence=0.0,
+        metadata=AgentMetadata(model="gemini-2.5-flash-lite", partial=True),
+    )
+
+
+class TestExecuteAgentStream:
+    def setup_method(self):
+        update_config(log_level="silent", include_caller_source=False)
+
+    def teardown_method(self):
+        update_config(
+            log_level="info", include_caller_source=True, cache={"enabled": False}, timeout=10000
+        )
+
+    @pytest.mark.asyncio
+    async def test_partials_then_final_through_the_full_pipeline(self):
+        import console_agent.core as core
+        from console_agent.core import execute_agent_stream
+
+        seen = []
+
+        async def fake_stream(prompt, context, persona, config, options, **kw):
+            seen.append(prompt)
+            yield _partial('{"summ')
+            yield _partial('{"summary": "ok"}')
+            final = _ok_result()
+            yield final.model_copy(update={"metadata": final.metadata.model_copy(update={"tokens_used": 7})})
+
+        update_config(cache={"enabled": True})
+        before = core._rate_limiter.remaining()
+        with patch("console_agent.core.call_google_stream", fake_stream):
+            results = [r async for r in execute_agent_stream("mail bob@example.com")]
+            again = [r async for r in execute_agent_stream("mail bob@example.com")]
+
+        assert [r.metadata.partial for r in results] == [True, True, False]
+        assert results[-1].metadata.tokens_used == 7
+        assert "bob@example.com" not in seen[0]
+        assert core._rate_limiter.remaining() == before - 1
+        assert len(seen) == 1 and len(again) == 1 and again[0].metadata.cached
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_stream_never_reaches_the_provider(self):
+        from console_agent.core import execute_agent_stream
+
+        provider = AsyncMock()
+        with patch("console_agent.core.call_google_stream", provider), patch(
+            "console_agent.core._rate_limiter.try_consume", return_value=False
+        ):
+            results = [r async for r in execute_agent_stream("hi")]
+
+        assert [r.success for r in results] == [False]
+        assert "Rate limited" in results[0].summary
+        provider.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stopping_early_closes_the_provider_stream(self):
+        import contextlib
+
+        from console_agent import agent
+
+        closed = []
+
+        async def fake_stream(prompt, context, persona, config, options, **kw):
+            try:
+                yield _partial("a")
+                yield _partial("ab")
+                yield _ok_result()
+            finally:
+                closed.append(True)
+
+        with patch("console_agent.core.call_google_stream", fake_stream):
+            async with contextlib.aclosing(agent.astream("hi")) as stream:
+                async for result in stream:
+                    break
+
+        assert result.data == {"partial": "a"}
+        assert closed == [True]
+
+    @pytest.mark.asyncio
+    async def test_timeout_yields_an_error_result(self):
+        import asyncio
+
+        from console_agent.core import execute_agent_stream
+
+        async def slow_stream(prompt, context, persona, config, options, **kw):
+            yield _partial("a")
+            await asyncio.sleep(1)
+            yield _ok_result()
+
+        update_config(timeout=50)
+        with patch("console_agent.core.call_google_stream", slow_stream):
+            results = [r async for r in execute_agent_stream("hi")]
+
+        assert results[0].metadata.partial
+        assert results[-1].success is False and "timed out" in results[-1].summary
+
+    @pytest.mark.asyncio
+    async def test_verbose_stream_echoes_only_new_text(self):
+        from console_agent.core import execute_agent_stream
+        from console_agent.utils.format import StreamingSpinner
+
+        written = []
+
+        async def fake_stream(prompt, context, persona, config, options, **kw):
+            yield _partial("Hel")
+            yield _partial("Hello")
+            yield _ok_result()
+
+        update_config(log_level="info")
+        with patch("console_agent.core.call_google_stream", fake_stream), patch(
+            "console_agent.core.start_streaming_spinner",
+            lambda verbose: StreamingSpinner(write=written.append),
+        ), patch("console_agent.core.format_result"):
+            [r async for r in execute_agent_stream("hi", options=AgentCallOptions(verbose=True))]
+
+        assert "".join(written) == "Hello\n"
@@ -0,0 +1,75 @@
+"""Tests for the orjson-backed JSON helpers."""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import enum
+import json
+
+import pytest
+
+from console_agent.utils import fastjson
+
+
+class TestDumps:
+    def test_compact_by_default(self):
+        out = fastjson.dumps({"a": [1, 2]})
+        assert "\n" not in out
+        assert json.loads(out) == {"a": [1, 2]}
+
+    def test_indent(self):
+        out = fastjson.dumps({"a": 1}, indent=True)
+        assert out == '{\n  "a": 1\n}'
+
+    def test_round_trips_unsupported_types_via_str(self):
+        when = datetime.date(2024, 1, 2)
+        out = json.loads(fastjson.dumps({"when": when, "obj": object}))
+        assert out["when"] == "2024-01-02"
+        assert out["obj"] == str(object)
+
+    @pytest.mark.parametrize("backend", ["orjson", "stdlib"])
+    def test_same_output_with_or_without_orjson(self, backend, monkeypatch):
+        @dataclasses.dataclass
+        class P:
+            x: int
+
+        class Color(enum.Enum):
+            RED = "red"
+
+        if backend == "stdlib":
+            monkeypatch.setattr(fastjson, "orjson", None)
+        value = {"p": P(1), "at": datetime.datetime(2024, 1, 2, 3, 4, 5), "c": Color.RED}
+        assert json.loads(fastjson.dumps(value)) == {
+            "p": str(P(1)),
+            "at": "2024-01-02 03:04:05",
+            "c": "red",
+        }
+
+    def test_non_string_keys(self):
+        assert json.loads(fastjson.dumps({1: "a"})) == {"1": "a"}
+
+    def test_huge_int_falls_back_to_stdlib(self):
+        assert json.loads(fastjson.dumps({"n": 2**80})) == {"n": 2**80}
+
+    def test_stdlib_fallback_when_orjson_missing(self, monkeypatch):
+        monkeypatch.setattr(fastjson, "orjson", None)
+        assert json.loads(fastjson.dumps({"a": "é"})) == {"a": "é"}
+
+
+class TestLoads:
+    def test_parses_str(self):
+        assert fastjson.loads('{"a": [1, "é"]}') == {"a": [1, "é"]}
+
+    def test_stdlib_only_literals_still_parse(self):
+        assert fastjson.loads('{"n": NaN, "big": 123456789012345678901234567890}')["big"] == (
+            123456789012345678901234567890
+        )
+
+    def test_invalid_raises_stdlib_error(self):
+        with pytest.raises(json.JSONDecodeError):
+            fastjson.loads("{not json")
+
+    def test_stdlib_fallback_when_orjson_missing(self, monkeypatch):
+        monkeypatch.setattr(fastjson, "orjson", None)
+        assert fastjson.loads('{"a": 1}') == {"a": 1}
@@ -0,0 +1,74 @@
+"""Tests for console output helpers."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from console_agent.utils import format as fmt
+from console_agent.utils.format import StreamingSpinner
+
+
+class TestStreamingSpinner:
+    @pytest.mark.asyncio
+    async def test_burst_of_chunks_is_written_once(self):
+        writes: list[str] = []
+        spinner = StreamingSpinner(write=writes.append, window_ms=20)
+
+        for token in ["Hel", "lo", ", ", "world"]:
+            spinner.push(token)
+        await spinner.aclose()
+
+        assert writes == ["Hello, world"]
+        assert spinner.flushes == 1
+
+    @pytest.mark.asyncio
+    async def test_chunks_after_window_are_flushed_separately(self):
+        writes: list[str] = []
+        spinner = StreamingSpinner(write=writes.append, window_ms=5)
+
+        spinner.push("first")
+        await asyncio.sleep(0.05)
+        spinner.push("second")
+        await spinner.aclose()
+
+        assert writes == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_max_chunks_caps_a_single_flush(self):
+        writes: list[str] = []
+        spinner = StreamingSpinner(write=writes.append, window_ms=1000, max_chunks=2)
+
+        for token in "abcde":
+            spinner.push(token)
+        await spinner.aclose()
+
+        assert writes == ["ab", "cd", "e"]
+
+    @pytest.mark.asyncio
+    async def test_close_without_chunks_is_noop(self):
+        spinner = StreamingSpinner(write=lambda _: None)
+        await spinner.aclose()
+        assert spinner.flushes == 0
+
+
+class TestLogLevels:
+    def teardown_method(self):
+        fmt.set_log_level("info")
+
+    def test_levels_gate_by_rank(self):
+        fmt.set_log_level("errors")
+        assert fmt._should_log("errors") is True
+        assert fmt._should_log("info") is False
+        fmt.set_log_level("debug")
+        assert fmt._should_log("info") is True
+
+    def test_log_debug_only_prints_at_debug(self, capsys):
+        fmt.set_log_level("info")
+        fmt.log_debug("hidden")
+        fmt.set_log_level("debug")
+        fmt.log_debug("shown")
+        out = capsys.readouterr().out
+        assert "hidden" not in out
+        assert "shown" in out
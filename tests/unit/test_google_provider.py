@@ -0,0 +1,549 @@
+"""Unit tests for the Google (Gemini) provider integration."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import types
+import weakref
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from console_agent.types import (
+    AgentCallOptions,
+    AgentConfig,
+    PersonaDefinition,
+    ResponseFormat,
+)
+from console_agent.tools import resolve_tools
+import console_agent.providers.google as google_provider
+from console_agent.providers._common import _find_json_object
+from console_agent.providers.google import (
+    CUSTOM_SCHEMA_INSTRUCTION,
+    JSON_FORMAT_INSTRUCTION,
+    call_google,
+    call_google_stream,
+    _build_user_message,
+    _extract_tokens,
+    _instructions,
+    _parse_response,
+)
+
+
+# ─── Fixtures ────────────────────────────────────────────────────────────────
+
+
+@pytest.fixture(autouse=True)
+def _fresh_agno_classes(monkeypatch):
+    """Each test injects its own fake agno modules; drop the cached classes."""
+    monkeypatch.setattr(google_provider, "_agno_classes", None)
+    monkeypatch.setattr(google_provider, "_client_slots", weakref.WeakKeyDictionary())
+
+
+@pytest.fixture
+def persona():
+    return PersonaDefinition(
+        name="general",
+        system_prompt="You are a helpful assistant.",
+        icon="🤖",
+        label="General",
+        default_tools=[],
+        keywords=[],
+    )
+
+
+@pytest.fixture
+def google_config():
+    return AgentConfig(api_key="test-key", anonymize=False)
+
+
+# ─── _build_user_message tests ──────────────────────────────────────────────
+
+
+class TestBuildUserMessage:
+    def test_prompt_only(self):
+        assert _build_user_message("hello", "") == "hello"
+
+    def test_with_context_and_source(self):
+        from console_agent.utils.caller_file import SourceFileInfo, format_source_for_context
+
+        source = SourceFileInfo(
+            file_path="/test/file.py",
+            file_name="file.py",
+            content="print('hello')",
+            line=1,
+            column=0,
+        )
+        msg = _build_user_message("hello", "ctx", source)
+        assert msg == (
+            "hello\n\n--- Context ---\nctx\n\n" + format_source_for_context(source)
+        )
+
+
+# ─── _instructions tests ────────────────────────────────────────────────────
+
+
+class TestInstructions:
+    def test_concatenated_once_per_persona_and_suffix(self, persona):
+        first = _instructions(persona.system_prompt, JSON_FORMAT_INSTRUCTION)
+        assert first == persona.system_prompt + JSON_FORMAT_INSTRUCTION
+        assert _instructions(persona.system_prompt, JSON_FORMAT_INSTRUCTION) is first
+        assert _instructions(persona.system_prompt, CUSTOM_SCHEMA_INSTRUCTION) is not first
+
+
+# ─── _extract_tokens tests ──────────────────────────────────────────────────
+
+
+class TestExtractTokens:
+    def test_total_preferred_then_input_plus_output(self):
+        ns = types.SimpleNamespace
+        assert _extract_tokens(ns(metrics=ns(total_tokens=7, input_tokens=1))) == 7
+        assert _extract_tokens(ns(metrics=ns(total_tokens=0, input_tokens=2, output_tokens=3))) == 5
+        assert _extract_tokens(ns(metrics=ns(input_tokens=None, output_tokens=4))) == 4
+        assert _extract_tokens(
+            ns(metrics=ns(total_tokens=None, input_tokens=2, output_tokens=None))
+        ) == 2
+
+    def test_missing_metrics(self):
+        assert _extract_tokens(types.SimpleNamespace(metrics=None)) == 0
+        assert _extract_tokens(object()) == 0
+        assert _extract_tokens(None) == 0
+
+
+# ─── _parse_response tests ──────────────────────────────────────────────────
+
+
+class TestParseResponse:
+    def test_plain_json(self):
+        assert _parse_response('{"summary": "ok"}') == {"summary": "ok"}
+
+    def test_fenced_json(self):
+        text = 'Here you go:\n```json\n{"summary": "fenced"}\n```'
+        assert _parse_response(text) == {"summary": "fenced"}
+
+    def test_embedded_object(self):
+        assert _parse_response('Result: {"summary": "inline"} done') == {"summary": "inline"}
+
+    def test_surrounding_whitespace(self):
+        assert _parse_response('\n  {"summary": "ok"}\n') == {"summary": "ok"}
+
+    def test_non_object_json_falls_back_to_raw(self):
+        # Callers read the result with .get(), so a bare scalar must not leak out
+        assert _parse_response("42")["data"] == {"raw": "42"}
+
+    def test_raw_fallback(self):
+        result = _parse_response("no json here")
+        assert result["data"] == {"raw": "no json here"}
+        assert result["confidence"] == 0.5
+
+
+class TestFindJsonObject:
+    def test_braces_inside_strings_are_ignored(self):
+        text = 'x {"a": "}{", "b": {"c": 1}} y'
+        assert _find_json_object(text) == '{"a": "}{", "b": {"c": 1}}'
+
+    def test_escaped_quotes_and_backslashes(self):
+        text = r'{"a": "say \"hi\" }", "b": "c:\\"} trailing }'
+        assert _find_json_object(text) == r'{"a": "say \"hi\" }", "b": "c:\\"}'
+
+    def test_first_of_several_objects(self):
+        text = 'one {"n": 1} two {"n": 2}'
+        assert _parse_response(text) == {"n": 1}
+
+    def test_unbalanced(self):
+        assert _find_json_object("{" * 10_000) is None
+        assert _find_json_object("no braces") is None
+
+
+# ─── call_google (mocked Agno) ──────────────────────────────────────────────
+
+
+def _make_fake_agno_modules():
+    """Create fake agno.agent and agno.models.google modules for sys.modules injection."""
+    MockAgent = MagicMock(name="Agent")
+    MockGemini = MagicMock(name="Gemini")
+
+    fake_agent_mod = types.ModuleType("agno.agent")
+    fake_agent_mod.Agent = MockAgent
+
+    fake_google_mod = types.ModuleType("agno.models.google")
+    fake_google_mod.Gemini = MockGemini
+
+    fake_models_mod = types.ModuleType("agno.models")
+
+    return MockAgent, MockGemini, {
+        "agno.agent": fake_agent_mod,
+        "agno.models": fake_models_mod,
+        "agno.models.google": fake_google_mod,
+    }
+
+
+def _mock_agent(MockAgent, content):
+    mock_response = MagicMock()
+    mock_response.content = content
+    mock_response.metrics = None
+    mock_agent_instance = MagicMock()
+    mock_agent_instance.arun = AsyncMock(return_value=mock_response)
+    MockAgent.return_value = mock_agent_instance
+    return mock_agent_instance
+
+
+class TestLoadAgno:
+    @pytest.mark.asyncio
+    async def test_first_import_runs_in_a_worker_thread(self):
+        MockAgent, MockGemini, fake_mods = _make_fake_agno_modules()
+        with patch.dict(sys.modules, fake_mods), patch.object(
+            asyncio, "to_thread", wraps=asyncio.to_thread
+        ) as to_thread:
+            first = await google_provider._load_agno()
+            second = await google_provider._load_agno()
+
+        assert first == (MockAgent, MockGemini)
+        assert second is first
+        assert to_thread.call_count == 1  # cached afterwards, no thread hop
+
+
+class TestCallGoogle:
+    @pytest.mark.asyncio
+    async def test_structured_output_instructions(self, persona, google_config):
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        _mock_agent(
+            MockAgent,
+            {"success": True, "summary": "done", "data": {}, "actions": [], "confidence": 0.9},
+        )
+
+        with patch.dict(sys.modules, fake_mods):
+            result = await call_google("analyze", "", persona, google_config)
+
+        assert result.success is True
+        assert MockAgent.call_args.kwargs["instructions"] == (
+            persona.system_prompt + JSON_FORMAT_INSTRUCTION
+        )
+
+    @pytest.mark.asyncio
+    async def test_custom_schema_instructions(self, persona, google_config):
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        _mock_agent(MockAgent, {"valid": True})
+        options = AgentCallOptions(
+            response_format=ResponseFormat(schema={"type": "object"})
+        )
+
+        with patch.dict(sys.modules, fake_mods):
+            result = await call_google("check", "", persona, google_config, options)
+
+        assert result.data == {"valid": True}
+        assert MockAgent.call_args.kwargs["instructions"] == (
+            persona.system_prompt + CUSTOM_SCHEMA_INSTRUCTION
+        )
+
+    @pytest.mark.asyncio
+    async def test_trusted_output_matches_validated_construction(self, persona, google_config):
+        from console_agent.types import AgentMetadata, AgentOutputSchema, AgentResult
+
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        output = AgentOutputSchema(
+            success=True, summary="s", data={"k": [1]}, actions=["a"], confidence=0.7
+        )
+        _mock_agent(MockAgent, output)
+
+        with patch.dict(sys.modules, fake_mods):
+            result = await call_google("analyze", "", persona, google_config)
+
+        expected = AgentResult(
+            **output.model_dump(),
+            metadata=AgentMetadata(model=google_config.model, latency_ms=result.metadata.latency_ms),
+        )
+        assert result.model_dump() == expected.model_dump()
+
+    @pytest.mark.asyncio
+    async def test_custom_schema_text_answers(self, persona, google_config):
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        options = AgentCallOptions(response_format=ResponseFormat(schema={"type": "object"}))
+
+        with patch.dict(sys.modules, fake_mods):
+            _mock_agent(MockAgent, '```json\n{"valid": true}\n```')
+            fenced = await call_google("check", "", persona, google_config, options)
+            _mock_agent(MockAgent, "no structure here")
+            plain = await call_google("check", "", persona, google_config, options)
+
+        assert fenced.data == {"valid": True}
+        assert plain.data == {"result": "no structure here"}
+
+    @pytest.mark.asyncio
+    async def test_text_response_falls_back_to_parser(self, persona, google_config):
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        _mock_agent(MockAgent, 'Sure:\n```json\n{"summary": "parsed", "confidence": 0.8}\n```')
+
+        with patch.dict(sys.modules, fake_mods):
+            result = await call_google("analyze", "", persona, google_config)
+
+        assert result.summary == "parsed"
+        assert result.confidence == 0.8
+        assert result.data["raw"].startswith("Sure:")  # no "data" key in the answer
+
+    @pytest.mark.asyncio
+    async def test_unparseable_text_keeps_raw(self, persona, google_config):
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        _mock_agent(MockAgent, "plain words")
+
+        with patch.dict(sys.modules, fake_mods):
+            result = await call_google("analyze", "", persona, google_config)
+
+        assert result.summary == "plain words"
+        assert result.data == {"raw": "plain words"}
+        assert result.actions == []
+
+    @pytest.mark.asyncio
+    async def test_gemini_model_is_reused_across_calls(self, persona, google_config):
+        MockAgent, MockGemini, fake_mods = _make_fake_agno_modules()
+        _mock_agent(MockAgent, {"success": True, "summary": "ok", "confidence": 1})
+
+        with patch.dict(sys.modules, fake_mods):
+            await call_google("one", "", persona, google_config)
+            await call_google("two", "", persona, google_config)
+
+        # One Gemini for the shared client, one model instance for both calls
+        assert MockGemini.call_count == 2
+        models = [c.kwargs["model"] for c in MockAgent.call_args_list]
+        assert models[0] is models[1]
+        assert MockAgent.call_count == 2  # agents stay per call
+
+    @pytest.mark.asyncio
+    async def test_batch_request_carries_the_row_schema(self, persona, google_config):
+        from console_agent.providers.google import call_google_rows
+        from console_agent.utils.batch import BATCH_RESPONSE_SCHEMA, BATCH_SYSTEM_INSTRUCTION
+
+        MockAgent, MockGemini, fake_mods = _make_fake_agno_modules()
+        _mock_agent(
+            MockAgent,
+            {
+                "results": [
+                    {"id": 0, "success": True, "summary": "a", "confidence": 1},
+                    {"id": 1, "success": True, "summary": "b", "confidence": 1},
+                ]
+            },
+        )
+
+        with patch.dict(sys.modules, fake_mods):
+            results = await call_google_rows(["a", "b"], ["", ""], persona, google_config)
+
+        generation = MockGemini.call_args.kwargs["generative_model_kwargs"]
+        assert generation["response_mime_type"] == "application/json"
+        assert generation["response_json_schema"] == BATCH_RESPONSE_SCHEMA
+        instructions = MockAgent.call_args.kwargs["instructions"]
+        assert instructions.endswith(BATCH_SYSTEM_INSTRUCTION)
+        assert CUSTOM_SCHEMA_INSTRUCTION not in instructions
+        assert [r.summary for r in results] == ["a", "b"]
+
+    def test_blocking_calls_share_one_client(self, persona, google_config):
+        from console_agent.utils.runsync import run_sync
+
+        MockAgent, MockGemini, fake_mods = _make_fake_agno_modules()
+        _mock_agent(MockAgent, {"success": True, "summary": "ok", "confidence": 1})
+
+        with patch.dict(sys.modules, fake_mods):
+            run_sync(call_google("one", "", persona, google_config))
+            run_sync(call_google("two", "", persona, google_config))
+
+        clients = [c for c in MockGemini.call_args_list if "client_params" in c.kwargs]
+        assert len(clients) == 1
+
+    def test_mixing_sync_and_async_callers_keeps_one_client_per_loop(
+        self, persona, google_config
+    ):
+        from console_agent.utils.runsync import run_sync
+
+        MockAgent, MockGemini, fake_mods = _make_fake_agno_modules()
+        _mock_agent(MockAgent, {"success": True, "summary": "ok", "confidence": 1})
+
+        app_loop = asyncio.new_event_loop()
+        try:
+            with patch.dict(sys.modules, fake_mods):
+                for prompt in ("one", "two", "three"):
+                    run_sync(call_google(prompt, "", persona, google_config))
+                    app_loop.run_until_complete(call_google(prompt, "", persona, google_config))
+        finally:
+            app_loop.close()
+
+        clients = [c for c in MockGemini.call_args_list if "client_params" in c.kwargs]
+        assert len(clients) == 2
+
+    @pytest.mark.asyncio
+    async def test_shared_client_asks_for_http2_when_h2_is_installed(
+        self, monkeypatch, persona, google_config
+    ):
+        MockAgent, MockGemini, fake_mods = _make_fake_agno_modules()
+        _mock_agent(MockAgent, {"success": True, "summary": "ok", "confidence": 1})
+
+        for available, expected in (
+            (True, {"http_options": {"async_client_args": {"http2": True}}}),
+            (False, None),
+        ):
+            monkeypatch.setattr(google_provider, "_HTTP2", available)
+            monkeypatch.setattr(google_provider, "_client_slots", weakref.WeakKeyDictionary())
+            MockGemini.reset_mock()
+            with patch.dict(sys.modules, fake_mods):
+                await call_google("one", "", persona, google_config)
+            assert MockGemini.call_args_list[0].kwargs["client_params"] == expected
+
+    def test_no_http2_args_for_genai_without_client_args(self, monkeypatch):
+        monkeypatch.setattr(google_provider, "_HTTP2", True)
+        monkeypatch.setattr(google_provider, "_genai_takes_client_args", lambda: False)
+        assert google_provider._client_params() is None
+
+    @pytest.mark.asyncio
+    async def test_service_tier_reaches_the_model(self, persona):
+        MockAgent, MockGemini, fake_mods = _make_fake_agno_modules()
+        _mock_agent(MockAgent, {"success": True, "summary": "ok", "confidence": 1})
+        config = AgentConfig(api_key="test-key", anonymize=False, service_tier="flex")
+
+        with patch.dict(sys.modules, fake_mods):
+            await call_google("one", "", persona, config)
+
+        model_kwargs = MockGemini.call_args_list[-1].kwargs
+        assert model_kwargs["generative_model_kwargs"] == {"service_tier": "flex"}
+
+    def test_tier_kwargs_merge_with_tool_kwargs(self):
+        tool_kwargs = resolve_tools(["code_execution"])
+        merged = google_provider._tier_kwargs("flex", tool_kwargs)
+        assert merged["generative_model_kwargs"]["service_tier"] == "flex"
+        assert merged["generative_model_kwargs"]["tools"]
+        assert "service_tier" not in tool_kwargs["generative_model_kwargs"]  # shared, untouched
+        assert google_provider._tier_kwargs(None, tool_kwargs) == dict(tool_kwargs)
+
+    def test_tier_is_dropped_when_genai_lacks_the_field(self, monkeypatch):
+        monkeypatch.setattr(google_provider, "_genai_supports", lambda field: False)
+        assert google_provider._tier_kwargs("flex") == {}
+
+
+# ─── embed_prompt ────────────────────────────────────────────────────────────
+
+
+class TestEmbedPrompt:
+    @staticmethod
+    def _client(embed_content):
+        client = MagicMock()
+        client.aio.models.embed_content = embed_content
+        return client
+
+    @pytest.mark.asyncio
+    async def test_returns_embedding_values(self, monkeypatch, google_config):
+        response = types.SimpleNamespace(
+            embeddings=[types.SimpleNamespace(values=[0.1, 0.2])]
+        )
+        embed_content = AsyncMock(return_value=response)
+        monkeypatch.setattr(google_provider, "_load_agno", AsyncMock())
+        monkeypatch.setattr(google_provider, "_shared_client", lambda key: self._client(embed_content))
+
+        assert await google_provider.embed_prompt("hi", google_config) == [0.1, 0.2]
+        kwargs = embed_content.await_args.kwargs
+        assert kwargs["model"] == google_config.cache.semantic_model
+        assert kwargs["config"] == {"output_dimensionality": google_provider.EMBEDDING_DIMENSIONS}
+
+    @pytest.mark.asyncio
+    async def test_failure_returns_none(self, monkeypatch, google_config):
+        embed_content = AsyncMock(side_effect=RuntimeError("quota"))
+        monkeypatch.setattr(google_provider, "_load_agno", AsyncMock())
+        monkeypatch.setattr(google_provider, "_shared_client", lambda key: self._client(embed_content))
+
+        assert await google_provider.embed_prompt("hi", google_config) is None
+
+
+# ─── call_google_stream (mocked Agno) ───────────────────────────────────────
+
+
+def _mock_stream(MockAgent, chunks, metrics=None):
+    events = [types.SimpleNamespace(event="RunContent", content=c) for c in chunks]
+    final = types.SimpleNamespace(content="".join(chunks), metrics=metrics)
+
+    async def arun(message, **kwargs):
+        for event in events + [final]:
+            yield event
+
+    mock_agent_instance = MagicMock()
+    mock_agent_instance.arun = MagicMock(side_effect=arun)
+    MockAgent.return_value = mock_agent_instance
+    return mock_agent_instance
+
+
+class TestCallGoogleStream:
+    @pytest.mark.asyncio
+    async def test_yields_partials_then_final(self, persona, google_config):
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        agent = _mock_stream(
+            MockAgent,
+            ['{"success": true, "summ', 'ary": "all \\"good\\"", ', '"confidence": 0.9}'],
+            metrics=types.SimpleNamespace(total_tokens=42),
+        )
+
+        with patch.dict(sys.modules, fake_mods):
+            results = [r async for r in call_google_stream("go", "", persona, google_config)]
+
+        assert agent.arun.call_args.kwargs["stream"] is True
+        partials, final = results[:-1], results[-1]
+        assert [p.summary for p in partials] == ["", 'all "good"', 'all "good"']
+        assert partials[0].data == {"partial": '{"success": true, "summ'}
+        assert final.summary == 'all "good"'
+        assert final.confidence == 0.9
+        assert final.metadata.tokens_used == 42
+
+    @pytest.mark.asyncio
+    async def test_response_format_streams_raw_json(self, persona, google_config):
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        agent = _mock_stream(MockAgent, ['{"valid": tr', 'ue, "summary": "x"}'])
+        options = AgentCallOptions(response_format=ResponseFormat(schema={"type": "object"}))
+
+        with patch.dict(sys.modules, fake_mods):
+            results = [
+                r async for r in call_google_stream("go", "", persona, google_config, options)
+            ]
+
+        assert MockAgent.call_args.kwargs["use_json_mode"] is True
+        assert MockAgent.call_args.kwargs["instructions"].endswith(CUSTOM_SCHEMA_INSTRUCTION)
+        partials, final = results[:-1], results[-1]
+        assert [p.summary for p in partials] == ["", ""]
+        assert partials[0].data == {"partial": '{"valid": tr'}
+        assert final.data == {"valid": True, "summary": "x"}
+        assert agent.arun.call_args.kwargs["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_schema_model_is_validated_once_stream_ends(self, persona, google_config):
+        from pydantic import BaseModel
+
+        class Review(BaseModel):
+            score: int
+            issues: list[str]
+
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        _mock_stream(MockAgent, ['{"score": 7, "iss', 'ues": ["naming"]}'])
+        options = AgentCallOptions(schema_model=Review)
+
+        with patch.dict(sys.modules, fake_mods):
+            results = [
+                r async for r in call_google_stream("go", "", persona, google_config, options)
+            ]
+
+        kwargs = MockAgent.call_args.kwargs
+        assert kwargs["output_schema"] is Review
+        assert kwargs["parse_response"] is False
+        assert "use_json_mode" not in kwargs
+        assert len(results) == 3
+        assert results[-1].data == {"score": 7, "issues": ["naming"]}
+
+    @pytest.mark.asyncio
+    async def test_invalid_schema_model_answer_falls_back_to_json(self, persona, google_config):
+        from pydantic import BaseModel
+
+        class Review(BaseModel):
+            score: int
+
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        _mock_stream(MockAgent, ['{"score": "high"}'])
+        options = AgentCallOptions(schema_model=Review)
+
+        with patch.dict(sys.modules, fake_mods):
+            results = [
+                r async for r in call_google_stream("go", "", persona, google_config, options)
+            ]
+
+        assert results[-1].data == {"score": "high"}
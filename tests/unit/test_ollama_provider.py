@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 import sys
 import types
 import pytest
@@ -14,18 +15,26 @@ from console_agent.types import (
     AgentResult,
     PersonaDefinition,
 )
-from console_agent.providers.ollama import (
-    call_ollama,
-    _parse_response,
-    _coerce_data,
-    _coerce_actions,
+import console_agent.providers.ollama as ollama_provider
+from console_agent.providers._common import (
     _build_user_message,
+    _coerce_actions,
+    _coerce_data,
+    _parse_response,
 )
+from console_agent.providers.ollama import call_ollama
 
 
 # ─── Fixtures ────────────────────────────────────────────────────────────────
 
 
+@pytest.fixture(autouse=True)
+def _fresh_agno_classes(monkeypatch):
+    """Each test injects its own fake agno modules; drop the cached classes."""
+    monkeypatch.setattr(ollama_provider, "_agno_classes", None)
+    monkeypatch.setattr(ollama_provider, "_model_slot", None)
+
+
 @pytest.fixture
 def persona():
     return PersonaDefinition(
@@ -72,6 +81,12 @@ class TestParseResponse:
         assert result is not None
         assert result["success"] is False
 
+    def test_json_after_prose_braces(self):
+        text = 'Fill in {name} first. Result: {"success": true, "summary": "later"} done'
+        result = _parse_response(text)
+        assert result is not None
+        assert result["summary"] == "later"
+
     def test_plain_text_fallback(self):
         text = "Just a plain text response with no JSON"
         result = _parse_response(text)
@@ -109,6 +124,13 @@ class TestCoerceActions:
         result = _coerce_actions([{"action": "do_thing"}, {"name": "other"}])
         assert result == ["do_thing", "other"]
 
+    def test_dict_key_priority_and_fallback(self):
+        result = _coerce_actions(
+            [{"name": "n", "recommendation": "r"}, {"action": "", "other": 1}, 3]
+        )
+        assert result[0] == "r" and result[2] == "3"
+        assert json.loads(result[1]) == {"action": "", "other": 1}
+
     def test_non_list(self):
         assert _coerce_actions("single") == ["single"]
 
@@ -294,6 +316,34 @@ class TestCallOllama:
         assert result.metadata.tokens_used == 150
         assert result.metadata.model == "llama3.2"
 
+    @pytest.mark.asyncio
+    async def test_other_model_content_reads_fields(self, persona, ollama_config):
+        """A non-AgentOutputSchema model is read field by field, not via repr()."""
+        from pydantic import BaseModel
+
+        class Answer(BaseModel):
+            summary: str
+            confidence: float
+            actions: list
+
+        mock_response = MagicMock()
+        mock_response.content = Answer(summary="From a model", confidence=0.8, actions=[{"a": 1}])
+        mock_response.metrics = None
+
+        MockAgent, MockOllamaModel, fake_mods = _make_fake_agno_modules()
+        mock_agent_instance = MagicMock()
+        mock_agent_instance.arun = AsyncMock(return_value=mock_response)
+        MockAgent.return_value = mock_agent_instance
+
+        with patch.dict(sys.modules, fake_mods):
+            result = await call_ollama("analyze", "", persona, ollama_config)
+
+        assert result.summary == "From a model"
+        assert result.confidence == 0.8
+        assert result.success is True  # missing fields keep their defaults
+        assert result.data == {}
+        assert json.loads(result.actions[0]) == {"a": 1}
+
     @pytest.mark.asyncio
     async def test_text_fallback(self, persona, ollama_config):
         """Test fallback when Ollama returns plain text instead of JSON."""
@@ -317,3 +367,93 @@ class TestCallOllama:
         assert result.success is True
         assert "raw" in result.data
         assert result.confidence == 0.5
+
+    @pytest.mark.asyncio
+    async def test_model_is_reused_per_host_and_model(self, persona, ollama_config):
+        mock_response = MagicMock()
+        mock_response.content = {"success": True, "summary": "ok", "confidence": 1}
+        mock_response.metrics = None
+
+        MockAgent, MockOllamaModel, fake_mods = _make_fake_agno_modules()
+        mock_agent_instance = MagicMock()
+        mock_agent_instance.arun = AsyncMock(return_value=mock_response)
+        MockAgent.return_value = mock_agent_instance
+        MockOllamaModel.side_effect = lambda **kwargs: MagicMock()
+        other_host = ollama_config.model_copy(update={"ollama_host": "http://gpu:11434"})
+
+        with patch.dict(sys.modules, fake_mods):
+            await call_ollama("one", "", persona, ollama_config)
+            await call_ollama("two", "", persona, ollama_config)
+            await call_ollama("three", "", persona, other_host)
+
+        assert MockOllamaModel.call_count == 2
+        models = [c.kwargs["model"] for c in MockAgent.call_args_list]
+        assert models[0] is models[1] and models[2] is not models[0]
+        assert MockAgent.call_count == 3  # agents stay per call
+
+    @pytest.mark.asyncio
+    async def test_custom_schema_instructions_built_once(self, persona, ollama_config):
+        mock_response = MagicMock()
+        mock_response.content = {"score": 1}
+        mock_response.metrics = None
+
+        MockAgent, _, fake_mods = _make_fake_agno_modules()
+        mock_agent_instance = MagicMock()
+        mock_agent_instance.arun = AsyncMock(return_value=mock_response)
+        MockAgent.return_value = mock_agent_instance
+        options = AgentCallOptions(response_format={"schema": {"type": "object"}})
+
+        with patch.dict(sys.modules, fake_mods):
+            await call_ollama("one", "", persona, ollama_config, options)
+            await call_ollama("two", "", persona, ollama_config, options)
+
+        first, second = (c.kwargs["instructions"] for c in MockAgent.call_args_list)
+        assert first.startswith(persona.system_prompt)
+        assert "structured data matching the requested output schema" in first
+        assert first is second
+
+    @pytest.mark.asyncio
+    async def test_batch_request_carries_the_row_schema(self, persona, ollama_config):
+        from console_agent.providers.ollama import call_ollama_rows
+        from console_agent.utils.batch import BATCH_RESPONSE_SCHEMA, BATCH_SYSTEM_INSTRUCTION
+
+        mock_response = MagicMock()
+        mock_response.content = {
+            "results": [
+                {"id": 0, "success": True, "summary": "a", "confidence": 1},
+                {"id": 1, "success": True, "summary": "b", "confidence": 1},
+            ]
+        }
+        mock_response.metrics = None
+
+        MockAgent, MockOllamaModel, fake_mods = _make_fake_agno_modules()
+        mock_agent_instance = MagicMock()
+        mock_agent_instance.arun = AsyncMock(return_value=mock_response)
+        MockAgent.return_value = mock_agent_instance
+
+        with patch.dict(sys.modules, fake_mods):
+            results = await call_ollama_rows(["a", "b"], ["", ""], persona, ollama_config)
+
+        assert MockOllamaModel.call_args.kwargs["format"] == BATCH_RESPONSE_SCHEMA
+        instructions = MockAgent.call_args.kwargs["instructions"]
+        assert instructions.endswith(BATCH_SYSTEM_INSTRUCTION)
+        assert "AgentResult wrapper" not in instructions
+        assert [r.summary for r in results] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_splits_tokens_across_row_copies(self, persona, ollama_config):
+        from console_agent.providers.ollama import call_ollama_rows
+
+        failed = AgentResult(
+            success=False,
+            summary="Error: connection refused",
+            data={"error": "connection refused"},
+            confidence=0,
+            metadata=AgentMetadata(model="llama3.2", tokens_used=20),
+        )
+        with patch("console_agent.providers.ollama.call_ollama", AsyncMock(return_value=failed)):
+            results = await call_ollama_rows(["a", "b"], ["", ""], persona, ollama_config)
+
+        assert [r.metadata.tokens_used for r in results] == [10, 10]
+        assert results[0] is not results[1]
+        assert results[0].data is not results[1].data
@@ -0,0 +1,77 @@
+"""Tests for the lazy top-level package exports."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+
+def _run(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+class TestLazyImports:
+    def test_import_does_not_load_core_or_pydantic(self):
+        out = _run(
+            "import sys, console_agent; "
+            "print(any(m in sys.modules for m in "
+            "('console_agent.core', 'console_agent.types', 'pydantic')))"
+        )
+        assert out == "False"
+
+    def test_reexports_resolve_on_access(self):
+        import console_agent
+        from console_agent import core, types
+
+        assert console_agent.AgentResult is types.AgentResult
+        assert console_agent.DEFAULT_CONFIG is core.DEFAULT_CONFIG
+        assert console_agent.get_config is core.get_config
+
+    @pytest.mark.asyncio
+    async def test_calls_resolve_core_once(self, monkeypatch):
+        import importlib
+        from unittest.mock import AsyncMock, patch
+
+        import console_agent
+        from console_agent import agent
+
+        monkeypatch.setattr(console_agent, "_modules", {})
+        imports = []
+        real_import = importlib.import_module
+
+        def import_module(name, package=None):
+            imports.append(name)
+            return real_import(name, package)
+
+        monkeypatch.setattr(importlib, "import_module", import_module)
+        with patch("console_agent.core.execute_agent", AsyncMock(return_value="ok")) as run:
+            assert await agent.arun("one") == "ok"
+            assert await agent.arun("two", model="m") == "ok"
+
+        assert run.await_count == 2
+        assert [name for name in imports if name.startswith(".")] == [".core", ".types"]
+
+    def test_unknown_attribute_raises(self):
+        import console_agent
+
+        with pytest.raises(AttributeError):
+            console_agent.does_not_exist  # noqa: B018
+
+    def test_utils_anonymize_does_not_load_rich(self):
+        out = _run(
+            "import sys, console_agent.utils.anonymize; "
+            "print(any(m == 'rich' or m.startswith('rich.') for m in sys.modules))"
+        )
+        assert out == "False"
+
+    def test_utils_console_helpers_resolve_on_access(self):
+        from console_agent import utils
+        from console_agent.utils import format as fmt
+
+        assert utils.log_debug is fmt.log_debug
+        with pytest.raises(AttributeError):
+            utils.does_not_exist  # noqa: B018
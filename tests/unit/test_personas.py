@@ -1,5 +1,9 @@
 """Tests for persona detection and lookup."""
 
+import pytest
+from pydantic import ValidationError
+
+import console_agent.personas as persona_registry
 from console_agent.personas import detect_persona, get_persona, personas
 
 
@@ -47,6 +51,14 @@ class TestDetectPersona:
         p = detect_persona("debug this security vulnerability", "general")
         assert p.name == "security"
 
+    def test_security_wins_even_when_matched_later(self):
+        p = detect_persona("slow race condition when refreshing the token", "general")
+        assert p.name == "security"
+
+    def test_multi_word_keywords(self):
+        p = detect_persona("is this a RACE CONDITION?", "general")
+        assert p.name == "debugger"
+
     def test_uses_explicit_default(self):
         p = detect_persona("do something random", "debugger")
         assert p.name == "debugger"
@@ -60,6 +72,25 @@ class TestDetectPersona:
         assert p.name == "architect"
 
 
+class TestDetectPersonaFallbackScan:
+    """Same detection rules without the optional Aho-Corasick automaton."""
+
+    @pytest.fixture(autouse=True)
+    def _no_automaton(self, monkeypatch):
+        monkeypatch.setattr(persona_registry, "_AUTOMATON", None)
+        persona_registry._detect_name.cache_clear()
+        yield
+        persona_registry._detect_name.cache_clear()
+
+    def test_priority_order(self):
+        assert detect_persona("debug this security vulnerability", "general").name == "security"
+        assert detect_persona("refactor this slow module", "general").name == "debugger"
+        assert detect_persona("review this system design", "general").name == "architect"
+
+    def test_falls_back_to_default(self):
+        assert detect_persona("tell me a joke", "architect").name == "architect"
+
+
 class TestPersonaDefinitions:
     def test_all_personas_have_system_prompts(self):
         for name, persona in personas.items():
@@ -76,7 +107,32 @@ class TestPersonaDefinitions:
     def test_general_has_no_keywords(self):
         assert get_persona("general").keywords == []
 
+    def test_registry_personas_are_immutable(self):
+        with pytest.raises(ValidationError):
+            get_persona("security").system_prompt = "be nice"  # type: ignore[misc]
+
     def test_specific_personas_have_keywords(self):
         for name in ("debugger", "security", "architect"):
             p = get_persona(name)  # type: ignore
             assert len(p.keywords) > 0, f"{name} has no keywords"
+
+
+class TestDetectPersonaCache:
+    def setup_method(self):
+        persona_registry._detect_name.cache_clear()
+
+    def test_repeated_prompt_hits_cache(self):
+        detect_persona("analyze this error", "general")
+        detect_persona("analyze this error", "general")
+        info = persona_registry._detect_name.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_default_is_part_of_the_key(self):
+        assert detect_persona("tell me a joke", "general").name == "general"
+        assert detect_persona("tell me a joke", "architect").name == "architect"
+
+    def test_long_prompts_are_not_cached(self):
+        prompt = "x" * (persona_registry._MAX_CACHED_PROMPT + 1) + " security"
+        assert detect_persona(prompt, "general").name == "security"
+        assert persona_registry._detect_name.cache_info().currsize == 0
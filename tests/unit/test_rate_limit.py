@@ -2,6 +2,8 @@
 
 from console_agent.utils.rate_limit import RateLimiter
 
+NS = 1_000_000_000
+
 
 class TestRateLimiter:
     def test_allows_calls_within_limit(self):
@@ -35,3 +37,76 @@ class TestRateLimiter:
         limiter = RateLimiter(1)
         assert limiter.try_consume() is True
         assert limiter.try_consume() is False
+
+    def test_denied_calls_do_not_use_future_tokens(self):
+        limiter = RateLimiter(2)
+        assert limiter.try_consume() is True
+        assert limiter.try_consume() is True
+        for _ in range(5):
+            assert limiter.try_consume() is False
+        assert limiter.remaining() == 0
+
+    def test_refills_whole_tokens_over_time(self, monkeypatch):
+        import console_agent.utils.rate_limit as rate_limit
+
+        clock = [1000 * NS]
+        monkeypatch.setattr(rate_limit.time, "monotonic_ns", lambda: clock[0])
+        limiter = RateLimiter(24)  # one token per hour
+        for _ in range(24):
+            assert limiter.try_consume() is True
+        assert limiter.try_consume() is False
+
+        clock[0] += 1800 * NS  # half a token
+        assert limiter.try_consume() is False
+        clock[0] += 1800 * NS
+        assert limiter.try_consume() is True
+        assert limiter.try_consume() is False
+
+    def test_refill_never_exceeds_capacity(self, monkeypatch):
+        import console_agent.utils.rate_limit as rate_limit
+
+        clock = [1000 * NS]
+        monkeypatch.setattr(rate_limit.time, "monotonic_ns", lambda: clock[0])
+        limiter = RateLimiter(24)
+        limiter.try_consume()
+        clock[0] += 10 * 86400 * NS  # long idle period
+        assert limiter.remaining() == 24
+
+    def test_uneven_rate_accrues_exactly_over_a_day(self, monkeypatch):
+        import console_agent.utils.rate_limit as rate_limit
+
+        clock = [1000 * NS]
+        monkeypatch.setattr(rate_limit.time, "monotonic_ns", lambda: clock[0])
+        limiter = RateLimiter(7)  # 86400 / 7 seconds per token — not a whole number
+        for _ in range(7):
+            assert limiter.try_consume() is True
+        for _ in range(7):
+            clock[0] += 86400 * NS // 7 + 1
+            assert limiter.try_consume() is True
+            assert limiter.try_consume() is False
+
+    def test_zero_limit_never_refills(self, monkeypatch):
+        import console_agent.utils.rate_limit as rate_limit
+
+        clock = [1000 * NS]
+        monkeypatch.setattr(rate_limit.time, "monotonic_ns", lambda: clock[0])
+        limiter = RateLimiter(0)
+        clock[0] += 10 * 86400 * NS
+        assert limiter.try_consume() is False
+
+    def test_concurrent_threads_never_overspend(self):
+        import threading
+
+        limiter = RateLimiter(1000)
+        allowed = []
+
+        def worker():
+            allowed.append(sum(limiter.try_consume() for _ in range(500)))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sum(allowed) == 1000
@@ -0,0 +1,474 @@
+"""Tests for the response cache and its use in execute_agent."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from console_agent.core import execute_agent, get_config, update_config
+from console_agent.types import AgentCallOptions, AgentMetadata, AgentResult, ToolCall
+from console_agent.utils.response_cache import ResponseCache, SemanticIndex, make_cache_key
+
+
+def _result(summary: str = "ok", success: bool = True) -> AgentResult:
+    return AgentResult(
+        success=success,
+        summary=summary,
+        confidence=1.0,
+        metadata=AgentMetadata(model="m", tokens_used=42, latency_ms=900),
+    )
+
+
+class TestResponseCache:
+    def test_hit_is_marked_cached(self):
+        cache = ResponseCache(max_entries=4, ttl_s=60)
+        cache.put("k", _result())
+        hit = cache.get("k")
+        assert hit is not None
+        assert hit.summary == "ok"
+        assert hit.metadata.cached is True
+        assert hit.metadata.tokens_used == 0
+        assert hit.metadata.latency_ms == 0
+        assert cache.get("k") == hit
+
+    def test_hits_and_original_are_independent_copies(self):
+        cache = ResponseCache(max_entries=4, ttl_s=60)
+        original = _result().model_copy(update={"data": {"a": {"b": 1}}, "actions": ["fix"]})
+        cache.put("k", original)
+        hit = cache.get("k")
+        hit.data["a"]["b"] = 666
+        hit.actions.append("x")
+        original.data["a"]["c"] = 2
+
+        again = cache.get("k")
+        assert again.data == {"a": {"b": 1}}
+        assert again.actions == ["fix"]
+        assert original.data == {"a": {"b": 1, "c": 2}}
+
+    def test_failures_are_not_cached(self):
+        cache = ResponseCache(max_entries=4, ttl_s=60)
+        cache.put("k", _result(success=False))
+        assert cache.get("k") is None
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ResponseCache(max_entries=2, ttl_s=60)
+        cache.put("a", _result("a"))
+        cache.put("b", _result("b"))
+        cache.get("a")
+        cache.put("c", _result("c"))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert len(cache) == 2
+
+    def test_expired_entries_miss(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(
+            "console_agent.utils.response_cache.time.monotonic", lambda: now[0]
+        )
+        cache = ResponseCache(max_entries=4, ttl_s=10)
+        cache.put("k", _result())
+        now[0] += 11
+        assert cache.get("k") is None
+
+    def test_key_depends_on_every_part(self):
+        assert make_cache_key("m", "p", "c") == make_cache_key("m", "p", "c")
+        assert make_cache_key("m", "p", "c") != make_cache_key("m", "p", "c2")
+
+    def test_key_depends_on_package_version(self, monkeypatch):
+        before = make_cache_key("m", "p", "c")
+        monkeypatch.setattr(
+            "console_agent.utils.response_cache._KEY_VERSION", (1, "0.0.0-other")
+        )
+        assert make_cache_key("m", "p", "c") != before
+
+
+class TestPersistentResponseCache:
+    def test_results_survive_a_new_cache(self, tmp_path):
+        path = str(tmp_path / "cache" / "responses.sqlite")
+        ResponseCache(max_entries=4, ttl_s=60, path=path).put("k", _result())
+        hit = ResponseCache(max_entries=4, ttl_s=60, path=path).get("k")
+        assert hit is not None
+        assert hit.summary == "ok"
+        assert hit.metadata.cached is True
+        assert hit.metadata.tokens_used == 0
+
+    def test_disk_entries_expire(self, tmp_path, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("console_agent.utils.response_cache.time.time", lambda: now[0])
+        path = str(tmp_path / "responses.sqlite")
+        ResponseCache(max_entries=4, ttl_s=10, path=path).put("k", _result())
+        now[0] += 11
+        assert ResponseCache(max_entries=4, ttl_s=10, path=path).get("k") is None
+
+    def test_disk_hit_keeps_its_remaining_lifetime(self, tmp_path, monkeypatch):
+        wall, mono = [1000.0], [50.0]
+        monkeypatch.setattr("console_agent.utils.response_cache.time.time", lambda: wall[0])
+        monkeypatch.setattr(
+            "console_agent.utils.response_cache.time.monotonic", lambda: mono[0]
+        )
+        path = str(tmp_path / "responses.sqlite")
+        ResponseCache(max_entries=4, ttl_s=10, path=path).put("k", _result())
+        wall[0] += 8
+        fresh = ResponseCache(max_entries=4, ttl_s=10, path=path)
+        assert fresh.get("k") is not None  # loaded into memory with 2s left
+        wall[0] += 3
+        mono[0] += 3
+        assert fresh.get("k") is None
+
+    def test_disk_store_is_bounded(self, tmp_path):
+        path = str(tmp_path / "responses.sqlite")
+        cache = ResponseCache(max_entries=2, ttl_s=60, path=path)
+        for key in ("a", "b", "c"):
+            cache.put(key, _result(key))
+        fresh = ResponseCache(max_entries=2, ttl_s=60, path=path)
+        assert fresh.get("a") is None
+        assert fresh.get("c").summary == "c"
+
+    def test_clear_empties_the_disk_store(self, tmp_path):
+        path = str(tmp_path / "responses.sqlite")
+        cache = ResponseCache(max_entries=4, ttl_s=60, path=path)
+        cache.put("k", _result())
+        cache.clear()
+        assert ResponseCache(max_entries=4, ttl_s=60, path=path).get("k") is None
+
+    def test_unusable_path_falls_back_to_memory(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        cache = ResponseCache(max_entries=4, ttl_s=60, path=str(blocker / "cache.sqlite"))
+        cache.put("k", _result())
+        assert cache.get("k") is not None
+
+    def test_unserializable_result_stays_in_memory(self, tmp_path):
+        path = str(tmp_path / "responses.sqlite")
+        cache = ResponseCache(max_entries=4, ttl_s=60, path=path)
+        result = _result().model_copy(
+            update={
+                "metadata": AgentMetadata(
+                    model="m", tool_calls=[ToolCall(name="t", result=object())]
+                )
+            }
+        )
+        cache.put("k", result)
+        assert cache.get("k") is not None
+        assert ResponseCache(max_entries=4, ttl_s=60, path=path).get("k") is None
+
+
+class TestCachedExecution:
+    def setup_method(self):
+        update_config(
+            cache={"enabled": True},
+            log_level="silent",
+            include_caller_source=False,
+        )
+
+    def teardown_method(self):
+        update_config(
+            cache={"enabled": False},
+            log_level="info",
+            include_caller_source=True,
+        )
+
+    @pytest.mark.asyncio
+    async def test_identical_call_skips_provider(self):
+        provider = AsyncMock(return_value=_result())
+        with patch("console_agent.core.call_google", provider):
+            first = await execute_agent("explain", {"x": 1})
+            second = await execute_agent("explain", {"x": 1})
+
+        assert provider.await_count == 1
+        assert first.metadata.cached is False
+        assert second.metadata.cached is True
+
+    @pytest.mark.asyncio
+    async def test_different_context_or_options_miss(self):
+        provider = AsyncMock(return_value=_result())
+        with patch("console_agent.core.call_google", provider):
+            await execute_agent("explain", {"x": 1})
+            await execute_agent("explain", {"x": 2})
+            await execute_agent("explain", {"x": 1}, AgentCallOptions(model="other"))
+
+        assert provider.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_edited_schema_model_misses(self):
+        from pydantic import BaseModel
+
+        class Finding(BaseModel):
+            risk: str
+
+        first = Finding
+
+        class Finding(BaseModel):  # same name, new field
+            risk: str
+            score: int
+
+        provider = AsyncMock(return_value=_result())
+        with patch("console_agent.core.call_google", provider):
+            await execute_agent("explain", "ctx", AgentCallOptions(schema_model=first))
+            await execute_agent("explain", "ctx", AgentCallOptions(schema_model=Finding))
+
+        assert provider.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_hit_does_not_consume_rate_limit(self):
+        import console_agent.core as core
+
+        provider = AsyncMock(return_value=_result())
+        with patch("console_agent.core.call_google", provider):
+            await execute_agent("explain", "ctx")
+            before = core._rate_limiter.remaining()
+            await execute_agent("explain", "ctx")
+            assert core._rate_limiter.remaining() == before
+
+    @pytest.mark.asyncio
+    async def test_ollama_calls_are_cached_per_host(self):
+        provider = AsyncMock(return_value=_result())
+        try:
+            with patch("console_agent.core.call_ollama", provider):
+                update_config(provider="ollama", ollama_host="http://a:11434")
+                await execute_agent("explain", "ctx")
+                hit = await execute_agent("explain", "ctx")
+                update_config(ollama_host="http://b:11434")
+                await execute_agent("explain", "ctx")
+        finally:
+            update_config(provider="google", ollama_host="http://localhost:11434")
+
+        assert hit.metadata.cached is True
+        assert provider.await_count == 2
+
+    def test_disabled_by_default(self):
+        update_config(cache={"enabled": False})
+        assert get_config().cache.enabled is False
+
+
+class TestSemanticIndex:
+    def test_nearest_within_scope_above_threshold(self):
+        index = SemanticIndex(max_entries=8, threshold=0.95)
+        index.add("scope", [1.0, 0.0, 0.0], "k1")
+        index.add("scope", [0.0, 1.0, 0.0], "k2")
+        assert index.nearest("scope", [2.0, 0.1, 0.0]) == "k1"  # length does not matter
+        assert index.nearest("scope", [1.0, 1.0, 0.0]) is None  # cosine ~0.71
+        assert index.nearest("other", [1.0, 0.0, 0.0]) is None
+
+    def test_oldest_entries_are_dropped(self):
+        index = SemanticIndex(max_entries=2, threshold=0.9)
+        for key, vector in (("a", [1.0, 0.0]), ("b", [0.0, 1.0]), ("c", [-1.0, 0.0])):
+            index.add("s", vector, key)
+        assert len(index) == 2
+        assert index.nearest("s", [1.0, 0.0]) is None
+
+    def test_zero_vectors_are_ignored(self):
+        index = SemanticIndex(max_entries=2, threshold=0.0)
+        index.add("s", [0.0, 0.0], "k")
+        assert len(index) == 0
+        assert index.nearest("s", [0.0, 0.0]) is None
+
+
+class TestSemanticCachedExecution:
+    def setup_method(self):
+        update_config(
+            cache={"enabled": True, "semantic_threshold": 0.95},
+            log_level="silent",
+            include_caller_source=False,
+        )
+
+    def teardown_method(self):
+        update_config(
+            cache={"enabled": False, "semantic_threshold": None},
+            log_level="info",
+            include_caller_source=True,
+        )
+
+    @staticmethod
+    def _embeddings(vectors):
+        return AsyncMock(side_effect=lambda prompt, config: vectors[prompt])
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_prompt_reuses_answer(self):
+        provider = AsyncMock(return_value=_result())
+        embed = self._embeddings(
+            {"explain this": [1.0, 0.0], "explain this please": [0.99, 0.05]}
+        )
+        with patch("console_agent.core.call_google", provider), patch(
+            "console_agent.core.embed_prompt", embed
+        ):
+            await execute_agent("explain this", "ctx")
+            hit = await execute_agent("explain this please", "ctx")
+
+        assert provider.await_count == 1
+        assert hit.metadata.cached is True
+
+    @pytest.mark.asyncio
+    async def test_only_the_prompt_may_differ(self):
+        provider = AsyncMock(return_value=_result())
+        embed = self._embeddings({"explain this": [1.0, 0.0], "explain that": [1.0, 0.0]})
+        with patch("console_agent.core.call_google", provider), patch(
+            "console_agent.core.embed_prompt", embed
+        ):
+            await execute_agent("explain this", "ctx")
+            await execute_agent("explain that", "other ctx")
+
+        assert provider.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_dissimilar_prompt_or_failed_embedding_misses(self):
+        provider = AsyncMock(return_value=_result())
+        embed = self._embeddings(
+            {"explain this": [1.0, 0.0], "something else": [0.0, 1.0], "no vector": None}
+        )
+        with patch("console_agent.core.call_google", provider), patch(
+            "console_agent.core.embed_prompt", embed
+        ):
+            await execute_agent("explain this", "ctx")
+            await execute_agent("something else", "ctx")
+            await execute_agent("no vector", "ctx")
+
+        assert provider.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_off_without_threshold(self):
+        update_config(cache={"semantic_threshold": None})
+        provider = AsyncMock(return_value=_result())
+        embed = AsyncMock(return_value=[1.0, 0.0])
+        with patch("console_agent.core.call_google", provider), patch(
+            "console_agent.core.embed_prompt", embed
+        ):
+            await execute_agent("explain this", "ctx")
+            await execute_agent("explain this please", "ctx")
+
+        assert embed.await_count == 0
+        assert provider.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_refused_call_is_not_embedded(self):
+        import console_agent.core as core
+
+        provider = AsyncMock(return_value=_result())
+        embed = AsyncMock(return_value=[1.0, 0.0])
+        with patch("console_agent.core.call_google", provider), patch(
+            "console_agent.core.embed_prompt", embed
+        ), patch.object(core._rate_limiter, "try_consume", return_value=False):
+            refused = await execute_agent("explain this", "ctx")
+
+        assert refused.success is False
+        assert embed.await_count == 0
+        assert provider.await_count == 0
+
+    @pytest.mark.asyncio
+    async def test_joining_an_identical_call_is_not_embedded(self):
+        release = asyncio.Event()
+
+        async def slow_provider(*args, **kwargs):
+            await release.wait()
+            return _result()
+
+        embed = AsyncMock(return_value=[1.0, 0.0])
+        with patch("console_agent.core.call_google", side_effect=slow_provider), patch(
+            "console_agent.core.embed_prompt", embed
+        ):
+            leader = asyncio.ensure_future(execute_agent("explain this", "ctx"))
+            for _ in range(5):
+                await asyncio.sleep(0)
+            follower = asyncio.ensure_future(execute_agent("explain this", "ctx"))
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(leader, follower)
+
+        assert embed.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_embedding_is_charged_to_the_budget(self):
+        import console_agent.core as core
+
+        embed = AsyncMock(return_value=[1.0, 0.0])
+        before = core._budget_tracker.get_stats()
+        with patch("console_agent.core.call_google", AsyncMock(return_value=_result())), patch(
+            "console_agent.core.embed_prompt", embed
+        ):
+            await execute_agent("x" * 400, "ctx")
+        after = core._budget_tracker.get_stats()
+
+        assert after.tokens_today - before.tokens_today == 42 + 100
+        assert after.calls_today - before.calls_today == 1
+
+
+class TestSingleFlight:
+    def setup_method(self):
+        update_config(
+            cache={"enabled": True},
+            log_level="silent",
+            include_caller_source=False,
+        )
+
+    def teardown_method(self):
+        update_config(
+            cache={"enabled": False},
+            log_level="info",
+            include_caller_source=True,
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_request(self):
+        import console_agent.core as core
+
+        calls = 0
+
+        async def slow_provider(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return _result()
+
+        before = core._rate_limiter.remaining()
+        with patch("console_agent.core.call_google", slow_provider):
+            results = await asyncio.gather(
+                *[execute_agent("explain", {"x": 1}) for _ in range(5)]
+            )
+
+        assert calls == 1
+        assert all(r == results[0] for r in results)
+        results[0].data["edited"] = True
+        assert all(r.data == {} for r in results[1:])
+        assert core._rate_limiter.remaining() == before - 1
+        assert core._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_followers_see_the_leaders_failure(self):
+        async def failing_provider(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            raise ConnectionError("boom")
+
+        with patch("console_agent.core.call_google", failing_provider):
+            results = await asyncio.gather(
+                execute_agent("explain", "ctx"), execute_agent("explain", "ctx")
+            )
+
+        assert [r.success for r in results] == [False, False]
+        assert all("boom" in r.summary for r in results)
+
+    @pytest.mark.asyncio
+    async def test_leader_timeout_does_not_cancel_the_call_for_followers(self):
+        import console_agent.core as core
+
+        async def slow_provider(*args, **kwargs):
+            await asyncio.sleep(0.4)
+            return _result("late")
+
+        async def follower():
+            await asyncio.sleep(0.2)  # deadline at 0.5s, after the answer
+            return await execute_agent("explain", "ctx")
+
+        update_config(timeout=300)
+        try:
+            with patch("console_agent.core.call_google", slow_provider):
+                leader, joined = await asyncio.gather(
+                    execute_agent("explain", "ctx"), follower()
+                )
+        finally:
+            update_config(timeout=10000)
+
+        assert leader.success is False and "timed out" in leader.summary
+        assert joined.success is True and joined.summary == "late"
+        assert core._inflight == {} and core._flight_waiters == {}
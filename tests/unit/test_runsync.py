@@ -0,0 +1,60 @@
+"""Tests for the sync → async bridge."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from console_agent.utils.caller_file import get_caller_file
+from console_agent.utils.runsync import _loop_thread, run_sync
+
+
+async def _current_thread() -> threading.Thread:
+    return threading.current_thread()
+
+
+class TestRunSync:
+    def test_without_running_loop_reuses_the_background_thread(self):
+        first = run_sync(_current_thread())
+        second = run_sync(_current_thread())
+
+        assert first is second
+        assert first is not threading.current_thread()
+
+    def test_caller_frame_travels_with_the_coroutine(self):
+        async def detect():
+            return get_caller_file()
+
+        source = run_sync(detect())  # this line is the call site
+
+        assert source is not None
+        assert source.file_name == "test_runsync.py"
+        assert source.function_name == "test_caller_frame_travels_with_the_coroutine"
+
+    @pytest.mark.asyncio
+    async def test_inside_running_loop_reuses_one_background_thread(self):
+        first = run_sync(_current_thread())
+        second = run_sync(_current_thread())
+
+        assert first is second
+        assert first is not threading.current_thread()
+        assert first.daemon
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate(self):
+        async def boom():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            run_sync(boom())
+
+    def test_nested_call_on_shared_loop_does_not_deadlock(self):
+        async def outer():
+            return run_sync(_current_thread())
+
+        future = asyncio.run_coroutine_threadsafe(outer(), _loop_thread.loop)
+        inner = future.result(timeout=5)
+
+        assert inner is not threading.current_thread()
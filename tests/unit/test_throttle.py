@@ -0,0 +1,62 @@
+"""Tests for the request throttle (concurrency cap + rpm pacing)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from console_agent.utils.throttle import RequestThrottle
+
+
+class TestConcurrency:
+    @pytest.mark.asyncio
+    async def test_caps_requests_in_flight(self):
+        throttle = RequestThrottle(rpm=0, max_concurrency=2)
+        in_flight = peak = 0
+
+        async def request():
+            nonlocal in_flight, peak
+            async with throttle.slot():
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*[request() for _ in range(6)])
+        assert peak == 2
+
+    def test_each_event_loop_gets_its_own_semaphore(self):
+        throttle = RequestThrottle(rpm=0, max_concurrency=1)
+
+        async def request():
+            async with throttle.slot():
+                await asyncio.sleep(0)
+
+        asyncio.run(request())
+        asyncio.run(request())  # would raise if the semaphore were loop-bound
+
+
+class TestPacing:
+    def test_burst_then_paced(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("console_agent.utils.throttle.time.monotonic", lambda: now[0])
+        throttle = RequestThrottle(rpm=60, max_concurrency=0)  # 1/s, burst of 6
+
+        waits = [throttle._reserve() for _ in range(8)]
+        assert waits[:6] == [0.0] * 6
+        assert waits[6] == pytest.approx(1.0)
+        assert waits[7] == pytest.approx(2.0)
+
+        now[0] += 10  # refilled, but never beyond the burst capacity
+        assert throttle._reserve() == 0.0
+
+    def test_unpaced(self):
+        throttle = RequestThrottle(rpm=0, max_concurrency=0)
+
+        async def many():
+            for _ in range(100):
+                async with throttle.slot():
+                    pass
+
+        asyncio.run(asyncio.wait_for(many(), timeout=1))
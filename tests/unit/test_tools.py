@@ -1,6 +1,15 @@
 """Tests for tool resolution and helpers."""
 
-from console_agent.tools import TOOLS_MIN_TIMEOUT, has_explicit_tools, resolve_tools
+import pytest
+
+from console_agent.tools import (
+    TOOLS_MIN_TIMEOUT,
+    detect_mime_type,
+    has_explicit_tools,
+    prepare_file_content,
+    prepare_file_path,
+    resolve_tools,
+)
 from console_agent.types import AgentCallOptions, ToolConfig
 
 
@@ -66,6 +75,15 @@ class TestResolveTools:
         result = resolve_tools(["google_search", config])
         assert result == {"search": True, "url_context": True}
 
+    def test_same_tool_set_shares_one_result(self):
+        assert resolve_tools(["url_context", "google_search"]) is resolve_tools(
+            [ToolConfig(type="google_search"), "url_context", "file_analysis"]
+        )
+
+    def test_result_is_read_only(self):
+        with pytest.raises(TypeError):
+            resolve_tools(["google_search"])["search"] = False  # type: ignore[index]
+
     def test_code_execution_alone_has_one_tool(self):
         result = resolve_tools(["code_execution"])
         tools = result["generative_model_kwargs"]["tools"]
@@ -117,3 +135,28 @@ class TestToolsMinTimeout:
 
     def test_min_timeout_is_int(self):
         assert isinstance(TOOLS_MIN_TIMEOUT, int)
+
+
+class TestDetectMimeType:
+    def test_known_extensions_case_insensitive(self):
+        assert detect_mime_type("report.PDF") == "application/pdf"
+        assert detect_mime_type("photo.backup.jpeg") == "image/jpeg"
+
+    def test_unknown_or_missing_extension(self):
+        assert detect_mime_type("notes.txt") == "application/octet-stream"
+        assert detect_mime_type("README") == "application/octet-stream"
+        assert detect_mime_type("trailing.") == "application/octet-stream"
+
+
+class TestPrepareFilePath:
+    def test_matches_in_memory_encoding(self, tmp_path):
+        data = bytes(range(256)) * 1000 + b"tail"  # spans several chunks, unaligned end
+        path = tmp_path / "scan.pdf"
+        path.write_bytes(data)
+
+        assert prepare_file_path(str(path)) == prepare_file_content(data, "application/pdf")
+
+    def test_explicit_mime_type(self, tmp_path):
+        path = tmp_path / "blob"
+        path.write_bytes(b"x")
+        assert prepare_file_path(str(path), "image/png")["mimeType"] == "image/png"